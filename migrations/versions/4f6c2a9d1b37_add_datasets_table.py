@@ -0,0 +1,51 @@
+"""add datasets table
+
+Revision ID: 4f6c2a9d1b37
+Revises: 763be2c1d905
+Create Date: 2026-10-18 10:12:41.518203
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "4f6c2a9d1b37"
+down_revision = "763be2c1d905"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "datasets",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("parquet_path", sa.String(length=1024), nullable=False),
+        sa.Column("mtime_ns", sa.BigInteger(), nullable=False),
+        sa.Column("n_bytes_on_disk", sa.BigInteger(), nullable=False),
+        sa.Column("n_rows", sa.BigInteger(), nullable=False),
+        sa.Column("n_columns", sa.Integer(), nullable=False),
+        sa.Column("n_row_groups", sa.Integer(), nullable=False),
+        sa.Column("n_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("schema_json", sa.Text(), nullable=False),
+        sa.Column("n_chunks", sa.Integer(), nullable=True),
+        sa.Column("chunk_folder", sa.String(length=1024), nullable=True),
+        sa.Column("manifest_path", sa.String(length=1024), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    with op.batch_alter_table("datasets", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_datasets_name"), ["name"], unique=True)
+        batch_op.create_index(
+            batch_op.f("ix_datasets_content_hash"), ["content_hash"], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("datasets", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_datasets_content_hash"))
+        batch_op.drop_index(batch_op.f("ix_datasets_name"))
+
+    op.drop_table("datasets")
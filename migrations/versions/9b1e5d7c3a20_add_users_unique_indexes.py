@@ -0,0 +1,40 @@
+"""add unique indexes on users.username and users.email
+
+Revision ID: 9b1e5d7c3a20
+Revises: 4f6c2a9d1b37
+Create Date: 2026-10-18 16:40:12.734519
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9b1e5d7c3a20"
+down_revision = "4f6c2a9d1b37"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Older databases got the users table from `db.create_all` or /init-db,
+    # outside of the migrations, so it may or may not exist yet
+    if not sa.inspect(op.get_bind()).has_table("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("username", sa.String(length=80), nullable=False),
+            sa.Column("email", sa.String(length=120), nullable=False),
+            sa.Column("password_hash", sa.String(length=256), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    # Fails if the table already holds duplicate usernames or emails, which
+    # must be resolved by hand first
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_users_username"), ["username"], unique=True)
+        batch_op.create_index(batch_op.f("ix_users_email"), ["email"], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_users_email"))
+        batch_op.drop_index(batch_op.f("ix_users_username"))
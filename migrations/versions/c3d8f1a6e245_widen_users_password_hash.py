@@ -0,0 +1,37 @@
+"""widen users.password_hash to 256 characters
+
+Revision ID: c3d8f1a6e245
+Revises: 9b1e5d7c3a20
+Create Date: 2026-10-18 09:02:57.318640
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c3d8f1a6e245"
+down_revision = "9b1e5d7c3a20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # scrypt hashes (werkzeug's default method) are longer than 128 characters
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.alter_column(
+            "password_hash",
+            existing_type=sa.String(length=128),
+            type_=sa.String(length=256),
+            existing_nullable=True,
+        )
+
+
+def downgrade():
+    # Fails (on databases that enforce lengths) while any hash is longer than 128
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.alter_column(
+            "password_hash",
+            existing_type=sa.String(length=256),
+            type_=sa.String(length=128),
+            existing_nullable=True,
+        )
@@ -0,0 +1,30 @@
+"""add users.is_admin
+
+Revision ID: e7a4b2c9d061
+Revises: c3d8f1a6e245
+Create Date: 2026-10-18 11:26:03.904152
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e7a4b2c9d061"
+down_revision = "c3d8f1a6e245"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing users are not admins; grant the role with `flask users set-admin`
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "is_admin", sa.Boolean(), nullable=False, server_default=sa.false()
+            )
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_column("is_admin")
@@ -1,4 +1,6 @@
-from flask import Blueprint, request
+from flask import Blueprint, jsonify, request
+
+from .src.admin_required import admin_required
 
 # from predictables_flask.models import User, db
 
@@ -38,3 +40,19 @@ def reset_password():
     from .src import password
 
     return password.reset(request)
+
+
+@auth_blueprint.route("/users/import", methods=["POST"])
+@admin_required
+def import_users():
+    from .src.import_user_file import import_user_file
+
+    return import_user_file(request)
+
+
+@auth_blueprint.route("/users/cache/stats", methods=["GET"])
+@admin_required
+def user_cache_stats():
+    from predictables_flask.models.user_cache import user_cache
+
+    return jsonify(user_cache.stats())
@@ -0,0 +1,32 @@
+from functools import wraps
+from typing import Callable
+
+from flask import jsonify
+from flask_login import current_user
+
+
+def admin_required(view: Callable) -> Callable:
+    """
+    Only let an authenticated admin (a user with `is_admin` set) call a view.
+
+    Parameters
+    ----------
+    view : Callable
+        The view function to protect.
+
+    Returns
+    -------
+    Callable
+        The view, answering 401 if the request is not authenticated and 403
+        if the user is not an admin.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return jsonify({"error": "Authentication required"}), 401
+        if not current_user.is_admin:
+            return jsonify({"error": "Admin access required"}), 403
+        return view(*args, **kwargs)
+
+    return wrapper
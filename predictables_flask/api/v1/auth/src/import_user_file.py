@@ -0,0 +1,44 @@
+from flask import Request, current_app, jsonify
+
+from predictables_flask.models.user_import import (
+    IMPORT_FORMATS,
+    import_users,
+    read_user_records,
+)
+
+
+def import_user_file(request: Request):
+    """
+    Create the users in a CSV or JSON file, sent as a multipart `file` or as
+    the request body (see `user_import.import_users`).
+
+    The format is the `format` query parameter, or else the file's extension,
+    or else the content type ('text/csv' is CSV, anything else JSON). Rows
+    that fail validation are reported in the response and do not stop the
+    rest of the import. Rows without a password fail, unless the
+    `allow_missing_password` query parameter is 'true'.
+    """
+    fmt = request.args.get("format", None)
+    if "file" in request.files:
+        file = request.files["file"]
+        extension = file.filename.rsplit(".", 1)[-1].lower() if file.filename else ""
+        if fmt is None and extension in IMPORT_FORMATS:
+            fmt = extension
+        data = file.read()
+    else:
+        data = request.get_data()
+    if fmt is None:
+        fmt = "csv" if request.mimetype == "text/csv" else "json"
+
+    batch_size = request.args.get(
+        "batch_size", current_app.config["USER_IMPORT_BATCH_SIZE"], type=int
+    )
+    allow_missing_password = (
+        request.args.get("allow_missing_password", "false").lower() == "true"
+    )
+    try:
+        records = read_user_records(data, fmt.lower())
+        report = import_users(records, batch_size, allow_missing_password)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(report), 200
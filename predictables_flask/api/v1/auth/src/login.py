@@ -1,15 +1,19 @@
 from typing import Tuple
 
+import jwt
 from flask import Request, current_app, jsonify
-from werkzeug.security import check_password_hash
+from flask_login import login_user
 
-from predictables_flask.models import User
+from predictables_flask.models.User import User
 
 
 def login(request: Request) -> Tuple[dict, int]:
     """
     Authenticate users based on the provided credentials and return a JWT token if successful.
 
+    A successful login also starts a flask-login session, so the client's
+    later requests are authenticated by its session cookie.
+
     Parameters
     ----------
     request : Request
@@ -21,18 +25,19 @@ def login(request: Request) -> Tuple[dict, int]:
         A tuple containing a JSON response and a status code.
     """
     # Extract credentials from request
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     username = data.get("username")
     password = data.get("password")
 
     if not username or not password:
         return jsonify({"error": "Missing username or password"}), 400
 
-    # Authenticate the user
+    # Authenticate the user (this also upgrades an outdated password hash)
     user = User.get_by_username(username)
-    if user and check_password_hash(user.password_hash, password):
+    if user and user.check_password(password):
         # Assuming generate_token is a function that creates a JWT token for the user
         token = generate_token(user.id)
+        login_user(user)
         return jsonify({"token": token}), 200
     else:
         return jsonify({"error": "Invalid credentials"}), 401
@@ -52,6 +57,7 @@ def generate_token(user_id: str) -> str:
     str
         A token for the user.
     """
+    # PyJWT 2 returns the token as a string
     return jwt.encode(
         {"user_id": user_id}, current_app.config["SECRET_KEY"], algorithm="HS256"
-    ).decode("utf-8")
+    )
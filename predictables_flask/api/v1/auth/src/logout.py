@@ -1,22 +1,26 @@
-from flask import Request, current_app, jsonify
+from typing import Tuple
 
+from flask import Request, jsonify
+from flask_login import current_user, logout_user
 
-def logout(request: Request) -> str:
+
+def logout(request: Request) -> Tuple[dict, int]:
     """
     Logout endpoint
 
     Parameters
     ----------
     request : Request
-        The request object from the Flask route. Must be a POST request of the form:
-        {
-            "username": "username",
-            "password": "password"
-        }
+        The request object from the Flask route. Must be a POST request from
+        a client logged in with the login endpoint.
 
     Returns
     -------
-    JSON
-        A JSON object with a token field if successful. Otherwise, returns a JSON object with an error field.
+    Tuple[dict, int]
+        A tuple containing a JSON response and a status code: 200 once the
+        session is ended, and 401 if the client was not logged in.
     """
-    return jsonify({"message": "Logout endpoint not implemented"}), 501
+    if not current_user.is_authenticated:
+        return jsonify({"error": "Not logged in"}), 401
+    logout_user()
+    return jsonify({"message": "Logged out successfully"}), 200
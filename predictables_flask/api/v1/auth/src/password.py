@@ -1,32 +1,32 @@
-from flask import jsonify
+from flask import Request, jsonify
 
 
-def reset():
+def reset(request: Request = None):
     # POST to reset password
     return jsonify({"message": "Password reset endpoint not implemented"}), 501
 
 
-def reset_confirm():
+def reset_confirm(request: Request = None):
     # POST to confirm password reset
     return jsonify({"message": "Password reset confirm endpoint not implemented"}), 501
 
 
-def change():
+def change(request: Request = None):
     # POST to change password
     return jsonify({"message": "Password change endpoint not implemented"}), 501
 
 
-def change_confirm():
+def change_confirm(request: Request = None):
     # POST to confirm password change
     return jsonify({"message": "Password change confirm endpoint not implemented"}), 501
 
 
-def reset_validate():
+def reset_validate(request: Request = None):
     # POST to validate password reset token
     return jsonify({"message": "Password reset validate endpoint not implemented"}), 501
 
 
-def change_validate():
+def change_validate(request: Request = None):
     # POST to validate password change token
     return (
         jsonify({"message": "Password change validate endpoint not implemented"}),
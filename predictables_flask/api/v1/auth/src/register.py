@@ -1,17 +1,49 @@
-from flask import Request, current_app, jsonify
+from typing import Tuple
 
+from flask import Request, jsonify
 
-def register(request: Request) -> str:
+from predictables_flask.models.User import User
+
+
+def register(request: Request) -> Tuple[dict, int]:
     """
-    Register a new user
+    Register a new user.
+
+    Parameters
+    ----------
+    request : Request
+        The Flask request object containing JSON with 'username', 'email' and
+        'password' keys, and optionally 'first_name' and 'last_name'.
+
+    Returns
+    -------
+    Tuple[dict, int]
+        A tuple containing a JSON response and a status code: 201 if the user
+        was created, 400 if the details are invalid or already taken, and 409
+        if the username or email was registered concurrently.
     """
-    # POST to register new users
-    # Example:
-    # username = request.json.get('username')
-    # password = request.json.get('password')
-    # hashed_password = generate_password_hash(password, method='sha256')
-    # new_user = User(username=username, password=hashed_password)
-    # db.session.add(new_user)
-    # db.session.commit()
-    # return jsonify({'message': 'Registered successfully'}), 201
-    return jsonify({"message": "Registration endpoint not implemented"}), 501
+    data = request.get_json(silent=True) or {}
+    username = data.get("username", "")
+    email = data.get("email", "")
+    password = data.get("password", "")
+
+    # One query checks that neither the username nor the email is taken
+    user = User(username=username, email=email)
+    if not user.validate_username_and_email_before_adding_new_user(username, email):
+        return jsonify({"error": "Invalid or already registered username or email"}), 400
+    if not user.validate_password_before_adding_new_user(
+        password,
+        username,
+        email,
+        data.get("first_name", ""),
+        data.get("last_name", ""),
+    ):
+        return jsonify({"error": "Invalid password"}), 400
+
+    user.set_password(password)
+    try:
+        # The unique indexes reject a user registered since the check above
+        user.create()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    return jsonify({"message": "Registered successfully", "user": user.to_dict()}), 201
@@ -0,0 +1,60 @@
+import pytest
+
+from predictables_flask.api.v1.io.src.job_manager import job_manager
+from predictables_flask.app import create_app
+from predictables_flask.config import TestingConfig
+from predictables_flask.models.db import db
+from predictables_flask.models.password_hasher import password_hasher
+from predictables_flask.models.User import User
+from predictables_flask.models.user_cache import user_cache
+
+AUTH_ROOT = "/predictables/api/v1/auth"
+
+
+@pytest.fixture
+def app(tmp_path):
+    class Config(TestingConfig):
+        IO_DATA_FOLDER = str(tmp_path)
+        IO_CHUNK_FOLDER = str(tmp_path / "chunks")
+        UPLOAD_FOLDER = str(tmp_path / "uploads")
+        IO_JOB_FOLDER = str(tmp_path / "jobs")
+        SQLALCHEMY_ECHO = False
+
+    user_cache.clear()
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+    yield app
+    job_manager.shutdown()
+    password_hasher.shutdown()
+    user_cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(app):
+    # A client logged in as an admin
+    client = app.test_client()
+    with app.app_context():
+        create_user("admin", is_admin=True)
+    log_in(client, "admin")
+    return client
+
+
+def create_user(username: str, is_admin: bool = False) -> User:
+    # A user whose password is "<username>-password"
+    user = User(username=username, email=f"{username}@example.com", is_admin=is_admin)
+    user.set_password(f"{username}-password")
+    user.save()
+    return user
+
+
+def log_in(client, username: str) -> None:
+    # Log a test client in as a user made by `create_user`, with the login view
+    body = {"username": username, "password": f"{username}-password"}
+    response = client.post(f"{AUTH_ROOT}/login", json=body)
+    assert response.status_code == 200, response.get_json()
@@ -0,0 +1,86 @@
+import pytest
+
+from predictables_flask.models.password_hasher import (
+    PasswordHasher,
+    get_hash_method,
+    hash_password,
+    normalize_method,
+    password_hasher,
+)
+from predictables_flask.models.User import User
+
+from .conftest import AUTH_ROOT
+
+
+@pytest.mark.parametrize(
+    "method", ["pbkdf2:sha256:1000", "scrypt:1024:8:1", "bcrypt:4"]
+)
+def test_hash_and_check_on_a_process_pool(method):
+    hasher = PasswordHasher(method, max_workers=2, executor="process")
+    try:
+        password_hash = hasher.hash("s3cret-password")
+        assert get_hash_method(password_hash) == method
+        assert hasher.check(password_hash, "s3cret-password")
+        assert not hasher.check(password_hash, "wrong-password")
+        assert not hasher.needs_rehash(password_hash)
+        # Never forked from the (multithreaded) server process
+        assert hasher._get_pool()._mp_context.get_start_method() != "fork"
+    finally:
+        hasher.shutdown()
+
+
+def test_outdated_hashes_need_a_rehash():
+    hasher = PasswordHasher("pbkdf2:sha256:2000", executor="thread")
+    assert hasher.needs_rehash(hash_password("pw", "pbkdf2:sha256:1000"))
+    assert hasher.needs_rehash(hash_password("pw", "bcrypt:4"))
+    assert not hasher.needs_rehash(hash_password("pw", "pbkdf2:sha256:2000"))
+    # Legacy or unparseable formats are upgraded rather than failing the login
+    assert hasher.needs_rehash("md5$salt$hash")
+    assert hasher.needs_rehash("$2b$")
+    assert normalize_method("scrypt") == "scrypt:32768:8:1"
+    with pytest.raises(ValueError):
+        normalize_method("md5")
+
+
+def test_login_upgrades_an_outdated_hash(app):
+    with app.app_context():
+        assert password_hasher.method == app.config["PASSWORD_HASH_METHOD"]
+        user = User(username="ada", email="ada@example.com")
+        user.password_hash = hash_password("s3cret-password", "bcrypt:4")
+        user.save()
+
+        assert not user.check_password("wrong-password")
+        assert user.password_hash.startswith("$2")
+
+        assert user.check_password("s3cret-password")
+        assert get_hash_method(user.password_hash) == "pbkdf2:sha256:1000"
+        assert User.get_by_id(user.id).check_password("s3cret-password")
+
+
+def test_login_upgrades_a_legacy_hash(app, monkeypatch):
+    with app.app_context():
+        user = User(username="ada", email="ada@example.com")
+        user.password_hash = "sha1$salt$legacy-hash"
+        user.save()
+
+        monkeypatch.setattr(password_hasher, "check", lambda *args: True)
+        assert user.check_password("s3cret-password")
+        assert get_hash_method(user.password_hash) == "pbkdf2:sha256:1000"
+
+
+def test_login_route_upgrades_an_outdated_hash(app, client):
+    with app.app_context():
+        user = User(username="ada", email="ada@example.com")
+        user.password_hash = hash_password("s3cret-password", "bcrypt:4")
+        user.save()
+
+    body = {"username": "ada", "password": "s3cret-password"}
+    response = client.post(f"{AUTH_ROOT}/login", json=body)
+    assert response.status_code == 200
+    assert response.get_json()["token"]
+    with app.app_context():
+        password_hash = User.get_by_username("ada").password_hash
+        assert get_hash_method(password_hash) == "pbkdf2:sha256:1000"
+
+    body["password"] = "wrong-password"
+    assert client.post(f"{AUTH_ROOT}/login", json=body).status_code == 401
@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import event
+
+from predictables_flask.models.db import db
+from predictables_flask.models.User import User
+from predictables_flask.models.user_cache import CachedUser, UserCache, user_cache
+
+from .conftest import AUTH_ROOT
+
+
+@pytest.fixture
+def queries(app):
+    # The SQL statements run against the database, while the fixture is active
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _record)
+        user_cache.clear()
+        yield statements
+        event.remove(db.engine, "before_cursor_execute", _record)
+    user_cache.clear()
+
+
+def test_user_loader_only_queries_on_a_miss(app, queries):
+    user = User(username="ada", email="ada@example.com")
+    user.save()
+    user_id = user.id
+    # A new request starts with an empty session
+    db.session.remove()
+    load_user = app.login_manager._user_callback
+
+    del queries[:]
+    first = load_user(str(user_id))
+    assert len(queries) == 1
+    assert isinstance(first, CachedUser) and first.is_authenticated
+    assert first.get_id() == str(user_id)
+
+    del queries[:]
+    assert load_user(str(user_id)) is first
+    assert queries == []
+    assert user_cache.stats()["hits"] == 1
+
+
+def test_writes_invalidate_the_cached_user(app, queries):
+    user = User(username="ada", email="ada@example.com")
+    user.save()
+    assert User.get_cached(user.id).email == "ada@example.com"
+
+    user.email = "lovelace@example.com"
+    user.update()
+    assert User.get_cached(user.id).email == "lovelace@example.com"
+
+    user_id = user.id
+    user.delete()
+    assert User.get_cached(user_id) is None
+    assert user_cache.stats()["invalidations"] == 2
+
+
+def test_entries_expire_and_are_evicted(monkeypatch):
+    cache = UserCache(max_entries=2, ttl=10)
+    now = [100.0]
+    monkeypatch.setattr("time.monotonic", lambda: now[0])
+    for i in range(3):
+        cache.put(CachedUser(i, f"user{i}", f"user{i}@example.com"))
+    assert cache.get(0) is None
+    assert cache.get(1).username == "user1"
+
+    now[0] += 10
+    assert cache.get(1) is None
+    stats = cache.stats()
+    assert (stats["evictions"], stats["expirations"], stats["entries"]) == (1, 1, 1)
+
+
+def test_load_racing_an_invalidation_is_not_cached():
+    cache = UserCache()
+
+    def _load(user_id):
+        # The user changes while its old record is being loaded
+        cache.invalidate(user_id)
+        return CachedUser(user_id, "stale", "stale@example.com")
+
+    assert cache.get_or_load(1, _load).username == "stale"
+    assert cache.get(1) is None
+
+
+def test_user_cache_stats_route(client, admin_client):
+    assert client.get(f"{AUTH_ROOT}/users/cache/stats").status_code == 401
+    stats = admin_client.get(f"{AUTH_ROOT}/users/cache/stats").get_json()
+    assert set(stats) >= {"hits", "misses", "hit_rate", "entries", "ttl"}
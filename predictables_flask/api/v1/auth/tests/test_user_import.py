@@ -0,0 +1,140 @@
+import json
+
+import pytest
+from sqlalchemy import event
+
+from predictables_flask.models.db import db
+from predictables_flask.models.password_hasher import check_password
+from predictables_flask.models.User import User
+from predictables_flask.models.user_import import import_users, read_user_records
+
+from .conftest import AUTH_ROOT, create_user, log_in
+
+
+def _users(n, start=0):
+    return [
+        {
+            "username": f"user{i}",
+            "email": f"user{i}@example.com",
+            "password": f"password-{i}",
+        }
+        for i in range(start, start + n)
+    ]
+
+
+def test_import_batches_queries_and_reports_bad_rows(app):
+    records = _users(25)
+    records[3]["email"] = "not-an-email"
+    records[7]["password"] = "short"
+    records[9]["username"] = "user1"  # duplicate within the batch
+    with app.app_context():
+        User(username="user12", email="taken@example.com").save()
+        records[20]["email"] = "taken@example.com"
+
+        statements = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", _record)
+        try:
+            report = import_users(records, batch_size=10)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _record)
+
+        failed = {error["row"]: error["error"] for error in report["errors"]}
+        assert sorted(failed) == [3, 7, 9, 12, 20]
+        assert failed[12] == "User already exists"
+        assert failed[20] == "Email already exists"
+        assert (report["n_rows"], report["n_created"], report["n_failed"]) == (25, 20, 5)
+        # Two uniqueness lookups, then one executemany per chunk of 10
+        inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+        assert len(statements) == 2 + len(inserts) and len(inserts) <= 3
+
+        user = User.get_by_username("user24")
+        assert check_password(user.password_hash, "password-24")
+        assert User.query.count() == 21
+
+
+def test_rows_without_a_password_need_a_flag(app):
+    records = _users(2)
+    del records[1]["password"]
+    with app.app_context():
+        report = import_users(records)
+        assert report["n_created"] == 1
+        assert report["errors"] == [
+            {"row": 1, "username": "user1", "error": "Password is empty"}
+        ]
+
+        report = import_users(records, allow_missing_password=True)
+        assert report["n_created"] == 1
+        assert User.get_by_username("user1").password_hash is None
+
+
+def test_chunk_losing_a_race_falls_back_to_single_rows(app, monkeypatch):
+    with app.app_context():
+        # A user registered between the lookups and the insert
+        monkeypatch.setattr(
+            "predictables_flask.models.user_import._find_existing",
+            lambda column, values: set(),
+        )
+        User(username="user2", email="user2@example.com").save()
+        report = import_users(_users(5), batch_size=5)
+        assert report["n_created"] == 4
+        assert [error["row"] for error in report["errors"]] == [2]
+        assert User.query.count() == 5
+
+
+def test_read_user_records():
+    rows = read_user_records(b"username,email\nada,ada@example.com\n", "csv")
+    assert rows == [{"username": "ada", "email": "ada@example.com"}]
+    assert read_user_records('{"users": [{"username": "ada"}]}', "json") == [
+        {"username": "ada"}
+    ]
+    with pytest.raises(ValueError):
+        read_user_records("{}", "json")
+    with pytest.raises(ValueError):
+        read_user_records("", "xml")
+
+
+def test_import_route_and_cli(app, admin_client, tmp_path):
+    csv = "username,email,password\nada,ada@example.com,analytical-engine\n,x@y.z,\n"
+    response = admin_client.post(
+        f"{AUTH_ROOT}/users/import", data=csv, content_type="text/csv"
+    )
+    assert response.status_code == 200
+    assert response.get_json()["n_created"] == 1
+    assert response.get_json()["errors"][0]["error"] == "Username is empty"
+
+    bad = admin_client.post(f"{AUTH_ROOT}/users/import?format=json", data="[1, 2]")
+    assert bad.status_code == 400
+
+    filename = tmp_path / "users.json"
+    filename.write_text(json.dumps(_users(3)))
+    result = app.test_cli_runner().invoke(args=["users", "import", str(filename)])
+    assert result.exit_code == 0, result.output
+    assert "Created 3 of 3 users" in result.output
+
+
+def test_import_route_requires_an_admin(app, client):
+    csv = "username,email,password\nada,ada@example.com,analytical-engine\n"
+    response = client.post(f"{AUTH_ROOT}/users/import", data=csv, content_type="text/csv")
+    assert response.status_code == 401
+
+    with app.app_context():
+        create_user("grace")
+    log_in(client, "grace")
+    response = client.post(f"{AUTH_ROOT}/users/import", data=csv, content_type="text/csv")
+    assert response.status_code == 403
+    with app.app_context():
+        assert User.get_by_username("ada") is None
+
+    # The admin role is only granted from the command line
+    result = app.test_cli_runner().invoke(args=["users", "set-admin", "grace"])
+    assert result.exit_code == 0, result.output
+    response = client.post(f"{AUTH_ROOT}/users/import", data=csv, content_type="text/csv")
+    assert response.status_code == 200
+
+    assert client.post(f"{AUTH_ROOT}/logout").status_code == 200
+    response = client.post(f"{AUTH_ROOT}/users/import", data=csv, content_type="text/csv")
+    assert response.status_code == 401
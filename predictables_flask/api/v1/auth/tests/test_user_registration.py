@@ -0,0 +1,95 @@
+import pytest
+from flask import request
+from sqlalchemy import event, inspect
+
+from predictables_flask.api.v1.auth.src.register import register
+from predictables_flask.models.db import db
+from predictables_flask.models.User import User
+
+from .conftest import AUTH_ROOT
+
+
+@pytest.fixture
+def queries(app):
+    # The SQL statements run against the database, while the fixture is active
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        User(username="ada", email="ada@example.com").create()
+        event.listen(db.engine, "before_cursor_execute", _record)
+        yield statements
+        event.remove(db.engine, "before_cursor_execute", _record)
+
+
+@pytest.mark.parametrize(
+    "username, email, expected",
+    [
+        ("grace", "grace@example.com", True),
+        ("ada", "grace@example.com", False),
+        ("grace", "ada@example.com", False),
+        ("ada", "ada@example.com", False),
+    ],
+)
+def test_username_and_email_are_checked_in_one_query(queries, username, email, expected):
+    user = User()
+    assert user.validate_username_and_email_before_adding_new_user(username, email) is expected
+    assert len(queries) == 1
+    assert " OR " in queries[0]
+
+
+def test_invalid_emails_do_not_query(queries):
+    assert not User().validate_username_and_email_before_adding_new_user("grace", "grace")
+    assert queries == []
+
+
+def test_users_have_unique_indexes(app):
+    with app.app_context():
+        indexes = {
+            tuple(index["column_names"]): index["unique"]
+            for index in inspect(db.engine).get_indexes("users")
+        }
+    assert indexes[("username",)] and indexes[("email",)]
+
+
+def test_concurrent_registration_fails_on_the_unique_index(app):
+    with app.app_context():
+        User(username="ada", email="ada@example.com").create()
+        with pytest.raises(ValueError, match="already exists"):
+            User(username="ada", email="other@example.com").create()
+        # The session is usable after the rollback
+        assert User.query.count() == 1
+
+
+def test_register(app, monkeypatch):
+    body = {
+        "username": "grace",
+        "email": "grace@example.com",
+        "password": "cobol-1959",
+        # Ignored: registering never makes an admin
+        "is_admin": True,
+    }
+    with app.test_request_context(json=body):
+        response, status = register(request)
+        assert status == 201
+        assert User.get_by_username("grace").check_password("cobol-1959")
+        assert not User.get_by_username("grace").is_admin
+
+        response, status = register(request)
+        assert status == 400
+
+        # A registration that passed the check, but lost the race to the insert
+        monkeypatch.setattr(
+            User,
+            "validate_username_and_email_before_adding_new_user",
+            lambda self, username, email: True,
+        )
+        response, status = register(request)
+        assert status == 409
+
+
+@pytest.mark.parametrize("route", ["/password/change", "/password/reset"])
+def test_password_routes_are_not_implemented(client, route):
+    assert client.post(f"{AUTH_ROOT}{route}").status_code == 501
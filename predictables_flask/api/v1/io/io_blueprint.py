@@ -1,22 +1,80 @@
-import pandas as pd
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, url_for
 
 io_blueprint = Blueprint("io", __name__)
 
 
 @io_blueprint.route("/sample-data/<ds_name>", methods=["GET"])
 @io_blueprint.route("/sample-data/<ds_name>/<orient>", methods=["GET"])
-def sample_data(ds_name, orient="split"):
-    from .src.sample_data import get_sample_data
+def sample_data(ds_name, orient=None):
+    from .src.negotiate_format import TEXT_FORMATS, negotiate_format
+    from .src.sample_data import get_sample_data, get_sample_data_as
+    from .src.stream_sample_data import stream_sample_data
+    from .src.table_query import parse_table_query
 
-    return get_sample_data(ds_name.replace("-", "_"), orient)
+    try:
+        fmt = negotiate_format(request)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 406
+    try:
+        query = parse_table_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    # Binary formats are encoded whole, whether or not a stream was asked for
+    if fmt not in TEXT_FORMATS:
+        return get_sample_data_as(ds_name.replace("-", "_"), fmt, query)
+    stream = request.args.get("stream", "false").lower() in ["true", "1"]
+    if fmt == "ndjson" or stream:
+        # Streams default to an orient they can be produced in
+        return stream_sample_data(
+            ds_name.replace("-", "_"),
+            orient or "records",
+            request.args.get("batch_size", None, type=int),
+            query,
+            fmt,
+        )
+    return get_sample_data(ds_name.replace("-", "_"), orient or "split", query)
+
+
+@io_blueprint.route("/data/sample/<dataset_name>", methods=["GET"])
+def sample_dataset(dataset_name):
+    from .src.negotiate_format import negotiate_format
+    from .src.sample_dataset import get_dataset_sample
+    from .src.table_query import parse_table_query
+
+    try:
+        fmt = negotiate_format(request)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 406
+    try:
+        query = parse_table_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return get_dataset_sample(
+        dataset_name.replace("-", "_"),
+        mode=request.args.get("mode", "uniform").lower(),
+        fraction=request.args.get("fraction", None, type=float),
+        n=request.args.get("n", None, type=int),
+        by=request.args.get("by", None),
+        seed=request.args.get("seed", None, type=int),
+        query=query,
+        fmt=fmt,
+        orient=request.args.get("orient", "records"),
+    )
+
+
+@io_blueprint.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    from .src.sample_data_cache import sample_data_cache
+
+    return jsonify(sample_data_cache.stats())
 
 
 @io_blueprint.route("/data/get-chunk-count/<dataset_name>/<df>", methods=["GET"])
 @io_blueprint.route("/data/get-chunk-count/<dataset_name>", methods=["GET"])
 def get_n_chunks(dataset_name=None, df=None):
+    from .src.chunk_plan import plan_dataset_chunks
+    from .src.dataset_catalog import get_dataset_info
     from .src.get_chunk_count import get_chunk_count
-    from .src.sample_data import get_sample_data
 
     if (
         (df is None and dataset_name is None)
@@ -26,34 +84,279 @@ def get_n_chunks(dataset_name=None, df=None):
         return jsonify(
             dataset="none", n_chunks=0, error="No dataset name or dataframe provided"
         )
-    elif df is not None and dataset_name is not None:
-        return jsonify(dataset=dataset_name, n_chunks=get_chunk_count(df))
     elif df is not None:
-        return jsonify(dataset="no_name", n_chunks=get_chunk_count(df))
+        # The dataframe is named by a dataset in the data folder
+        try:
+            n_chunks = get_chunk_count(df.replace("-", "_"))
+        except FileNotFoundError:
+            return (
+                jsonify(
+                    dataset=dataset_name or "no_name",
+                    n_chunks=0,
+                    error=f"Dataset {df} was not found",
+                ),
+                404,
+            )
+        return jsonify(dataset=dataset_name or "no_name", n_chunks=n_chunks)
     else:
-        if dataset_name in ["breast-cancer", "california-housing"]:
-            dataset_name = dataset_name.replace("-", "_")
-            df = get_sample_data(dataset_name).response[0].decode("utf-8")
-            df = pd.read_json(df)
-            return jsonify(dataset=dataset_name, n_chunks=get_chunk_count(df))
-        else:
-            return jsonify(
-                dataset=dataset_name,
-                n_chunks=0,
-                error=f"Dataset {dataset_name} was not found",
+        dataset_name = dataset_name.replace("-", "_")
+        try:
+            info = get_dataset_info(dataset_name)
+            plan = plan_dataset_chunks(dataset_name)
+        except FileNotFoundError:
+            return (
+                jsonify(
+                    dataset=dataset_name,
+                    n_chunks=0,
+                    error=f"Dataset {dataset_name} was not found",
+                ),
+                404,
             )
+        return jsonify(
+            dataset=dataset_name,
+            n_chunks=plan.n_chunks,
+            n_rows=info["n_rows"],
+            n_bytes=info["n_bytes"],
+        )
 
 
-@io_blueprint.route("/data/chunk-dataset/<dataset_name>/<n_chunks>", methods=["GET"])
-def chunk_dataset(dataset_name):
-    from .src.dataframe_to_json_chunks import dataframe_to_json_chunks
-    from .src.get_chunk_count import get_chunk_count
+@io_blueprint.route("/datasets/<dataset_name>", methods=["GET"])
+def get_dataset(dataset_name):
+    from .src.dataset_catalog import get_dataset_info
 
-    n_chunks = get_chunk_count(dataset_name).get("n_chunks")
+    try:
+        return jsonify(get_dataset_info(dataset_name.replace("-", "_"))), 200
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+
+
+@io_blueprint.route("/data/summary/<dataset_name>", methods=["GET"])
+def get_summary(dataset_name):
+    from .src.summarize_dataset import get_dataset_summary
+    from .src.table_query import parse_table_query
 
-    # Run the chunking process
     try:
-        dataframe_to_json_chunks(dataset_name, n_chunks, write_json=True)
+        query = parse_table_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if query.filters:
+        return jsonify({"error": "Summaries cannot be filtered"}), 400
+    return get_dataset_summary(
+        dataset_name.replace("-", "_"),
+        list(query.columns) if query.columns is not None else None,
+    )
+
+
+@io_blueprint.route("/data/sketches/<dataset_name>", methods=["GET"])
+def get_sketches(dataset_name):
+    from .src.dataset_sketches import query_dataset_sketches
+    from .src.table_query import parse_table_query
+
+    try:
+        query = parse_table_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if query.filters:
+        return jsonify({"error": "Sketches cannot be filtered"}), 400
+    quantiles = None
+    if "q" in request.args:
+        try:
+            quantiles = [
+                float(q) for value in request.args.getlist("q") for q in value.split(",")
+            ]
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    return query_dataset_sketches(
+        dataset_name.replace("-", "_"),
+        list(query.columns) if query.columns is not None else None,
+        quantiles,
+    )
+
+
+@io_blueprint.route("/data/chunk/<dataset_name>/<int:i>", methods=["GET"])
+def get_chunk(dataset_name, i):
+    from .src.get_data import get_data
+    from .src.negotiate_format import negotiate_format
+    from .src.table_query import parse_table_query
+
+    try:
+        fmt = negotiate_format(request)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 406
+    try:
+        query = parse_table_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    stream = request.args.get("stream", "false").lower() in ["true", "1"]
+    return get_data(
+        dataset_name.replace("-", "_"), i, stream=stream, fmt=fmt, query=query
+    )
+
+
+@io_blueprint.route("/data/chunk-file/<dataset_name>/<int:i>", methods=["GET"])
+def get_chunk_file(dataset_name, i):
+    from .src.send_chunk_file import send_chunk_file
+
+    return send_chunk_file(dataset_name.replace("-", "_"), i, request.accept_encodings)
+
+
+@io_blueprint.route("/data/manifest/<dataset_name>", methods=["GET"])
+def get_manifest(dataset_name):
+    from .src.get_chunk_manifest import get_chunk_manifest
+
+    return get_chunk_manifest(dataset_name.replace("-", "_"))
+
+
+@io_blueprint.route("/upload", methods=["POST"])
+def upload():
+    from .src.upload_dataset import upload_file
+
+    return upload_file(request)
+
+
+@io_blueprint.route("/upload/initiate", methods=["POST"])
+def initiate_upload():
+    from .src.resumable_upload import initiate_upload
+
+    data = request.get_json(silent=True) or {}
+    try:
+        return jsonify(initiate_upload(data.get("filename", ""))), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@io_blueprint.route("/upload/<upload_id>/parts/<int:part_number>", methods=["PUT"])
+def upload_part(upload_id, part_number):
+    from .src.resumable_upload import upload_part
+
+    try:
+        part = upload_part(
+            upload_id,
+            part_number,
+            request.stream,
+            request.headers.get("X-Part-SHA256", None),
+        )
+        return jsonify(part), 200
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@io_blueprint.route("/upload/<upload_id>", methods=["GET"])
+def get_upload_status(upload_id):
+    from .src.resumable_upload import get_upload_status
+
+    try:
+        return jsonify(get_upload_status(upload_id)), 200
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+
+
+@io_blueprint.route("/upload/<upload_id>/complete", methods=["POST"])
+def complete_upload(upload_id):
+    from .src.ingest_upload import get_dataset_name, submit_ingest
+    from .src.resumable_upload import complete_upload
+
+    data = request.get_json(silent=True) or {}
+    try:
+        result = complete_upload(upload_id, data.get("parts", None))
+        result["dataset"] = get_dataset_name(result["filename"])
+        result["job_id"] = submit_ingest(result["filename"])["job_id"]
+        return jsonify(result), 200
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@io_blueprint.route("/upload/<upload_id>", methods=["DELETE"])
+def abort_upload(upload_id):
+    from .src.resumable_upload import abort_upload
+
+    try:
+        abort_upload(upload_id)
         return jsonify({"success": True}), 200
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+
+
+@io_blueprint.route("/data/ingest/<dataset_name>", methods=["GET"])
+def get_ingest_status(dataset_name):
+    from .src.ingest_upload import get_ingest_status
+
+    status = get_ingest_status(dataset_name.replace("-", "_"))
+    if status is None:
+        return jsonify({"error": f"No ingest found for dataset {dataset_name}"}), 404
+    return jsonify(status), 200
+
+
+@io_blueprint.route(
+    "/data/chunk-dataset/<dataset_name>/<int:n_chunks>", methods=["GET", "POST"]
+)
+@io_blueprint.route("/data/chunk-dataset/<dataset_name>", methods=["GET", "POST"])
+def chunk_dataset(dataset_name, n_chunks=None):
+    from .src.dataset_catalog import get_dataset_info
+    from .src.job_manager import job_manager
+
+    dataset_name = dataset_name.replace("-", "_")
+    try:
+        n_rows = get_dataset_info(dataset_name)["n_rows"]
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    if n_chunks is not None and not 1 <= n_chunks <= max(n_rows, 1):
+        return (
+            jsonify({"error": f"Cannot split {n_rows} rows into {n_chunks} chunks"}),
+            400,
+        )
+
+    # The conversion runs on the job pool; poll the job for its progress
+    job = job_manager.submit(
+        "chunk_dataset", {"ds_name": dataset_name, "n_chunks": n_chunks}
+    )
+    response = jsonify(job)
+    response.status_code = 202
+    response.headers["Location"] = url_for(".get_job", job_id=job["job_id"])
+    return response
+
+
+@io_blueprint.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    from .src.job_manager import job_manager
+
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} was not found"}), 404
+    return jsonify(job), 200
+
+
+@io_blueprint.route("/jobs/<job_id>/progress", methods=["GET"])
+def get_job_progress(job_id):
+    from .src.job_manager import job_manager
+
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} was not found"}), 404
+    return jsonify({"status": job["status"], **job["progress"]}), 200
+
+
+@io_blueprint.route("/jobs/<job_id>/result", methods=["GET"])
+def get_job_result(job_id):
+    from .src.job_manager import job_manager
+
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} was not found"}), 404
+    if job["status"] == "failed":
+        return jsonify({"status": job["status"], "error": job["error"]}), 500
+    if job["status"] != "done":
+        # Not finished yet: try again later
+        return jsonify({"status": job["status"]}), 202
+    return jsonify(job["result"]), 200
+
+
+@io_blueprint.after_request
+def add_vary_accept(response):
+    # Responses are negotiated on the Accept header, so caches must key on it
+    response.vary.add("Accept")
+    return response
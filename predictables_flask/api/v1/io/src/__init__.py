@@ -1,2 +1,3 @@
 from .get_chunk_count import get_chunk_count
 from .sample_data import get_sample_data
+from .sample_data_cache import SampleDataCache, sample_data_cache
@@ -0,0 +1,116 @@
+import os
+import re
+import uuid
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from flask import current_app, has_app_context
+
+from .sample_data_cache import sample_data_cache
+
+DEFAULT_ARROW_FOLDER = "./api/v1/io/data/arrow"
+
+
+def use_arrow_store() -> bool:
+    """
+    Check whether datasets are served from the memory-mapped Arrow store
+    (`IO_USE_ARROW_STORE` in the app config).
+    """
+    return has_app_context() and current_app.config.get("IO_USE_ARROW_STORE", False)
+
+
+def get_arrow_folder() -> str:
+    """
+    Get the folder the Arrow IPC copies of the datasets are written to
+    (`IO_ARROW_FOLDER` in the app config).
+    """
+    if has_app_context():
+        return current_app.config.get("IO_ARROW_FOLDER", DEFAULT_ARROW_FOLDER)
+    return DEFAULT_ARROW_FOLDER
+
+
+def open_arrow_table(ds_name: str, filename: str, version: tuple) -> pa.Table:
+    """
+    Open a dataset as a memory-mapped Arrow table.
+
+    The parquet file is converted to an Arrow IPC file the first time each
+    version of it is opened. The IPC file is then memory-mapped, so the
+    table's buffers are pages of the OS page cache rather than heap memory:
+    every worker process that opens the dataset shares one copy, and slicing
+    the table reads only the pages it touches.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+    filename : str
+        The path to the parquet file.
+    version : tuple
+        The version of the parquet file, as returned by `get_file_version`.
+
+    Returns
+    -------
+    table : pa.Table
+        The memory-mapped (immutable) table.
+    """
+
+    def _load():
+        arrow_filename = get_arrow_filename(ds_name, version)
+        if not os.path.exists(arrow_filename):
+            convert_to_arrow(filename, arrow_filename)
+            _remove_old_versions(ds_name, arrow_filename)
+        with pa.memory_map(arrow_filename, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        # The mapping is not heap memory, so it does not count against the budget
+        return table, 0
+
+    return sample_data_cache.get_or_load(("mmap", ds_name, version), _load)
+
+
+def convert_to_arrow(parquet_filename: str, arrow_filename: str) -> None:
+    """
+    Convert a parquet file to an Arrow IPC file, one row group at a time.
+
+    The file is written under a temporary name and renamed into place, so
+    concurrent readers only ever map a complete file.
+
+    Parameters
+    ----------
+    parquet_filename : str
+        The path to the parquet file.
+    arrow_filename : str
+        The path to write the Arrow IPC file to.
+    """
+    os.makedirs(os.path.dirname(arrow_filename) or ".", exist_ok=True)
+    tmp_filename = f"{arrow_filename}.{os.getpid()}-{uuid.uuid4().hex}.tmp"
+    parquet_file = pq.ParquetFile(parquet_filename)
+    try:
+        with pa.ipc.new_file(tmp_filename, parquet_file.schema_arrow) as writer:
+            for i in range(parquet_file.num_row_groups):
+                writer.write_table(parquet_file.read_row_group(i))
+        os.replace(tmp_filename, arrow_filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+
+def get_arrow_filename(ds_name: str, version: tuple) -> str:
+    """
+    Get the path of the Arrow IPC copy of a version of a dataset,
+    eg. 'california_housing.1703170000000000000-52113.arrow'.
+    """
+    mtime_ns, size = version
+    return os.path.join(get_arrow_folder(), f"{ds_name}.{mtime_ns}-{size}.arrow")
+
+
+def _remove_old_versions(ds_name: str, arrow_filename: str) -> None:
+    # Processes that still map an old version keep reading it after the unlink
+    folder = os.path.dirname(arrow_filename)
+    pattern = re.compile(rf"^{re.escape(ds_name)}\.\d+-\d+\.arrow$")
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if pattern.match(name) and path != arrow_filename:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
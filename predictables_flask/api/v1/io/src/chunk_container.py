@@ -0,0 +1,238 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import uuid
+from collections import deque
+from functools import lru_cache
+from typing import BinaryIO, Callable, Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+from .chunk_plan import ChunkPlan
+from .compress_chunk import CONTENT_ENCODINGS, compress_chunk
+from .dataframe_to_json_chunks import EXECUTORS, get_chunk_pool
+from .get_file_version import get_file_version
+
+CONTAINER_MAGIC = b"PCHUNKS1"
+
+# The end of a container: the byte length of the index, then the magic again
+_TRAILER = struct.Struct("<Q8s")
+
+
+def write_chunk_container(
+    df: pd.DataFrame,
+    dataset_name: str,
+    output_dir: str = ".",
+    plan: ChunkPlan = None,
+    max_workers: int = None,
+    executor: str = "process",
+    encodings: Iterable[str] = None,
+    progress: Callable = None,
+    version: tuple = None,
+) -> dict:
+    """
+    Write the JSON chunks of a dataframe to a single container file.
+
+    A container is the magic bytes, every chunk's JSON ('records' orient) and
+    compressed variants back to back, then an index of their offsets, byte
+    sizes and SHA-256 hashes, and a fixed-size trailer locating the index.
+    Serving a chunk is a lookup in the (cached) index and one read of a
+    memory-mapped file, and a dataset's chunks take one inode however many
+    there are. The container is written under a temporary name and renamed
+    into place, so re-chunking a dataset atomically replaces the previous one.
+
+    Chunks are serialized and compressed on the `executor` pool, and appended
+    in order as they finish; at most two per worker are held in memory.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The pandas DataFrame to split.
+    dataset_name : str
+        The name of the dataset.
+    output_dir : str, optional
+        The folder to write the container to. Default is the current working directory.
+    plan : ChunkPlan, optional
+        The row ranges of the chunks. Default is None, which splits the
+        dataframe into 20 balanced chunks.
+    max_workers : int, optional
+        The size of the worker pool. Default is None, which lets the executor pick.
+    executor : str, optional
+        Either 'thread' or 'process' (see `get_chunk_pool`). Default is
+        'process', as serializing a chunk holds the GIL.
+    encodings : iterable of str, optional
+        The compressed variants to write, from `CONTENT_ENCODINGS`. Default is
+        None, which writes every available variant.
+    progress : callable, optional
+        Called with the number of chunks written so far and the number of chunks.
+    version : tuple, optional
+        The version of the parquet file the dataframe was read from (see
+        `get_file_version`), recorded in the index. Default is None.
+
+    Returns
+    -------
+    manifest : dict
+        The index of the container (see `read_chunk_container_index`).
+    """
+    if plan is None:
+        plan = ChunkPlan(len(df), max(1, min(20, len(df))))
+    elif plan.n_rows != len(df):
+        raise ValueError(
+            f"The plan covers {plan.n_rows} rows, but the dataframe has {len(df)}"
+        )
+    if executor not in EXECUTORS:
+        raise ValueError(
+            f"Unknown executor `{executor}`. Use one of {list(EXECUTORS)}."
+        )
+    encodings = list(CONTENT_ENCODINGS if encodings is None else encodings)
+
+    os.makedirs(output_dir, exist_ok=True)
+    filename = get_chunk_container_filename(dataset_name, output_dir)
+    tmp_filename = f"{filename}.{os.getpid()}-{uuid.uuid4().hex}.tmp"
+    entries = []
+    try:
+        with get_chunk_pool(executor, max_workers) as pool, open(
+            tmp_filename, "wb"
+        ) as f:
+            f.write(CONTAINER_MAGIC)
+            ranges = iter(plan)
+            pending = deque()
+            window = 2 * (max_workers or os.cpu_count() or 1)
+            while True:
+                while len(pending) < window:
+                    row_range = next(ranges, None)
+                    if row_range is None:
+                        break
+                    start, stop = row_range
+                    future = pool.submit(_encode_chunk, df.iloc[start:stop], encodings)
+                    pending.append((row_range, future))
+                if not pending:
+                    break
+
+                (start, stop), future = pending.popleft()
+                data, variants = future.result()
+                entries.append(
+                    {
+                        "chunk": len(entries),
+                        "start": start,
+                        "stop": stop,
+                        **_append(f, data),
+                        "variants": {
+                            encoding: _append(f, compressed)
+                            for encoding, compressed in variants.items()
+                        },
+                    }
+                )
+                if progress is not None:
+                    progress(len(entries), plan.n_chunks)
+
+            manifest = {
+                "dataset": dataset_name,
+                "n_rows": plan.n_rows,
+                "n_chunks": plan.n_chunks,
+                "container": os.path.basename(filename),
+                "version": list(version) if version is not None else None,
+                "chunks": entries,
+            }
+            index = json.dumps(manifest).encode("utf-8")
+            f.write(index)
+            f.write(_TRAILER.pack(len(index), CONTAINER_MAGIC))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+    return manifest
+
+
+def read_chunk_container_index(filename: str) -> dict:
+    """
+    Read the index of a chunk container.
+
+    Returns
+    -------
+    manifest : dict
+        The dataset name, its number of rows and chunks, the container's
+        filename, the version of the parquet file it was written from, and for
+        each chunk its row range, offset, byte size, SHA-256 hash and
+        compressed variants (each with its own offset, size and hash). None if
+        there is no container.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a (complete) chunk container.
+    """
+    try:
+        return open_chunk_container(filename)[0]
+    except FileNotFoundError:
+        return None
+
+
+def open_chunk_container(filename: str) -> Tuple[dict, mmap.mmap]:
+    """
+    Open a chunk container, once per version of the file.
+
+    The container is memory-mapped and shared by every request, so reading a
+    chunk is a slice of the map (a copy out of the page cache), without an
+    open() or a seek. The index and the map come from the same open file, so
+    their offsets agree even if the container is replaced in between.
+
+    Returns
+    -------
+    index : dict
+        The index of the container (see `read_chunk_container_index`). It is
+        shared between requests and must not be modified.
+    data : mmap.mmap
+        The read-only map of the whole container.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no container.
+    ValueError
+        If the file is not a (complete) chunk container.
+    """
+    return _open_container(filename, *get_file_version(filename))
+
+
+def get_chunk_container_filename(dataset_name: str, output_dir: str = ".") -> str:
+    """
+    Get the filename of a dataset's chunk container, eg. 'california_housing.chunks'.
+    """
+    return os.path.join(output_dir, f"{dataset_name}.chunks")
+
+
+def _encode_chunk(chunk: pd.DataFrame, encodings: List[str]) -> Tuple[bytes, Dict]:
+    data = chunk.to_json(orient="records").encode("utf-8")
+    return data, {encoding: compress_chunk(data, encoding) for encoding in encodings}
+
+
+def _append(f: BinaryIO, data: bytes) -> dict:
+    offset = f.tell()
+    f.write(data)
+    return {
+        "offset": offset,
+        "n_bytes": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+@lru_cache(maxsize=16)
+def _open_container(filename: str, mtime_ns: int, size: int) -> Tuple[dict, mmap.mmap]:
+    # mtime_ns and size are only part of the cache key. A replaced container
+    # keeps its old inode mapped until it falls out of the cache.
+    with open(filename, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    size = len(data)
+    if size < len(CONTAINER_MAGIC) + _TRAILER.size:
+        raise ValueError(f"{filename} is not a chunk container")
+    index_size, magic = _TRAILER.unpack(data[size - _TRAILER.size :])
+    if magic != CONTAINER_MAGIC or data[: len(CONTAINER_MAGIC)] != CONTAINER_MAGIC:
+        raise ValueError(f"{filename} is not a chunk container")
+    index_start = size - _TRAILER.size - index_size
+    return json.loads(data[index_start : size - _TRAILER.size]), data
@@ -0,0 +1,106 @@
+from typing import Callable
+
+import pandas as pd
+from flask import current_app
+
+from .chunk_container import (
+    get_chunk_container_filename,
+    read_chunk_container_index,
+    write_chunk_container,
+)
+from .chunk_plan import ChunkPlan, plan_dataset_chunks
+from .dataframe_to_json_chunks import dataframe_to_json_chunks, read_json_chunk_manifest
+from .dataset_sketches import build_dataset_sketches, load_dataset_sketches
+from .get_chunk_folder import get_chunk_folder
+from .get_dataset_metadata import get_dataset_metadata
+from .get_file_version import get_file_version
+from .get_parquet_filename import get_parquet_filename
+
+
+def chunk_dataset(
+    ds_name: str, n_chunks: int = None, progress: Callable = None
+) -> dict:
+    """
+    Write a dataset's JSON chunks to the chunk folder, unless a complete set
+    of chunks is already there, and build its quantile and distinct-count
+    sketches unless they are up to date.
+
+    This is the body of the 'chunk_dataset' job; it runs on the job pool, not
+    in a request. Chunks are serialized with the `IO_CHUNK_EXECUTOR` pool
+    ('thread' or 'process') of `IO_CHUNK_MAX_WORKERS` workers. With
+    `IO_CHUNK_LAYOUT` 'container' (the default), they are written to a single
+    container file (see `write_chunk_container`). With 'files', each chunk is
+    a file of its own, next to a manifest (see `dataframe_to_json_chunks`).
+    Either way the chunks are rewritten when the number of chunks or the
+    parquet file changes.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+    n_chunks : int, optional
+        The number of chunks. Default is None, which uses `plan_dataset_chunks`.
+    progress : callable, optional
+        Called with the number of chunks written so far and the total.
+
+    Returns
+    -------
+    dict
+        The dataset name, and its number of rows, chunks and JSON bytes.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no parquet file for the dataset.
+    """
+    if n_chunks is None:
+        plan = plan_dataset_chunks(ds_name)
+    else:
+        plan = ChunkPlan(get_dataset_metadata(ds_name)["n_rows"], n_chunks)
+
+    config = current_app.config
+    output_dir = get_chunk_folder()
+    version = get_file_version(get_parquet_filename(ds_name))
+    if config.get("IO_CHUNK_LAYOUT", "container") == "container":
+        manifest = read_chunk_container_index(
+            get_chunk_container_filename(ds_name, output_dir)
+        )
+        if (
+            manifest is None
+            or manifest["n_chunks"] != plan.n_chunks
+            or manifest["version"] != list(version)
+        ):
+            manifest = write_chunk_container(
+                pd.read_parquet(get_parquet_filename(ds_name)),
+                ds_name,
+                output_dir,
+                plan=plan,
+                max_workers=config.get("IO_CHUNK_MAX_WORKERS", None),
+                executor=config.get("IO_CHUNK_EXECUTOR", "process"),
+                progress=progress,
+                version=version,
+            )
+    else:
+        manifest = read_json_chunk_manifest(ds_name, plan.n_chunks, output_dir)
+        if manifest is None or manifest.get("version") != list(version):
+            dataframe_to_json_chunks(
+                pd.read_parquet(get_parquet_filename(ds_name)),
+                dataset_name=ds_name,
+                output_dir=output_dir,
+                max_workers=config.get("IO_CHUNK_MAX_WORKERS", None),
+                executor=config.get("IO_CHUNK_EXECUTOR", "process"),
+                return_json=False,
+                plan=plan,
+                progress=progress,
+                version=version,
+            )
+            manifest = read_json_chunk_manifest(ds_name, plan.n_chunks, output_dir)
+    if load_dataset_sketches(ds_name) is None:
+        build_dataset_sketches(ds_name)
+
+    return {
+        "dataset": ds_name,
+        "n_rows": plan.n_rows,
+        "n_chunks": plan.n_chunks,
+        "n_bytes": sum(chunk["n_bytes"] for chunk in manifest["chunks"]),
+    }
@@ -0,0 +1,204 @@
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+from flask import current_app, has_app_context
+
+from .get_file_version import get_file_version
+from .get_parquet_filename import get_parquet_filename
+
+DEFAULT_TARGET_CHUNK_BYTES = 4 * 1024 * 1024
+DEFAULT_SAMPLE_ROWS = 1000
+
+
+@dataclass(frozen=True)
+class ChunkPlan:
+    """
+    A split of `n_rows` rows into `n_chunks` contiguous, balanced row ranges.
+
+    Chunk sizes differ by at most one row: the remainder is spread evenly
+    instead of being added to the last chunk. The same plan is shared by the
+    chunk writer, the on-demand chunk route and the chunk sender, so all of
+    them agree on which rows belong to chunk i.
+    """
+
+    n_rows: int
+    n_chunks: int
+
+    def __post_init__(self):
+        if self.n_chunks < 1 or (self.n_rows > 0 and self.n_chunks > self.n_rows):
+            raise ValueError(
+                f"Cannot split {self.n_rows} rows into {self.n_chunks} chunks"
+            )
+
+    def __len__(self) -> int:
+        return self.n_chunks
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return (self.row_range(i) for i in range(self.n_chunks))
+
+    def row_range(self, i: int) -> Tuple[int, int]:
+        """
+        Get the rows covered by chunk i.
+
+        Parameters
+        ----------
+        i : int
+            The index of the chunk, starting at 0.
+
+        Returns
+        -------
+        start, stop : tuple of int
+            The index of the first row of the chunk, and one past its last row.
+        """
+        if not 0 <= i < self.n_chunks:
+            raise IndexError(f"Chunk {i} is out of range for {self.n_chunks} chunks")
+        return (
+            i * self.n_rows // self.n_chunks,
+            (i + 1) * self.n_rows // self.n_chunks,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "n_rows": self.n_rows,
+            "n_chunks": self.n_chunks,
+            "row_ranges": [list(r) for r in self],
+        }
+
+
+def plan_chunks(
+    n_rows: int, bytes_per_row: float, target_chunk_bytes: int = None
+) -> ChunkPlan:
+    """
+    Plan chunks so that each one serializes to roughly `target_chunk_bytes`.
+
+    Parameters
+    ----------
+    n_rows : int
+        The number of rows to split.
+    bytes_per_row : float
+        The estimated serialized size of one row, in bytes.
+    target_chunk_bytes : int, optional
+        The target size of one chunk, in bytes. Default is None, which uses
+        `IO_TARGET_CHUNK_BYTES` from the app config.
+
+    Returns
+    -------
+    ChunkPlan
+        The plan, with between 1 and `n_rows` chunks.
+    """
+    if target_chunk_bytes is None:
+        target_chunk_bytes = _get_target_chunk_bytes()
+    n_chunks = math.ceil(n_rows * bytes_per_row / target_chunk_bytes)
+    return ChunkPlan(n_rows, max(1, min(n_chunks, n_rows)))
+
+
+def estimate_json_bytes_per_row(sample: pd.DataFrame) -> float:
+    """
+    Estimate the size of one row serialized as a JSON record.
+
+    Parameters
+    ----------
+    sample : pd.DataFrame
+        A sample of the rows to estimate from.
+
+    Returns
+    -------
+    float
+        The average number of bytes per row, or 0.0 for an empty sample.
+    """
+    if len(sample) == 0:
+        return 0.0
+    return len(sample.to_json(orient="records").encode("utf-8")) / len(sample)
+
+
+def plan_dataframe_chunks(
+    df: pd.DataFrame,
+    target_chunk_bytes: int = None,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+) -> ChunkPlan:
+    """
+    Plan the chunks of a DataFrame from a sample of its rows.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The pandas DataFrame to split.
+    target_chunk_bytes : int, optional
+        The target size of one chunk, in bytes. Default is None, which uses
+        `IO_TARGET_CHUNK_BYTES` from the app config.
+    sample_rows : int, optional
+        The number of rows to sample when estimating the row size. Default is 1000.
+
+    Returns
+    -------
+    ChunkPlan
+        The plan for the DataFrame.
+    """
+    if len(df) > sample_rows:
+        sample = df.sample(n=sample_rows, random_state=0)
+    else:
+        sample = df
+    return plan_chunks(len(df), estimate_json_bytes_per_row(sample), target_chunk_bytes)
+
+
+def plan_dataset_chunks(
+    ds_name: str,
+    target_chunk_bytes: int = None,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+) -> ChunkPlan:
+    """
+    Plan the chunks of a dataset, reading only its footer and a sample of rows.
+
+    The plan is memoized per version of the parquet file.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+    target_chunk_bytes : int, optional
+        The target size of one chunk, in bytes. Default is None, which uses
+        `IO_TARGET_CHUNK_BYTES` from the app config.
+    sample_rows : int, optional
+        The number of rows to sample when estimating the row size. Default is 1000.
+
+    Returns
+    -------
+    ChunkPlan
+        The plan for the dataset.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no parquet file for the dataset.
+    """
+    if target_chunk_bytes is None:
+        target_chunk_bytes = _get_target_chunk_bytes()
+    filename = get_parquet_filename(ds_name)
+    return _plan_parquet_chunks(
+        filename, *get_file_version(filename), target_chunk_bytes, sample_rows
+    )
+
+
+@lru_cache(maxsize=256)
+def _plan_parquet_chunks(
+    filename: str, mtime_ns: int, size: int, target_chunk_bytes: int, sample_rows: int
+) -> ChunkPlan:
+    # mtime_ns and size are only part of the cache key
+    parquet_file = pq.ParquetFile(filename)
+    sample = next(parquet_file.iter_batches(batch_size=sample_rows), None)
+    bytes_per_row = (
+        estimate_json_bytes_per_row(sample.to_pandas()) if sample is not None else 0.0
+    )
+    return plan_chunks(
+        parquet_file.metadata.num_rows, bytes_per_row, target_chunk_bytes
+    )
+
+
+def _get_target_chunk_bytes() -> int:
+    if has_app_context():
+        return current_app.config.get("IO_TARGET_CHUNK_BYTES", DEFAULT_TARGET_CHUNK_BYTES)
+    return DEFAULT_TARGET_CHUNK_BYTES
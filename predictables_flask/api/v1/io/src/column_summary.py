@@ -0,0 +1,134 @@
+import math
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+@dataclass(frozen=True)
+class ColumnSummary:
+    """
+    Mergeable summary statistics of (part of) a column.
+
+    `count` is the number of non-null values; NaNs count as nulls. The mean
+    and the sum of squared deviations from it (`m2`) are only tracked for
+    numeric columns. Two summaries of disjoint parts of a column merge into
+    the summary of their union with `merge` (Chan et al.'s parallel form of
+    Welford's algorithm), so a column can be summarized part by part and the
+    parts combined in any order.
+    """
+
+    count: int = 0
+    null_count: int = 0
+    mean: float = None
+    m2: float = None
+    min: Any = None
+    max: Any = None
+
+    @classmethod
+    def from_array(cls, array: pa.ChunkedArray) -> "ColumnSummary":
+        """
+        Summarize an Arrow array with vectorized NumPy (and Arrow) kernels.
+        """
+        is_numeric = (
+            pa.types.is_integer(array.type)
+            or pa.types.is_floating(array.type)
+            or pa.types.is_boolean(array.type)
+        )
+        if not is_numeric:
+            try:
+                min_max = pc.min_max(array)
+                low, high = min_max["min"].as_py(), min_max["max"].as_py()
+            except pa.ArrowNotImplementedError:
+                # Eg. nested types, which have no order
+                low = high = None
+            return cls(
+                count=len(array) - array.null_count,
+                null_count=array.null_count,
+                min=low,
+                max=high,
+            )
+
+        values = pc.drop_null(array).to_numpy(zero_copy_only=False).astype(np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return cls(null_count=len(array))
+        if pa.types.is_floating(array.type):
+            low, high = float(values.min()), float(values.max())
+        else:
+            # Exact, where a float64 copy would round large integers
+            min_max = pc.min_max(array)
+            low, high = min_max["min"].as_py(), min_max["max"].as_py()
+        mean = values.mean()
+        return cls(
+            count=len(values),
+            null_count=len(array) - len(values),
+            mean=float(mean),
+            m2=float(np.square(values - mean).sum()),
+            min=low,
+            max=high,
+        )
+
+    def merge(self, other: "ColumnSummary") -> "ColumnSummary":
+        """
+        Combine the summaries of two disjoint parts of a column.
+        """
+        count = self.count + other.count
+        if self.count == 0 or other.count == 0:
+            source = self if other.count == 0 else other
+            mean, m2 = source.mean, source.m2
+        elif self.mean is None or other.mean is None:
+            mean = m2 = None
+        else:
+            delta = other.mean - self.mean
+            mean = self.mean + delta * other.count / count
+            m2 = self.m2 + other.m2 + delta**2 * self.count * other.count / count
+        return ColumnSummary(
+            count=count,
+            null_count=self.null_count + other.null_count,
+            mean=mean,
+            m2=m2,
+            min=_pick(min, self.min, other.min),
+            max=_pick(max, self.max, other.max),
+        )
+
+    def to_dict(self) -> dict:
+        """
+        The statistics: counts, null rate, mean, sample variance and standard
+        deviation (numeric columns only), and min/max.
+        """
+        n_values = self.count + self.null_count
+        variance = None
+        if self.m2 is not None and self.count > 1:
+            variance = self.m2 / (self.count - 1)
+        return {
+            "count": self.count,
+            "null_count": self.null_count,
+            "null_rate": self.null_count / n_values if n_values else None,
+            "mean": self.mean,
+            "variance": variance,
+            "std": math.sqrt(variance) if variance is not None else None,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+def merge_summaries(summaries: Iterable[ColumnSummary]) -> ColumnSummary:
+    """
+    Merge the summaries of the disjoint parts of a column.
+    """
+    merged = ColumnSummary()
+    for summary in summaries:
+        merged = merged.merge(summary)
+    return merged
+
+
+def _pick(func, a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return func(a, b)
+
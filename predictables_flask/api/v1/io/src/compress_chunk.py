@@ -0,0 +1,85 @@
+import gzip
+from typing import Iterable
+
+from werkzeug.datastructures import Accept
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, only needed for the zstd variant
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, only needed for the br variant
+    brotli = None
+
+# Content-Encodings the chunk writer can produce, and the suffix of their files.
+# Only encodings whose compressor is installed are listed.
+CONTENT_ENCODINGS = {"gzip": ".gz"}
+if zstandard is not None:
+    CONTENT_ENCODINGS["zstd"] = ".zst"
+if brotli is not None:
+    CONTENT_ENCODINGS["br"] = ".br"
+
+
+def compress_chunk(data: bytes, encoding: str) -> bytes:
+    """
+    Compress a serialized chunk with one of the `CONTENT_ENCODINGS`.
+
+    Parameters
+    ----------
+    data : bytes
+        The serialized chunk.
+    encoding : str
+        One of 'gzip', 'zstd' or 'br'.
+
+    Returns
+    -------
+    bytes
+        The compressed chunk. Compression levels favour size over speed, since
+        each chunk is compressed once and downloaded many times.
+
+    Raises
+    ------
+    ValueError
+        If the encoding is unknown or its compressor is not installed.
+    """
+    if encoding not in CONTENT_ENCODINGS:
+        raise ValueError(
+            f"Unknown content encoding `{encoding}`. Use one of {list(CONTENT_ENCODINGS)}."
+        )
+    if encoding == "gzip":
+        # mtime=0 keeps the output deterministic
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    elif encoding == "zstd":
+        return zstandard.ZstdCompressor(level=19).compress(data)
+    else:
+        return brotli.compress(data, quality=11)
+
+
+def choose_content_encoding(accept_encodings: Accept, available: Iterable[str]) -> str:
+    """
+    Pick the best available precompressed variant for a request.
+
+    Parameters
+    ----------
+    accept_encodings : Accept
+        The parsed `Accept-Encoding` header, ie. `request.accept_encodings`.
+    available : iterable of str
+        The encodings with a variant on disk.
+
+    Returns
+    -------
+    encoding : str
+        The accepted encoding with the highest quality, or 'identity' if no
+        variant is accepted. Ties go to the densest encoding (br, then zstd,
+        then gzip).
+    """
+    preference = ["br", "zstd", "gzip"]
+    candidates = [e for e in preference if e in set(available)]
+    best, best_quality = "identity", 0
+    for encoding in candidates:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
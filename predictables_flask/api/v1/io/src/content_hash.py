@@ -0,0 +1,68 @@
+import hashlib
+import json
+from typing import Tuple
+
+from .get_file_version import get_file_version
+from .write_atomic import write_atomic
+
+
+def get_content_hash_filename(filename: str) -> str:
+    """
+    Get the path of the file recording the SHA-256 hash of a parquet file.
+    """
+    return f"{filename}.sha256"
+
+
+def record_content_hash(filename: str) -> str:
+    """
+    Hash a file and record the hash next to it, with the version of the file
+    it was computed from.
+
+    Called when a dataset's parquet file is written (see `ingest_upload`), so
+    the whole file is never hashed inside a request.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the file.
+
+    Returns
+    -------
+    content_hash : str
+        The hex SHA-256 hash of the file.
+    """
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    content_hash = digest.hexdigest()
+    record = {"version": list(get_file_version(filename)), "sha256": content_hash}
+    write_atomic(get_content_hash_filename(filename), json.dumps(record))
+    return content_hash
+
+
+def read_content_hash(filename: str, version: Tuple[int, int]) -> str:
+    """
+    Read the hash recorded by `record_content_hash`.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the file.
+    version : tuple of int
+        The current version of the file (see `get_file_version`).
+
+    Returns
+    -------
+    content_hash : str
+        The hex SHA-256 hash of the file. None if no hash was recorded, or it
+        was recorded for another version of the file.
+    """
+    try:
+        with open(get_content_hash_filename(filename)) as f:
+            record = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if record.get("version") != list(version):
+        return None
+    return record.get("sha256")
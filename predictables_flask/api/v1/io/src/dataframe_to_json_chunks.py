@@ -1,8 +1,19 @@
-from typing import List
+import hashlib
+import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Tuple
 
 import pandas as pd
 
+from .chunk_plan import ChunkPlan
+from .compress_chunk import CONTENT_ENCODINGS, compress_chunk
 from .get_json_chunk_filename import get_json_chunk_filename
+from .get_json_marker_filename import get_json_marker_filename
+from .make_process_pool import make_process_pool
+from .write_atomic import write_atomic
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
 
 
 def dataframe_to_json_chunks(
@@ -10,10 +21,28 @@ def dataframe_to_json_chunks(
     n_chunks: int = 20,
     write_json: bool = True,
     dataset_name: str = None,
+    output_dir: str = ".",
+    max_workers: int = None,
+    executor: str = "process",
+    return_json: bool = True,
+    plan: ChunkPlan = None,
+    encodings: Iterable[str] = None,
+    progress: Callable = None,
+    version: tuple = None,
 ) -> List[str]:
     """
     Splits the dataframe into n_chunks of JSON strings.
 
+    The chunks are serialized (and written) in parallel. Each file is written
+    to a temporary name and renamed into place, and a completion marker is
+    written once every chunk is on disk, so an interrupted run is never
+    mistaken for a finished one. The marker doubles as the manifest of the
+    chunks: their row ranges, byte sizes and SHA-256 content hashes, and the
+    version of the parquet file they were written from. Compressed variants
+    of each file (eg. 'chunk_001_of_020.json.gz') are written alongside it, so
+    they can be served with a Content-Encoding without compressing on every
+    download.
+
     Parameters
     ----------
     df : pd.DataFrame
@@ -24,51 +53,164 @@ def dataframe_to_json_chunks(
         A flag indicating whether to write the JSON strings to disk. Default is True.
     dataset_name : str, optional
         The name of the dataset. Default is None, which will result in the JSON files being named 'chunk_001_of_020.json', 'chunk_002_of_020.json', etc.
+    output_dir : str, optional
+        The folder to write the JSON files to. Default is the current working directory.
+    max_workers : int, optional
+        The size of the worker pool. Default is None, which lets the executor pick (based on the number of CPUs).
+    executor : str, optional
+        Either 'thread' or 'process'. `DataFrame.to_json` holds the GIL, so only a process pool scales serialization across cores, at the cost of pickling each chunk to its worker (see `benchmarks.json_chunks`). Default is 'process'.
+    return_json : bool, optional
+        A flag indicating whether to return the JSON strings. When False, the chunks are only written to disk and the filenames are returned instead, which avoids sending every string back from the workers. Default is True.
+    plan : ChunkPlan, optional
+        The row ranges of the chunks, eg. from `plan_dataframe_chunks`. Default is None, which splits the dataframe into `n_chunks` balanced chunks.
+    encodings : iterable of str, optional
+        The compressed variants to write, from `CONTENT_ENCODINGS`. Default is None, which writes every available variant. Pass an empty list to only write the raw JSON.
+    progress : callable, optional
+        Called with the number of chunks serialized so far and `n_chunks` as each chunk finishes. Default is None.
+    version : tuple, optional
+        The version of the parquet file the dataframe was read from (see `get_file_version`), recorded in the manifest. An existing set of chunks is only skipped if it was written from the same version. Default is None.
 
     Returns
     -------
     json_chunks : list of str
-        A list of length `n_chunks` containing the JSON strings for each chunk.
+        A list of length `n_chunks` containing the JSON strings for each chunk (or their filenames, if `return_json` is False).
     """
     # Handle dataset_name
     if dataset_name is None:
         dataset_name = "chunk"
 
     # Ensure n_chunks is not greater than the number of rows in the dataframe
-    n_chunks = min(n_chunks, len(df))
+    if plan is None:
+        plan = ChunkPlan(len(df), max(1, min(n_chunks, len(df))))
+    elif plan.n_rows != len(df):
+        raise ValueError(
+            f"The plan covers {plan.n_rows} rows, but the dataframe has {len(df)}"
+        )
+    n_chunks = plan.n_chunks
 
     # Check if the JSON files already exist
-    if _check_if_json_exists_already(dataset_name, n_chunks):
+    if write_json and _check_if_json_exists_already(
+        dataset_name, n_chunks, output_dir, version
+    ):
         print(
             f"JSON files for dataset {dataset_name} already exist. Skipping conversion to JSON."
         )
         return
 
-    # Calculate the size of each chunk
-    chunk_size = len(df) // n_chunks
+    if executor not in EXECUTORS:
+        raise ValueError(
+            f"Unknown executor `{executor}`. Use one of {list(EXECUTORS)}."
+        )
 
     # Split the dataframe into chunks
-    chunks = [df.iloc[i : i + chunk_size] for i in range(0, len(df), chunk_size)]
-
-    # Ensure all data is included in chunks (handling remainder if df size not evenly divisible)
-    if len(chunks) > n_chunks:
-        last_chunk = chunks[-2].append(chunks[-1])
-        chunks = chunks[:-2] + [last_chunk]
+    chunks = [df.iloc[start:stop] for start, stop in plan]
+    filenames = [
+        os.path.join(output_dir, get_json_chunk_filename(dataset_name, i, n_chunks))
+        if write_json
+        else None
+        for i in range(n_chunks)
+    ]
+    if write_json:
+        os.makedirs(output_dir, exist_ok=True)
+    encodings = list(CONTENT_ENCODINGS if encodings is None else encodings)
 
-    # Convert each chunk to a JSON string and store it in a list
-    json_chunks = [chunk.to_json(orient="records") for chunk in chunks]
+    # Convert each chunk to a JSON string (and write it) across the worker pool
+    results = []
+    with get_chunk_pool(executor, max_workers) as pool:
+        for result in pool.map(
+            _serialize_chunk,
+            chunks,
+            filenames,
+            [return_json] * n_chunks,
+            [encodings] * n_chunks,
+        ):
+            results.append(result)
+            if progress is not None:
+                progress(len(results), n_chunks)
+    json_chunks, chunk_infos = zip(*results)
 
-    # Write the JSON strings to disk
+    # Mark the set of chunks complete only once every chunk is in place
     if write_json:
-        for i, chunk in enumerate(json_chunks):
-            filename = get_json_chunk_filename(dataset_name, i, n_chunks)
-            with open(filename, "w") as f:
-                f.write(chunk)
+        manifest = {
+            "dataset": dataset_name,
+            "n_rows": plan.n_rows,
+            "n_chunks": n_chunks,
+            "version": list(version) if version is not None else None,
+            "chunks": [
+                {"chunk": i, "start": start, "stop": stop, **info}
+                for i, ((start, stop), info) in enumerate(zip(plan, chunk_infos))
+            ],
+        }
+        write_atomic(
+            get_json_marker_filename(dataset_name, n_chunks, output_dir),
+            json.dumps(manifest),
+        )
+
+    return list(json_chunks) if return_json else filenames
+
+
+def get_chunk_pool(executor: str, max_workers: int = None) -> Executor:
+    """
+    Start a pool to serialize chunks on, either 'thread' or 'process' (see
+    `make_process_pool`).
+    """
+    if executor == "process":
+        return make_process_pool(max_workers)
+    return EXECUTORS[executor](max_workers=max_workers)
+
+
+def iter_json_chunks(df: pd.DataFrame, plan: ChunkPlan) -> Iterator[str]:
+    """
+    Lazily convert the chunks of a dataframe to JSON strings.
+
+    Unlike `dataframe_to_json_chunks`, only one chunk is serialized at a time,
+    when the consumer asks for it.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The pandas DataFrame to split.
+    plan : ChunkPlan
+        The row ranges of the chunks.
 
-    return json_chunks
+    Yields
+    ------
+    str
+        The JSON string ('records' orient) of each chunk, in order.
+    """
+    for start, stop in plan:
+        yield df.iloc[start:stop].to_json(orient="records")
 
 
-def _check_if_json_exists_already(dataset_name: str, n_chunks: int) -> bool:
+def _serialize_chunk(
+    chunk: pd.DataFrame, filename: str, return_json: bool, encodings: List[str]
+) -> Tuple[str, dict]:
+    """
+    Convert one chunk to a JSON string, writing it (and its compressed
+    variants) to `filename` if given. Returns the string (if requested) and
+    the chunk's manifest entry (if written).
+    """
+    json_chunk = chunk.to_json(orient="records")
+    info = None
+    if filename is not None:
+        data = json_chunk.encode("utf-8")
+        info = {"filename": os.path.basename(filename), **_describe(data)}
+        info["variants"] = {}
+        for encoding in encodings:
+            compressed = compress_chunk(data, encoding)
+            write_atomic(filename + CONTENT_ENCODINGS[encoding], compressed)
+            info["variants"][encoding] = _describe(compressed)
+        write_atomic(filename, data)
+    return (json_chunk if return_json else None), info
+
+
+def _describe(data: bytes) -> dict:
+    return {"n_bytes": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+def _check_if_json_exists_already(
+    dataset_name: str, n_chunks: int, output_dir: str = ".", version: tuple = None
+) -> bool:
     """
     Check if the JSON files already exist.
 
@@ -78,19 +220,50 @@ def _check_if_json_exists_already(dataset_name: str, n_chunks: int) -> bool:
         The name of the dataset.
     n_chunks : int
         The total number of chunks.
+    output_dir : str, optional
+        The folder the JSON files are written to. Default is the current working directory.
+    version : tuple, optional
+        The version of the parquet file the chunks must have been written
+        from (see `get_file_version`). Default is None, which accepts any.
 
     Returns
     -------
     bool
-        A flag indicating whether the JSON files already exist.
+        A flag indicating whether the JSON files already exist. Only a completion
+        marker counts, so a partially written set of chunks is rebuilt, and so
+        does a set written from another version of the parquet file.
     """
-    import os
+    manifest = read_json_chunk_manifest(dataset_name, n_chunks, output_dir)
+    if manifest is None:
+        return False
+    return version is None or manifest.get("version") == list(version)
 
-    # Get the filenames
-    filenames = [
-        get_json_chunk_filename(dataset_name, i, n_chunks)
-        for i in range(1, n_chunks + 1)
-    ]
 
-    # Check if the files exist
-    return all([os.path.exists(filename) for filename in filenames])
+def read_json_chunk_manifest(
+    dataset_name: str, n_chunks: int, output_dir: str = "."
+) -> dict:
+    """
+    Read the manifest written alongside a complete set of chunks.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset.
+    n_chunks : int
+        The total number of chunks.
+    output_dir : str, optional
+        The folder the JSON files are written to. Default is the current working directory.
+
+    Returns
+    -------
+    manifest : dict
+        The dataset name, its number of rows and chunks, the version of the
+        parquet file it was written from, and for each chunk its row range,
+        filename, byte size, SHA-256 hash and compressed variants. None if the
+        chunks have not been (completely) written.
+    """
+    try:
+        with open(get_json_marker_filename(dataset_name, n_chunks, output_dir)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
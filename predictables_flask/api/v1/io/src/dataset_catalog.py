@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+
+import pyarrow.parquet as pq
+from flask import current_app
+
+from predictables_flask.models.Dataset import Dataset
+from predictables_flask.models.db import db
+
+from .chunk_container import get_chunk_container_filename, read_chunk_container_index
+from .chunk_plan import plan_dataset_chunks
+from .content_hash import read_content_hash
+from .get_chunk_folder import get_chunk_folder
+from .get_dataset_metadata import read_parquet_footer
+from .get_file_version import get_file_version
+from .get_json_marker_filename import get_json_marker_filename
+from .get_parquet_filename import get_parquet_filename
+
+# The catalog entries this process has synced, by dataset name, with the
+# (filename, version) of the parquet file they were synced for
+_synced = {}
+_synced_lock = threading.Lock()
+
+
+def get_dataset_info(ds_name: str) -> dict:
+    """
+    Look a dataset up in the catalog.
+
+    The lookup is one stat of the parquet file. The catalog is only queried
+    (and its row (re)built from the parquet footer) the first time this
+    process sees a version of the file; later lookups of the same version are
+    answered from memory. If the catalog cannot be reached (eg. its table has
+    not been migrated yet), the same description is built from the file
+    without recording it.
+
+    The content hash is the one recorded when the file was ingested (see
+    `record_content_hash`). A file written by other means is not hashed in
+    the request: its hash is a digest of its path and version instead, which
+    changes whenever the file does.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+
+    Returns
+    -------
+    info : dict
+        The catalog entry (see `Dataset.to_dict`): the dataset's size, schema,
+        content hash and storage paths, and its chunk layout if it has been
+        chunked.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no parquet file for the dataset.
+    """
+    filename = get_parquet_filename(ds_name)
+    try:
+        version = get_file_version(filename)
+    except FileNotFoundError:
+        _try_catalog(_forget_dataset, ds_name)
+        raise
+
+    with _synced_lock:
+        synced = _synced.get(ds_name)
+    if synced is not None and synced[0] == (filename, version):
+        return dict(synced[1])
+
+    info = _try_catalog(_sync_dataset, ds_name, filename, version)
+    if info is not None:
+        with _synced_lock:
+            _synced[ds_name] = ((filename, version), info)
+        info = dict(info)
+    else:
+        info = {"name": ds_name, **_describe_parquet(filename, *version)}
+        info.update(id=None, n_chunks=None, chunk_folder=None, manifest_path=None)
+    return info
+
+
+def get_dataset_manifest(ds_name: str) -> dict:
+    """
+    Get the manifest of a dataset's JSON chunks.
+
+    The manifest path is read from the catalog. Until it is recorded there,
+    the dataset's chunk container is looked for, then the completion marker
+    of a set of chunk files for the planned number of chunks (one stat each),
+    and the path is recorded once found.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+
+    Returns
+    -------
+    manifest : dict
+        The index of the chunk container (see `read_chunk_container_index`)
+        or the manifest written by `dataframe_to_json_chunks`. None if the
+        dataset has not been chunked, or its chunks were written from another
+        (or an unrecorded) version of its parquet file.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no parquet file for the dataset.
+    """
+    info = get_dataset_info(ds_name)
+    chunk_folder = get_chunk_folder()
+    manifest_path = info["manifest_path"]
+    if manifest_path is None:
+        manifest_path = get_chunk_container_filename(ds_name, chunk_folder)
+        if not os.path.exists(manifest_path):
+            n_chunks = plan_dataset_chunks(ds_name).n_chunks
+            manifest_path = get_json_marker_filename(ds_name, n_chunks, chunk_folder)
+            if not os.path.exists(manifest_path):
+                return None
+
+    manifest = _read_manifest(manifest_path)
+    if manifest is not None and manifest.get("version") != [
+        info["mtime_ns"],
+        info["n_bytes_on_disk"],
+    ]:
+        # The chunks were written from another version of the file
+        manifest = None
+    if manifest is None:
+        # The chunks were removed (or outdated) behind the catalog's back
+        if info["manifest_path"] is not None:
+            _try_catalog(_record_chunks, ds_name, None, None, None)
+        return None
+
+    if (info["manifest_path"], info["n_chunks"]) != (
+        manifest_path,
+        manifest["n_chunks"],
+    ):
+        _try_catalog(
+            _record_chunks, ds_name, manifest["n_chunks"], chunk_folder, manifest_path
+        )
+    return manifest
+
+
+def _read_manifest(manifest_path: str) -> dict:
+    if manifest_path.endswith(".chunks"):
+        return read_chunk_container_index(manifest_path)
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _try_catalog(func, *args):
+    try:
+        return func(*args)
+    except Exception as e:
+        # Any failure of the catalog (eg. a missing table, a lost connection
+        # or a bad row) falls back to the file rather than failing the request
+        db.session.rollback()
+        current_app.logger.warning(f"Dataset catalog is unavailable: {e}")
+        return None
+
+
+def _sync_dataset(ds_name: str, filename: str, version: tuple) -> dict:
+    dataset = Dataset.get_by_name(ds_name)
+    if (
+        dataset is not None
+        and dataset.parquet_path == filename
+        and (dataset.mtime_ns, dataset.n_bytes_on_disk) == version
+    ):
+        return dataset.to_dict()
+
+    description = _describe_parquet(filename, *version)
+    if dataset is None:
+        dataset = Dataset(name=ds_name)
+    for key, value in description.items():
+        setattr(dataset, key, value)
+    # A new file version invalidates the chunks written from the old one
+    dataset.n_chunks = dataset.chunk_folder = dataset.manifest_path = None
+    dataset.save()
+    return dataset.to_dict()
+
+
+def _record_chunks(
+    ds_name: str, n_chunks: int, chunk_folder: str, manifest_path: str
+) -> None:
+    dataset = Dataset.get_by_name(ds_name)
+    if dataset is not None:
+        dataset.n_chunks = n_chunks
+        dataset.chunk_folder = chunk_folder
+        dataset.manifest_path = manifest_path
+        dataset.save()
+    with _synced_lock:
+        synced = _synced.get(ds_name)
+        if synced is not None:
+            synced[1].update(
+                n_chunks=n_chunks, chunk_folder=chunk_folder, manifest_path=manifest_path
+            )
+
+
+def _forget_dataset(ds_name: str) -> None:
+    with _synced_lock:
+        _synced.pop(ds_name, None)
+    dataset = Dataset.get_by_name(ds_name)
+    if dataset is not None:
+        dataset.delete()
+
+
+@lru_cache(maxsize=256)
+def _describe_parquet(filename: str, mtime_ns: int, size: int) -> dict:
+    content_hash = read_content_hash(filename, (mtime_ns, size))
+    if content_hash is None:
+        # Not ingested: a digest of the version, rather than hashing the file
+        content_hash = hashlib.sha256(
+            f"{filename}:{mtime_ns}:{size}".encode("utf-8")
+        ).hexdigest()
+    metadata = read_parquet_footer(filename, mtime_ns, size)
+    return {
+        "parquet_path": filename,
+        "mtime_ns": mtime_ns,
+        "content_hash": content_hash,
+        "schema": [
+            {"name": field.name, "type": str(field.type)}
+            for field in pq.read_schema(filename)
+        ],
+        **metadata,
+    }
@@ -0,0 +1,244 @@
+import json
+import os
+from typing import Callable, Iterable, List
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from flask import Response, current_app, jsonify
+
+from .get_chunk_folder import get_chunk_folder
+from .get_file_version import get_file_version
+from .get_parquet_filename import get_parquet_filename
+from .sample_data_cache import sample_data_cache
+from .sketches import (
+    DEFAULT_HLL_PRECISION,
+    DEFAULT_KLL_K,
+    HyperLogLog,
+    KllSketch,
+    check_quantiles,
+)
+from .write_atomic import write_atomic
+
+DEFAULT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+def build_dataset_sketches(ds_name: str, progress: Callable = None) -> dict:
+    """
+    Build a quantile (KLL) and a distinct-count (HyperLogLog) sketch of every
+    column of a dataset, and persist them next to its chunks.
+
+    The dataset is read one record batch at a time, so memory stays bounded.
+    Quantile sketches are only built for numeric columns. The sketch size is
+    set by `IO_SKETCH_K` and `IO_SKETCH_HLL_PRECISION` in the app config.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+    progress : callable, optional
+        Called with the number of rows sketched so far and the total.
+
+    Returns
+    -------
+    dict
+        The dataset name, its number of rows and the path of the sketch file.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no parquet file for the dataset.
+    """
+    config = current_app.config
+    k = config.get("IO_SKETCH_K", DEFAULT_KLL_K)
+    precision = config.get("IO_SKETCH_HLL_PRECISION", DEFAULT_HLL_PRECISION)
+    batch_size = config.get("IO_STREAM_BATCH_ROWS", 10000)
+
+    filename = get_parquet_filename(ds_name)
+    version = get_file_version(filename)
+    parquet_file = pq.ParquetFile(filename)
+    schema = parquet_file.schema_arrow
+    quantile_sketches = {
+        field.name: KllSketch(k, seed=i)
+        for i, field in enumerate(schema)
+        if _is_numeric(field.type)
+    }
+    distinct_sketches = {field.name: HyperLogLog(precision) for field in schema}
+
+    n_rows = 0
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        for name, column in zip(batch.schema.names, batch.columns):
+            values = pc.drop_null(column)
+            if name in quantile_sketches:
+                quantile_sketches[name].update(values.to_numpy(zero_copy_only=False))
+            distinct_sketches[name].update(values.to_numpy(zero_copy_only=False))
+        n_rows += batch.num_rows
+        if progress is not None:
+            progress(n_rows, parquet_file.metadata.num_rows)
+
+    sketch_filename = get_sketch_filename(ds_name)
+    os.makedirs(os.path.dirname(sketch_filename) or ".", exist_ok=True)
+    write_atomic(
+        sketch_filename,
+        json.dumps(
+            {
+                "dataset": ds_name,
+                "version": list(version),
+                "n_rows": n_rows,
+                "columns": {
+                    field.name: {
+                        "type": str(field.type),
+                        "quantiles": (
+                            quantile_sketches[field.name].to_dict()
+                            if field.name in quantile_sketches
+                            else None
+                        ),
+                        "distinct": distinct_sketches[field.name].to_dict(),
+                    }
+                    for field in schema
+                },
+            }
+        ),
+    )
+    return {"dataset": ds_name, "n_rows": n_rows, "filename": sketch_filename}
+
+
+def load_dataset_sketches(ds_name: str) -> dict:
+    """
+    Load the persisted sketches of a dataset.
+
+    Returns
+    -------
+    dict
+        The sketches of each column, by column name: `quantiles` (a
+        `KllSketch`, or None for non-numeric columns) and `distinct` (a
+        `HyperLogLog`). None if the dataset has no sketches, or they were
+        built from an older version of its parquet file.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no parquet file for the dataset.
+    """
+    version = get_file_version(get_parquet_filename(ds_name))
+
+    def _load():
+        try:
+            with open(get_sketch_filename(ds_name)) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None, 0
+        if tuple(state["version"]) != version:
+            return None, 0
+        sketches = {
+            name: {
+                "quantiles": (
+                    KllSketch.from_dict(column["quantiles"])
+                    if column["quantiles"] is not None
+                    else None
+                ),
+                "distinct": HyperLogLog.from_dict(column["distinct"]),
+            }
+            for name, column in state["columns"].items()
+        }
+        return sketches, os.path.getsize(get_sketch_filename(ds_name))
+
+    sketches = sample_data_cache.get(("sketches", ds_name, version))
+    if sketches is None:
+        sketches, nbytes = _load()
+        if sketches is not None:
+            sample_data_cache.put(("sketches", ds_name, version), sketches, nbytes)
+    return sketches
+
+
+def query_dataset_sketches(
+    ds_name: str, columns: List[str] = None, quantiles: Iterable[float] = None
+) -> Response:
+    """
+    Answer approximate quantile and distinct-count queries from a dataset's sketches.
+
+    The cost does not depend on the number of rows: each answer reads a
+    sketch of a few hundred items (quantiles) or a few thousand registers
+    (distinct counts). If the sketches are missing or stale, a
+    'sketch_dataset' job is submitted to (re)build them.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+    columns : list of str, optional
+        The columns to answer for. Default is None, which answers for every column.
+    quantiles : iterable of float, optional
+        The quantiles to estimate, between 0 and 1. Default is None, which
+        uses `DEFAULT_QUANTILES`.
+
+    Returns
+    -------
+    Response
+        For each column, the number of values, the estimated quantiles with
+        their normalized rank error (99% confidence), and the estimated number
+        of distinct values with its relative standard error. A 202 with the
+        job if the sketches are being built, a 404 if there is no such
+        dataset, or a 400 for an unknown column or an invalid quantile.
+    """
+    from .job_manager import job_manager
+
+    quantiles = list(DEFAULT_QUANTILES if quantiles is None else quantiles)
+    try:
+        check_quantiles(quantiles)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        sketches = load_dataset_sketches(ds_name)
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    if sketches is None:
+        job = job_manager.submit("sketch_dataset", {"ds_name": ds_name})
+        return jsonify(job), 202
+
+    if columns is None:
+        columns = list(sketches)
+    unknown = [column for column in columns if column not in sketches]
+    if unknown:
+        return jsonify({"error": f"Unknown columns: {unknown}"}), 400
+
+    answers = {}
+    for column in columns:
+        quantile_sketch = sketches[column]["quantiles"]
+        distinct_sketch = sketches[column]["distinct"]
+        answer = {
+            "distinct_count": round(distinct_sketch.estimate()),
+            "distinct_count_error": distinct_sketch.relative_error,
+        }
+        if quantile_sketch is not None:
+            answer.update(
+                {
+                    "count": quantile_sketch.n,
+                    "quantiles": dict(
+                        zip(
+                            [str(q) for q in quantiles],
+                            quantile_sketch.quantiles(quantiles),
+                        )
+                    ),
+                    "rank_error": quantile_sketch.rank_error,
+                }
+            )
+        answers[column] = answer
+
+    return jsonify({"dataset": ds_name, "columns": answers}), 200
+
+
+def get_sketch_filename(ds_name: str) -> str:
+    """
+    Get the path of a dataset's sketch file, in the chunk folder.
+    """
+    return os.path.join(get_chunk_folder(), f"{ds_name}.sketches.json")
+
+
+def _is_numeric(arrow_type: pa.DataType) -> bool:
+    return (
+        pa.types.is_integer(arrow_type)
+        or pa.types.is_floating(arrow_type)
+        or pa.types.is_boolean(arrow_type)
+    )
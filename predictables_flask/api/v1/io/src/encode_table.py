@@ -0,0 +1,74 @@
+import io
+from typing import Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, only needed for the msgpack format
+    msgpack = None
+
+# Binary formats the io routes can return, and their mimetypes
+TABLE_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+if msgpack is not None:
+    TABLE_FORMATS["msgpack"] = "application/msgpack"
+
+
+def encode_table(table: pa.Table, fmt: str) -> Iterator[bytes]:
+    """
+    Encode an Arrow table in one of the binary `TABLE_FORMATS`.
+
+    Parameters
+    ----------
+    table : pa.Table
+        The table to encode.
+    fmt : str
+        One of 'arrow', 'parquet' or 'msgpack'.
+
+    Yields
+    ------
+    bytes
+        The encoded table. The Arrow IPC stream is produced one record batch
+        at a time, straight from the table's buffers, without converting to
+        pandas or Python objects. The other formats are yielded in one piece.
+
+    Raises
+    ------
+    ValueError
+        If the format is unknown, or its optional dependency is not installed.
+    """
+    if fmt == "arrow":
+        yield from _iter_arrow_stream(table)
+    elif fmt == "parquet":
+        sink = pa.BufferOutputStream()
+        pq.write_table(table, sink)
+        yield sink.getvalue().to_pybytes()
+    elif fmt == "msgpack":
+        if msgpack is None:
+            raise ValueError("The msgpack format requires the `msgpack` package")
+        # Column oriented, like the Arrow and parquet formats
+        yield msgpack.packb(table.to_pydict(), default=str)
+    else:
+        raise ValueError(f"Unknown format `{fmt}`. Use one of {list(TABLE_FORMATS)}.")
+
+
+def _iter_arrow_stream(table: pa.Table) -> Iterator[bytes]:
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        yield _drain(sink)
+        for batch in table.to_batches():
+            writer.write_batch(batch)
+            yield _drain(sink)
+    yield _drain(sink)
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    # Take what has been written so far and start the buffer over
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
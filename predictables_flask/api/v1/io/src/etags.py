@@ -0,0 +1,44 @@
+import hashlib
+
+from flask import Response, request
+
+
+def make_etag(*parts) -> str:
+    """
+    Make a strong ETag for a representation of a dataset.
+
+    Parameters
+    ----------
+    *parts
+        Everything that determines the bytes of the response, eg. the route,
+        the dataset name, the format and the version of the parquet file
+        (see `get_file_version`).
+
+    Returns
+    -------
+    etag : str
+        A hex digest of the parts, without quotes.
+    """
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Answer a conditional GET before doing any work.
+
+    Parameters
+    ----------
+    etag : str
+        The ETag of the representation that would be returned.
+
+    Returns
+    -------
+    Response
+        A 304 response carrying the ETag if the request's `If-None-Match`
+        matches it, otherwise None.
+    """
+    if not request.if_none_match.contains(etag):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
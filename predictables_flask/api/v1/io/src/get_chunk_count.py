@@ -1,21 +1,31 @@
+from typing import Union
+
 import pandas as pd
 
+from .chunk_plan import plan_dataframe_chunks, plan_dataset_chunks
+
 
-def get_chunk_count(df: pd.DataFrame) -> int:
+def get_chunk_count(df: Union[pd.DataFrame, str], target_chunk_bytes: int = None) -> int:
     """
     Get the number of chunks to split the dataframe into.
 
+    The count targets a serialized chunk size rather than a fixed number of
+    rows, so wide frames get more chunks than narrow ones. See `ChunkPlan`.
+
     Parameters
     ----------
-    df : pd.DataFrame
-        The pandas DataFrame to split.
+    df : pd.DataFrame or str
+        The pandas DataFrame to split, or the name of a dataset. For a dataset
+        name only the parquet footer and a sample of rows are read.
+    target_chunk_bytes : int, optional
+        The target size of one chunk, in bytes. Default is None, which uses
+        `IO_TARGET_CHUNK_BYTES` from the app config.
 
     Returns
     -------
     n_chunks : int
         The number of chunks to split the dataframe into.
     """
-    # Calculate the number of chunks
-    calc_n_chunks = len(df) // 50000 + 1
-
-    return max(20, calc_n_chunks)
+    if isinstance(df, str):
+        return plan_dataset_chunks(df, target_chunk_bytes).n_chunks
+    return plan_dataframe_chunks(df, target_chunk_bytes).n_chunks
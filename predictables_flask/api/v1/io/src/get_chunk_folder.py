@@ -0,0 +1,18 @@
+from flask import current_app, has_app_context
+
+DEFAULT_CHUNK_FOLDER = "./api/v1/io/data/chunks"
+
+
+def get_chunk_folder() -> str:
+    """
+    Get the folder that materialized chunk files are written to and served from.
+
+    Returns
+    -------
+    folder : str
+        `IO_CHUNK_FOLDER` from the app config, or './api/v1/io/data/chunks'
+        outside of an app context.
+    """
+    if has_app_context():
+        return current_app.config.get("IO_CHUNK_FOLDER", DEFAULT_CHUNK_FOLDER)
+    return DEFAULT_CHUNK_FOLDER
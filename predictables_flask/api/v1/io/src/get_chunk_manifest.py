@@ -0,0 +1,50 @@
+from flask import Response, jsonify
+
+from .dataset_catalog import get_dataset_manifest
+from .etags import make_etag, not_modified
+
+
+def get_chunk_manifest(dataset_name: str) -> Response:
+    """
+    Get the manifest of a dataset's materialized chunks.
+
+    Clients can compare the hashes against the chunks they already hold and
+    only download the ones that changed, revalidating a whole dataset in one
+    request.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset.
+
+    Returns
+    -------
+    Response
+        The manifest written by `dataframe_to_json_chunks`: for each chunk its
+        row range, byte size, SHA-256 hash and compressed variants. The ETag is
+        derived from the chunk hashes, so a matching `If-None-Match` gets a 304.
+        A 404 if the dataset has not been chunked.
+    """
+    try:
+        manifest = get_dataset_manifest(dataset_name)
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+
+    if manifest is None:
+        return (
+            jsonify(
+                {
+                    "error": f"Dataset {dataset_name} has not been chunked. Run /data/chunk-dataset first."
+                }
+            ),
+            404,
+        )
+
+    etag = make_etag("manifest", [chunk["sha256"] for chunk in manifest["chunks"]])
+    unchanged = not_modified(etag)
+    if unchanged is not None:
+        return unchanged
+
+    response = jsonify(manifest)
+    response.set_etag(etag)
+    return response
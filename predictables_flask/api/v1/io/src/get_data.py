@@ -1,9 +1,136 @@
-from flask import jsonify
+import json
 
-from .dataframe_to_json_chunks import dataframe_to_json_chunks
-from .get_json_chunk_filename import get_json_chunk_filename
+import pyarrow.parquet as pq
+from flask import Response, current_app, jsonify
 
+from .arrow_store import open_arrow_table, use_arrow_store
+from .chunk_plan import plan_dataset_chunks
+from .encode_table import TABLE_FORMATS, encode_table
+from .etags import make_etag, not_modified
+from .get_file_version import get_file_version
+from .get_parquet_filename import get_parquet_filename
+from .negotiate_format import TEXT_FORMATS
+from .read_parquet_rows import iter_parquet_rows, read_parquet_rows
+from .stream_sample_data import iter_json_batches, iter_ndjson_batches
+from .table_query import TableQuery, read_parquet_schema
 
-def get_data(dataset_name: str, chunk: int):
-    data = {"chunk_number": chunk, "data": "..."}
-    return jsonify(data)
+
+def get_data(
+    dataset_name: str,
+    chunk: int,
+    stream: bool = False,
+    fmt: str = "json",
+    query: TableQuery = None,
+) -> Response:
+    """
+    Get a single chunk of a dataset, computed on demand from the parquet file.
+
+    Only the row groups overlapping the chunk are read, so fetching one chunk
+    costs O(chunk) rather than O(dataset). With `IO_USE_ARROW_STORE`, the chunk
+    is a zero-copy slice of the memory-mapped table instead.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset.
+    chunk : int
+        The index of the chunk, starting at 0.
+    stream : bool, optional
+        A flag indicating whether to stream the response one record batch at a
+        time. Default is False.
+    fmt : str, optional
+        Either 'json', 'ndjson' or one of the keys of `TABLE_FORMATS`.
+        Default is 'json'.
+    query : TableQuery, optional
+        The columns and filters to apply to the rows of the chunk. Only the
+        projected and filtered columns are read. Default is None.
+
+    Returns
+    -------
+    Response
+        For JSON, an object with the chunk number, the total number of chunks,
+        the row range of the chunk and its rows (in 'records' orient) under
+        `data`. For NDJSON and the binary formats, the encoded rows, with the
+        chunk details in `X-Chunk-*` headers. Either way the response carries a
+        strong ETag, and a matching `If-None-Match` is answered with a 304
+        before any rows are read.
+    """
+    try:
+        filename = get_parquet_filename(dataset_name)
+        version = get_file_version(filename)
+        plan = plan_dataset_chunks(dataset_name)
+        if query:
+            schema = read_parquet_schema(filename, version)
+            query = query.bind(schema)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 404
+
+    n_chunks = plan.n_chunks
+    if not 0 <= chunk < n_chunks:
+        return (
+            jsonify(
+                {
+                    "error": f"Chunk {chunk} is out of range for dataset {dataset_name} with {n_chunks} chunks"
+                }
+            ),
+            404,
+        )
+
+    start, stop = plan.row_range(chunk)
+    etag = make_etag("chunk", dataset_name, chunk, n_chunks, fmt, query, version)
+    unchanged = not_modified(etag)
+    if unchanged is not None:
+        return unchanged
+
+    batch_size = current_app.config.get("IO_STREAM_BATCH_ROWS", 10000)
+    if use_arrow_store():
+        # A zero-copy slice of the memory-mapped table
+        table = open_arrow_table(dataset_name, filename, version).slice(
+            start, stop - start
+        )
+    elif fmt in TABLE_FORMATS or query:
+        columns = query.read_columns(schema) if query else None
+        table = read_parquet_rows(pq.ParquetFile(filename), start, stop, columns)
+    else:
+        table = None
+        batches = iter_parquet_rows(
+            pq.ParquetFile(filename), start, stop, batch_size=batch_size
+        )
+    if table is not None:
+        if query:
+            table = query.apply(table)
+        batches = table.to_batches(max_chunksize=batch_size)
+
+    if fmt != "json":
+        if fmt == "ndjson":
+            body, mimetype = iter_ndjson_batches(batches), TEXT_FORMATS[fmt]
+        else:
+            body, mimetype = encode_table(table, fmt), TABLE_FORMATS[fmt]
+        response = Response(body if stream else b"".join(body), mimetype=mimetype)
+        response.headers.update(
+            {
+                "X-Chunk-Number": chunk,
+                "X-Chunk-Count": n_chunks,
+                "X-Chunk-Start": start,
+                "X-Chunk-Stop": stop,
+            }
+        )
+        response.set_etag(etag)
+        return response
+
+    header = {"chunk_number": chunk, "n_chunks": n_chunks, "start": start, "stop": stop}
+    body = _iter_chunk_body(header, iter_json_batches(batches))
+
+    response = Response(body if stream else b"".join(body), mimetype="application/json")
+    response.set_etag(etag)
+    return response
+
+
+def _iter_chunk_body(header: dict, data):
+    # Splice the already-encoded rows into the header object without re-encoding them
+    yield json.dumps(header)[:-1].encode("utf-8")
+    yield b', "data": '
+    yield from data
+    yield b"}"
@@ -0,0 +1,58 @@
+from functools import lru_cache
+
+import pyarrow.parquet as pq
+
+from .get_file_version import get_file_version
+from .get_parquet_filename import get_parquet_filename
+
+
+def get_dataset_metadata(ds_name: str) -> dict:
+    """
+    Get the size of a dataset from its parquet footer, without reading any data.
+
+    The footer is parsed once per version of the file; later calls only stat
+    the file.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+
+    Returns
+    -------
+    metadata : dict
+        A dictionary with the keys:
+        - n_rows : the number of rows
+        - n_columns : the number of columns
+        - n_row_groups : the number of parquet row groups
+        - n_bytes : the estimated uncompressed size of the data in bytes
+        - n_bytes_on_disk : the size of the parquet file in bytes
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no parquet file for the dataset.
+    """
+    filename = get_parquet_filename(ds_name)
+    return dict(read_parquet_footer(filename, *get_file_version(filename)))
+
+
+@lru_cache(maxsize=256)
+def read_parquet_footer(filename: str, mtime_ns: int, size: int) -> dict:
+    """
+    Read the sizes in a parquet file's footer, once per version of the file.
+
+    `mtime_ns` and `size` (see `get_file_version`) are only part of the cache
+    key. The returned dict is shared between callers and must not be modified.
+    """
+    metadata = pq.read_metadata(filename)
+    return {
+        "n_rows": metadata.num_rows,
+        "n_columns": metadata.num_columns,
+        "n_row_groups": metadata.num_row_groups,
+        "n_bytes": sum(
+            metadata.row_group(i).total_byte_size
+            for i in range(metadata.num_row_groups)
+        ),
+        "n_bytes_on_disk": size,
+    }
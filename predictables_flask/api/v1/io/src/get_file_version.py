@@ -0,0 +1,21 @@
+import os
+from typing import Tuple
+
+
+def get_file_version(filename: str) -> Tuple[int, int]:
+    """
+    Get a cheap version stamp for a file on disk.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the file.
+
+    Returns
+    -------
+    version : tuple of int
+        The `(mtime_ns, size)` of the file. Any rewrite of the file changes
+        at least one of the two, so the tuple can be used in cache keys.
+    """
+    stat = os.stat(filename)
+    return stat.st_mtime_ns, stat.st_size
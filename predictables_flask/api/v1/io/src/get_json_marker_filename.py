@@ -0,0 +1,27 @@
+import os
+
+
+def get_json_marker_filename(
+    dataset_name: str, n_chunks: int, output_dir: str = "."
+) -> str:
+    """
+    Get the filename of the completion marker (and manifest) of a set of JSON
+    chunks, eg. 'california_housing_of_020.complete'.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset.
+    n_chunks : int
+        The total number of chunks.
+    output_dir : str, optional
+        The folder the JSON files are written to. Default is the current working directory.
+
+    Returns
+    -------
+    filename : str
+        The path of the marker.
+    """
+    return os.path.join(
+        output_dir, f"{dataset_name}_of_{str(n_chunks).zfill(3)}.complete"
+    )
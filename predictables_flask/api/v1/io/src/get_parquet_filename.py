@@ -0,0 +1,32 @@
+import os
+
+from flask import current_app, has_app_context
+
+DEFAULT_DATA_FOLDER = "./api/v1/io/data"
+
+
+def get_parquet_filename(ds_name: str, data_folder: str = None) -> str:
+    """
+    Get the path to the parquet file backing a dataset.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset, eg. 'breast_cancer'.
+    data_folder : str, optional
+        The folder holding the parquet files. Default is None, which uses
+        `IO_DATA_FOLDER` from the app config (or './api/v1/io/data' outside
+        of an app context).
+
+    Returns
+    -------
+    filename : str
+        The path to the parquet file.
+    """
+    if data_folder is None:
+        data_folder = (
+            current_app.config.get("IO_DATA_FOLDER", DEFAULT_DATA_FOLDER)
+            if has_app_context()
+            else DEFAULT_DATA_FOLDER
+        )
+    return os.path.join(data_folder, f"{ds_name}.parquet")
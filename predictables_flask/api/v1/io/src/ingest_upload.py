@@ -0,0 +1,262 @@
+import io
+import os
+import uuid
+from typing import Callable, Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.json as pajson
+import pyarrow.parquet as pq
+from flask import current_app
+
+from .content_hash import record_content_hash
+from .get_parquet_filename import get_parquet_filename
+from .job_manager import job_manager
+
+DEFAULT_ROW_GROUP_SIZE = 128 * 1024
+DEFAULT_BLOCK_SIZE = 16 * 1024 * 1024
+DEFAULT_SAMPLE_BYTES = 1024 * 1024
+
+
+def ingest_upload(
+    filename: str,
+    ds_name: str = None,
+    data_folder: str = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    sample_bytes: int = DEFAULT_SAMPLE_BYTES,
+    progress: Callable = None,
+) -> dict:
+    """
+    Convert an uploaded csv, json, parquet or xlsx file to a dataset parquet file.
+
+    CSV and (newline-delimited) JSON are read with pyarrow's multithreaded
+    streaming readers, one block at a time, so the file is never loaded whole.
+    The schema is inferred once from the first `sample_bytes` of the file and
+    then pinned for the rest of it. Rows are written in row groups of
+    `row_group_size`, which is the unit the chunk and sampling routes read.
+    The parquet file is written under a temporary name and renamed into place,
+    and its SHA-256 hash is recorded next to it (see `record_content_hash`).
+
+    Parameters
+    ----------
+    filename : str
+        The path to the uploaded file.
+    ds_name : str, optional
+        The name of the dataset to create. Default is None, which uses the
+        file's name without its extension.
+    data_folder : str, optional
+        The folder to write the parquet file to. Default is None, which uses
+        `IO_DATA_FOLDER` from the app config.
+    row_group_size : int, optional
+        The number of rows per parquet row group. Default is 131072.
+    block_size : int, optional
+        The number of bytes the CSV/JSON readers parse at a time. Default is 16 MiB.
+    sample_bytes : int, optional
+        The number of bytes to infer the schema from. Default is 1 MiB.
+    progress : callable, optional
+        Called with the number of rows written so far after each row group.
+        Default is None.
+
+    Returns
+    -------
+    dict
+        The dataset name, the path of the parquet file, and its number of rows
+        and row groups.
+
+    Raises
+    ------
+    ValueError
+        If the file type is not supported.
+    """
+    if ds_name is None:
+        ds_name = get_dataset_name(filename)
+    output = get_parquet_filename(ds_name, data_folder)
+    extension = filename.rsplit(".", 1)[-1].lower()
+
+    if extension == "csv":
+        batches = _iter_csv_batches(filename, block_size, sample_bytes)
+    elif extension == "json":
+        batches = _iter_json_batches(filename, block_size, sample_bytes)
+    elif extension == "parquet":
+        batches = pq.ParquetFile(filename).iter_batches(batch_size=row_group_size)
+    elif extension == "xlsx":
+        # Excel has no streaming reader; workbooks are small enough to load whole
+        batches = pa.Table.from_pandas(
+            pd.read_excel(filename), preserve_index=False
+        ).to_batches()
+    else:
+        raise ValueError(f"Cannot ingest `{filename}`: unsupported file type")
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    tmp_output = f"{output}.{uuid.uuid4().hex}.tmp"
+    try:
+        n_rows, n_row_groups = _write_row_groups(
+            batches, tmp_output, row_group_size, progress
+        )
+        os.replace(tmp_output, output)
+        # Hashed here, off the request thread, for the dataset catalog
+        record_content_hash(output)
+    finally:
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+
+    return {
+        "dataset": ds_name,
+        "filename": output,
+        "n_rows": n_rows,
+        "n_row_groups": n_row_groups,
+    }
+
+
+def submit_ingest(filename: str, ds_name: str = None) -> dict:
+    """
+    Queue an upload for `ingest_upload` as an 'ingest' job on the job pool.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the uploaded file.
+    ds_name : str, optional
+        The name of the dataset to create. Default is None, which uses the
+        file's name without its extension.
+
+    Returns
+    -------
+    dict
+        The state of the job (see `JobManager.submit`).
+    """
+    if ds_name is None:
+        ds_name = get_dataset_name(filename)
+    return job_manager.submit(
+        "ingest", {"filename": filename, "ds_name": ds_name}, tag=f"ingest:{ds_name}"
+    )
+
+
+def run_ingest_job(filename: str, ds_name: str, progress: Callable = None) -> dict:
+    """
+    Run `ingest_upload` with the row group, block and sample sizes from
+    `IO_INGEST_ROW_GROUP_SIZE`, `IO_INGEST_BLOCK_SIZE` and
+    `IO_INGEST_SAMPLE_BYTES` in the app config, then build the new dataset's
+    quantile and distinct-count sketches. This is the body of the 'ingest' job.
+    """
+    from .dataset_sketches import build_dataset_sketches
+
+    config = current_app.config
+    result = ingest_upload(
+        filename,
+        ds_name,
+        config.get("IO_DATA_FOLDER"),
+        config.get("IO_INGEST_ROW_GROUP_SIZE", DEFAULT_ROW_GROUP_SIZE),
+        config.get("IO_INGEST_BLOCK_SIZE", DEFAULT_BLOCK_SIZE),
+        config.get("IO_INGEST_SAMPLE_BYTES", DEFAULT_SAMPLE_BYTES),
+        progress,
+    )
+    build_dataset_sketches(result["dataset"])
+    return result
+
+
+def get_ingest_status(ds_name: str) -> dict:
+    """
+    Get the status of the latest ingest of a dataset, submitted by any web worker.
+
+    Returns
+    -------
+    dict
+        The state of the dataset's latest ingest job (see `JobManager.submit`),
+        with its `dataset`. None if the dataset was never ingested.
+    """
+    job = job_manager.get_tagged(f"ingest:{ds_name}")
+    if job is None:
+        return None
+    return {"dataset": ds_name, **job}
+
+
+def get_dataset_name(filename: str) -> str:
+    """
+    Get the dataset name for an uploaded file, eg. 'California-Housing.csv' -> 'california_housing'.
+    """
+    return os.path.basename(filename).rsplit(".", 1)[0].lower().replace("-", "_")
+
+
+def _iter_csv_batches(
+    filename: str, block_size: int, sample_bytes: int
+) -> Iterator[pa.RecordBatch]:
+    # Infer the schema from the first block only, then pin it for the whole file
+    with pacsv.open_csv(
+        filename, read_options=pacsv.ReadOptions(block_size=sample_bytes)
+    ) as sample:
+        schema = sample.schema
+    with pacsv.open_csv(
+        filename,
+        read_options=pacsv.ReadOptions(block_size=block_size, use_threads=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={field.name: field.type for field in schema}
+        ),
+    ) as reader:
+        yield from reader
+
+
+def _iter_json_batches(
+    filename: str, block_size: int, sample_bytes: int
+) -> Iterator[pa.RecordBatch]:
+    # Infer the schema from the complete lines in the first `sample_bytes`
+    with open(filename, "rb") as f:
+        sample = f.read(sample_bytes)
+    if len(sample) == sample_bytes and b"\n" in sample:
+        sample = sample[: sample.rindex(b"\n") + 1]
+    schema = pajson.read_json(io.BytesIO(sample)).schema
+
+    read_options = pajson.ReadOptions(block_size=block_size, use_threads=True)
+    parse_options = pajson.ParseOptions(explicit_schema=schema)
+    if hasattr(pajson, "open_json"):
+        with pajson.open_json(
+            filename, read_options=read_options, parse_options=parse_options
+        ) as reader:
+            yield from reader
+    else:
+        # Older pyarrow has no streaming JSON reader, but still parses in parallel
+        yield from pajson.read_json(
+            filename, read_options=read_options, parse_options=parse_options
+        ).to_batches()
+
+
+def _write_row_groups(
+    batches, filename: str, row_group_size: int, progress: Callable = None
+):
+    """
+    Write batches to a parquet file, buffering them into full row groups.
+    """
+    writer = None
+    buffered, n_buffered = [], 0
+    n_rows = n_row_groups = 0
+
+    def flush(final=False):
+        nonlocal buffered, n_buffered, n_rows, n_row_groups
+        table = pa.Table.from_batches(buffered, schema=writer.schema)
+        n_full = len(table) if final else len(table) // row_group_size * row_group_size
+        if n_full:
+            writer.write_table(table.slice(0, n_full), row_group_size=row_group_size)
+            n_rows += n_full
+            n_row_groups += -(-n_full // row_group_size)
+            if progress is not None:
+                progress(n_rows)
+        buffered = table.slice(n_full).to_batches()
+        n_buffered = len(table) - n_full
+
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = pq.ParquetWriter(filename, batch.schema)
+            buffered.append(batch)
+            n_buffered += batch.num_rows
+            if n_buffered >= row_group_size:
+                flush()
+        if writer is None:
+            raise ValueError(f"Cannot ingest `{filename}`: the file has no rows")
+        flush(final=True)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows, n_row_groups
@@ -0,0 +1,357 @@
+import contextlib
+import hashlib
+import importlib
+import json
+import os
+import pickle
+import re
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterator
+
+from .make_process_pool import make_process_pool
+from .write_atomic import write_atomic
+
+try:
+    import fcntl
+except ImportError:  # Windows: jobs are only de-duplicated within a process
+    fcntl = None
+
+DEFAULT_JOB_FOLDER = "./api/v1/io/data/jobs"
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+# The functions jobs run, by kind. They are resolved by name inside the worker,
+# so they only need to be importable, and every one takes a `progress` callback.
+JOB_FUNCTIONS = {
+    "chunk_dataset": "predictables_flask.api.v1.io.src.chunk_dataset:chunk_dataset",
+    "ingest": "predictables_flask.api.v1.io.src.ingest_upload:run_ingest_job",
+    "sketch_dataset": "predictables_flask.api.v1.io.src.dataset_sketches:build_dataset_sketches",
+}
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Minimum time between two progress writes of the same job, in seconds
+PROGRESS_INTERVAL = 0.25
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# The app process pool workers run jobs under, created on their first job
+_worker_app = None
+
+
+class JobManager:
+    """
+    Runs long io tasks (eg. chunking a dataset) on a worker pool, off the
+    request thread.
+
+    Each job's state -- its status ('queued', 'running', 'done' or 'failed'),
+    progress, result and error -- is persisted as JSON in the job folder and
+    written by the worker itself, so it can be read by any web worker, and
+    survives the process that submitted the job. Submitting a job identical to
+    one that is still queued or running (the same kind and parameters) returns
+    the existing job instead of starting another, whichever web worker it
+    was submitted to: the job folder maps the job's parameters to its latest
+    job, and is locked while a job is submitted.
+
+    Every job records its owner, the host and process that will run it. A job
+    is only considered interrupted (and failed, when a manager first uses the
+    job folder) once its owner is gone, so sibling web workers sharing the job
+    folder keep their jobs. Nothing touches the job folder until it is first
+    used, so creating an app (eg. importing `predictables_flask.app`) does not.
+    """
+
+    def __init__(
+        self,
+        folder: str = DEFAULT_JOB_FOLDER,
+        executor: str = "thread",
+        max_workers: int = 2,
+    ):
+        self.folder = folder
+        self.executor = executor
+        self.max_workers = max_workers
+        self.app = None
+        self._pool = None
+        self._prepared = False
+        # Reentrant: a done callback runs inline when the job finished before it was added
+        self._lock = threading.RLock()
+
+    def init_app(self, app) -> None:
+        """
+        Read `IO_JOB_FOLDER`, `IO_JOB_EXECUTOR` and `IO_JOB_MAX_WORKERS` from
+        the app config. The job folder is created, and jobs whose owner is
+        gone are marked as failed, on its first use.
+
+        Jobs run under `app`: in its own process for the 'thread' executor, or
+        under an app created from (the picklable part of) its config in each
+        worker process for the 'process' executor.
+        """
+        executor = app.config.get("IO_JOB_EXECUTOR", self.executor)
+        if executor not in EXECUTORS:
+            raise ValueError(
+                f"Unknown executor `{executor}`. Use one of {list(EXECUTORS)}."
+            )
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            self.app = app
+            self.folder = app.config.get("IO_JOB_FOLDER", self.folder)
+            self.executor = executor
+            self.max_workers = app.config.get("IO_JOB_MAX_WORKERS", self.max_workers)
+            self._prepared = False
+        app.extensions["job_manager"] = self
+
+    def submit(self, kind: str, params: dict = None, tag: str = None) -> dict:
+        """
+        Queue a job, or find the identical job already queued or running.
+
+        Parameters
+        ----------
+        kind : str
+            The kind of job, from `JOB_FUNCTIONS`.
+        params : dict, optional
+            The keyword arguments of the job function. Must be JSON-serializable.
+        tag : str, optional
+            A name to find the job by later, with `get_tagged` (eg. the
+            latest ingest of a dataset). Default is None.
+
+        Returns
+        -------
+        dict
+            The state of the job, including its `job_id`.
+
+        Raises
+        ------
+        ValueError
+            If the kind of job is unknown.
+        """
+        if kind not in JOB_FUNCTIONS:
+            raise ValueError(f"Unknown job `{kind}`. Use one of {list(JOB_FUNCTIONS)}.")
+        params = params or {}
+        key = _digest(json.dumps([kind, params], sort_keys=True))
+        self._prepare()
+        with self._lock, _lock_folder(self.folder):
+            state = self._get_pointer("keys", key)
+            if state is None or not _is_active(state):
+                state = {
+                    "job_id": uuid.uuid4().hex,
+                    "kind": kind,
+                    "params": params,
+                    "status": "queued",
+                    "progress": {"done": 0, "total": None},
+                    "result": None,
+                    "error": None,
+                    "owner": _get_owner(),
+                    "submitted_at": time.time(),
+                    "started_at": None,
+                    "finished_at": None,
+                }
+                _write_state(self.folder, state)
+                self._set_pointer("keys", key, state["job_id"])
+                self._start(state["job_id"])
+            if tag is not None:
+                self._set_pointer("tags", _digest(tag), state["job_id"])
+        return state
+
+    def get(self, job_id: str) -> dict:
+        """
+        Get the state of a job, or None if there is no such job.
+        """
+        if not _JOB_ID.match(job_id):
+            return None
+        self._prepare()
+        try:
+            return _read_state(self.folder, job_id)
+        except FileNotFoundError:
+            return None
+
+    def get_tagged(self, tag: str) -> dict:
+        """
+        Get the state of the latest job submitted with a tag, or None if there is none.
+        """
+        self._prepare()
+        return self._get_pointer("tags", _digest(tag))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker pool, by default waiting for the running jobs to finish.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def _prepare(self) -> None:
+        # Create the job folder and fail interrupted jobs, once per folder
+        with self._lock:
+            if self._prepared:
+                return
+            os.makedirs(self.folder, exist_ok=True)
+            self._fail_interrupted_jobs()
+            self._prepared = True
+
+    def _start(self, job_id: str) -> None:
+        # Caller must hold the lock
+        if self._pool is None:
+            if self.executor == "process":
+                self._pool = make_process_pool(self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        if self.executor == "thread":
+            self._pool.submit(_run_job, self.folder, job_id, self.app)
+        else:
+            # The app cannot be pickled, so the worker builds one from its config
+            config = {k: v for k, v in self.app.config.items() if _is_picklable(v)}
+            self._pool.submit(_run_job_in_process, self.folder, job_id, config)
+
+    def _get_pointer(self, kind: str, name: str) -> dict:
+        try:
+            with open(os.path.join(self.folder, kind, name)) as f:
+                return self.get(f.read().strip())
+        except FileNotFoundError:
+            return None
+
+    def _set_pointer(self, kind: str, name: str, job_id: str) -> None:
+        os.makedirs(os.path.join(self.folder, kind), exist_ok=True)
+        write_atomic(os.path.join(self.folder, kind, name), job_id)
+
+    def _fail_interrupted_jobs(self) -> None:
+        with _lock_folder(self.folder):
+            for name in os.listdir(self.folder):
+                job_id = name[: -len(".json")]
+                if not (name.endswith(".json") and _JOB_ID.match(job_id)):
+                    continue
+                try:
+                    state = _read_state(self.folder, job_id)
+                except (FileNotFoundError, ValueError):
+                    continue
+                if state["status"] in ACTIVE_STATUSES and not _is_active(state):
+                    state.update(
+                        status="failed",
+                        error="The job was interrupted: the process running it is gone",
+                        finished_at=time.time(),
+                    )
+                    _write_state(self.folder, state)
+
+
+def _run_job(folder: str, job_id: str, app) -> dict:
+    """
+    Run a job in a worker thread or process, recording its progress and outcome.
+    """
+    state = _read_state(folder, job_id)
+    state.update(status="running", owner=_get_owner(), started_at=time.time())
+    _write_state(folder, state)
+    last_write = 0.0
+
+    def progress(done: int, total: int = None) -> None:
+        nonlocal last_write
+        state["progress"] = {"done": done, "total": total}
+        now = time.monotonic()
+        if now - last_write >= PROGRESS_INTERVAL or done == total:
+            last_write = now
+            _write_state(folder, state)
+
+    # Job functions read their settings (and the database) through `current_app`
+    with app.app_context():
+        try:
+            job_function = _get_job_function(state["kind"])
+            result = job_function(**state["params"], progress=progress)
+            state.update(status="done", result=result)
+        except Exception as e:
+            state.update(status="failed", error=str(e))
+    state["finished_at"] = time.time()
+    _write_state(folder, state)
+    return state
+
+
+def _run_job_in_process(folder: str, job_id: str, config: dict) -> dict:
+    """
+    Run a job in a pool process, under an app created once per process with
+    the submitting app's config.
+    """
+    global _worker_app
+    if _worker_app is None:
+        from predictables_flask.app import create_app
+
+        _worker_app = create_app(type("JobConfig", (), config))
+    return _run_job(folder, job_id, _worker_app)
+
+
+def _get_job_function(kind: str) -> Callable:
+    module, name = JOB_FUNCTIONS[kind].split(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def _get_owner() -> dict:
+    return {"host": socket.gethostname(), "pid": os.getpid()}
+
+
+def _is_active(state: dict) -> bool:
+    """
+    Whether a job is queued or running, and the process that owns it is still alive.
+    """
+    if state["status"] not in ACTIVE_STATUSES:
+        return False
+    owner = state.get("owner")
+    if owner is None:
+        # Written before jobs had owners
+        return False
+    if owner["host"] != socket.gethostname():
+        # Only the owner's host can tell; its apps fail the job if it is gone
+        return True
+    if owner["pid"] == os.getpid():
+        return True
+    try:
+        os.kill(owner["pid"], 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Alive, but another user's process
+        return True
+    return True
+
+
+@contextlib.contextmanager
+def _lock_folder(folder: str) -> Iterator[None]:
+    # An exclusive lock on the job folder, across the processes of this host
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(folder, ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _is_picklable(value) -> bool:
+    try:
+        pickle.dumps(value)
+        return True
+    except Exception:
+        return False
+
+
+def _get_state_filename(folder: str, job_id: str) -> str:
+    return os.path.join(folder, f"{job_id}.json")
+
+
+def _read_state(folder: str, job_id: str) -> dict:
+    with open(_get_state_filename(folder, job_id)) as f:
+        return json.load(f)
+
+
+def _write_state(folder: str, state: dict) -> None:
+    write_atomic(_get_state_filename(folder, state["job_id"]), json.dumps(state))
+
+
+job_manager = JobManager()
@@ -0,0 +1,28 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def make_process_pool(max_workers: int = None) -> ProcessPoolExecutor:
+    """
+    Start a process pool whose workers come from a fork server (or are spawned
+    where there is none) rather than being forked from the current process.
+
+    Pools are started from server processes that may be running other threads,
+    and from job workers that would otherwise inherit (and wait on) the fork
+    server of the process they were forked from.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        The size of the pool. Default is None, which uses the number of CPUs.
+
+    Returns
+    -------
+    ProcessPoolExecutor
+        The pool. Functions submitted to it must be importable by name.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+    else:
+        context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
@@ -0,0 +1,52 @@
+from flask import Request
+
+from .encode_table import TABLE_FORMATS
+
+JSON_MIMETYPE = "application/json"
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# Text formats, as opposed to the binary `TABLE_FORMATS`
+TEXT_FORMATS = {"json": JSON_MIMETYPE, "ndjson": NDJSON_MIMETYPE}
+
+
+def negotiate_format(request: Request) -> str:
+    """
+    Pick the response format for an io request.
+
+    An explicit `format=` query parameter wins. Otherwise the best match for
+    the `Accept` header is used, preferring JSON when the client accepts anything.
+
+    Parameters
+    ----------
+    request : Request
+        The Flask request object.
+
+    Returns
+    -------
+    fmt : str
+        One of the keys of `TEXT_FORMATS` ('json' or 'ndjson') or `TABLE_FORMATS`.
+
+    Raises
+    ------
+    ValueError
+        If the requested format is not supported.
+    """
+    fmt = request.args.get("format", None)
+    if fmt is not None:
+        fmt = fmt.lower()
+        if fmt not in TEXT_FORMATS and fmt not in TABLE_FORMATS:
+            raise ValueError(
+                f"Unknown format `{fmt}`. Use one of {list(TEXT_FORMATS) + list(TABLE_FORMATS)}."
+            )
+        return fmt
+
+    if not request.accept_mimetypes:
+        return "json"
+    mimetypes = {mimetype: fmt for fmt, mimetype in TEXT_FORMATS.items()}
+    mimetypes.update({mimetype: fmt for fmt, mimetype in TABLE_FORMATS.items()})
+    best = request.accept_mimetypes.best_match(list(mimetypes))
+    if best is None:
+        raise ValueError(
+            f"None of the accepted mimetypes are supported. Use one of {list(mimetypes)}."
+        )
+    return mimetypes[best]
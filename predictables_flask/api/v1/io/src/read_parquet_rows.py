@@ -0,0 +1,103 @@
+from typing import Iterator, List
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def iter_parquet_rows(
+    parquet_file: pq.ParquetFile,
+    start: int,
+    stop: int,
+    batch_size: int = 10000,
+    columns: List[str] = None,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Lazily read the rows `[start, stop)` of a parquet file.
+
+    Only the row groups overlapping the requested range are read and decoded,
+    so the cost is proportional to the size of the range, not of the file.
+
+    Parameters
+    ----------
+    parquet_file : pq.ParquetFile
+        The opened parquet file.
+    start : int
+        The index of the first row to read.
+    stop : int
+        The index one past the last row to read.
+    batch_size : int, optional
+        The maximum number of rows in each yielded batch. Default is 10000.
+    columns : list of str, optional
+        The columns to read. Default is None, which reads every column.
+
+    Yields
+    ------
+    pa.RecordBatch
+        The record batches covering the requested rows, in order.
+    """
+    row_groups, position = _get_overlapping_row_groups(parquet_file, start, stop)
+    if not row_groups:
+        return
+
+    for batch in parquet_file.iter_batches(
+        batch_size=batch_size, row_groups=row_groups, columns=columns
+    ):
+        batch_start, batch_stop = position, position + batch.num_rows
+        position = batch_stop
+        if batch_stop <= start:
+            continue
+        if batch_start >= stop:
+            break
+        lo = max(start - batch_start, 0)
+        hi = min(stop, batch_stop) - batch_start
+        yield batch.slice(lo, hi - lo)
+
+
+def read_parquet_rows(
+    parquet_file: pq.ParquetFile, start: int, stop: int, columns: List[str] = None
+) -> pa.Table:
+    """
+    Read the rows `[start, stop)` of a parquet file into a table.
+
+    Parameters
+    ----------
+    parquet_file : pq.ParquetFile
+        The opened parquet file.
+    start : int
+        The index of the first row to read.
+    stop : int
+        The index one past the last row to read.
+    columns : list of str, optional
+        The columns to read. Default is None, which reads every column.
+
+    Returns
+    -------
+    pa.Table
+        A table holding only the requested rows.
+    """
+    row_groups, position = _get_overlapping_row_groups(parquet_file, start, stop)
+    if not row_groups:
+        return parquet_file.schema_arrow.empty_table().select(
+            columns or parquet_file.schema_arrow.names
+        )
+    table = parquet_file.read_row_groups(row_groups, columns=columns)
+    return table.slice(start - position, max(stop - start, 0))
+
+
+def _get_overlapping_row_groups(parquet_file: pq.ParquetFile, start: int, stop: int):
+    """
+    Get the row groups overlapping `[start, stop)` from the file footer, and the
+    index of the first row of the first of them.
+    """
+    metadata = parquet_file.metadata
+    row_groups = []
+    first_row = 0
+    group_start = 0
+    for i in range(metadata.num_row_groups):
+        group_stop = group_start + metadata.row_group(i).num_rows
+        if group_stop > start and group_start < stop:
+            if not row_groups:
+                first_row = group_start
+            row_groups.append(i)
+        group_start = group_stop
+    return row_groups, first_row
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import uuid
+from typing import BinaryIO, List
+
+from flask import current_app
+from werkzeug.utils import secure_filename
+
+from .upload_dataset import allowed_file
+
+# Size of the blocks streamed from the request body to disk
+BLOCK_SIZE = 1024 * 1024
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def initiate_upload(filename: str) -> dict:
+    """
+    Start a resumable upload.
+
+    The file is then sent as numbered parts with `upload_part` (in any order,
+    and again after a dropped connection), and assembled with `complete_upload`.
+
+    Parameters
+    ----------
+    filename : str
+        The name of the file being uploaded. Must have one of the
+        `ALLOWED_EXTENSIONS`.
+
+    Returns
+    -------
+    dict
+        The `upload_id` to send the parts to, and the sanitized filename.
+
+    Raises
+    ------
+    ValueError
+        If the file type is not allowed.
+    """
+    if not filename or not allowed_file(filename):
+        raise ValueError(f"Invalid file type: `{filename}`")
+    upload_id = uuid.uuid4().hex
+    upload_dir = _get_upload_dir(upload_id)
+    os.makedirs(upload_dir)
+    state = {"upload_id": upload_id, "filename": secure_filename(filename)}
+    with open(os.path.join(upload_dir, "upload.json"), "w") as f:
+        json.dump(state, f)
+    return state
+
+
+def upload_part(
+    upload_id: str, part_number: int, stream: BinaryIO, sha256: str = None
+) -> dict:
+    """
+    Stream one part of a resumable upload to disk.
+
+    The part is read in blocks of `BLOCK_SIZE`, so memory stays bounded
+    whatever the size of the part, and hashed as it is written. It only
+    replaces an earlier copy of the same part once it is complete and verified.
+
+    Parameters
+    ----------
+    upload_id : str
+        The id returned by `initiate_upload`.
+    part_number : int
+        The number of the part, starting at 1.
+    stream : file-like
+        The body of the part, eg. `request.stream`.
+    sha256 : str, optional
+        The expected SHA-256 hex digest of the part. Default is None, which
+        skips verification.
+
+    Returns
+    -------
+    dict
+        The part number, its size in bytes and its SHA-256 hex digest.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no such upload.
+    ValueError
+        If the part number is invalid, the part is larger than
+        `UPLOAD_MAX_PART_BYTES`, or its hash does not match `sha256`.
+    """
+    upload_dir = _get_existing_upload_dir(upload_id)
+    if part_number < 1:
+        raise ValueError(f"Invalid part number: {part_number}")
+    max_bytes = current_app.config.get("UPLOAD_MAX_PART_BYTES", 64 * 1024 * 1024)
+
+    part_filename = _get_part_filename(upload_dir, part_number)
+    tmp_filename = f"{part_filename}.{uuid.uuid4().hex}.tmp"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_filename, "wb") as f:
+            for block in iter(lambda: stream.read(BLOCK_SIZE), b""):
+                size += len(block)
+                if size > max_bytes:
+                    raise ValueError(f"Part {part_number} is larger than {max_bytes} bytes")
+                digest.update(block)
+                f.write(block)
+        if sha256 is not None and digest.hexdigest() != sha256.lower():
+            raise ValueError(
+                f"Part {part_number} does not match its hash: expected {sha256}, got {digest.hexdigest()}"
+            )
+        part = {"part_number": part_number, "size": size, "sha256": digest.hexdigest()}
+        # The description is moved into place last, so a listed part always has its data
+        with open(f"{tmp_filename}.json", "w") as f:
+            json.dump(part, f)
+        os.replace(tmp_filename, part_filename)
+        os.replace(f"{tmp_filename}.json", f"{part_filename}.json")
+    finally:
+        for filename in [tmp_filename, f"{tmp_filename}.json"]:
+            if os.path.exists(filename):
+                os.remove(filename)
+    return part
+
+
+def get_upload_status(upload_id: str) -> dict:
+    """
+    Get the parts of a resumable upload that the server already has.
+
+    Parameters
+    ----------
+    upload_id : str
+        The id returned by `initiate_upload`.
+
+    Returns
+    -------
+    dict
+        The upload id, the filename, and the number, size and SHA-256 of each
+        received part, so a client can resume by sending only the rest.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no such upload.
+    """
+    upload_dir = _get_existing_upload_dir(upload_id)
+    with open(os.path.join(upload_dir, "upload.json")) as f:
+        state = json.load(f)
+    state["parts"] = _list_parts(upload_dir)
+    return state
+
+
+def complete_upload(upload_id: str, part_numbers: List[int] = None) -> dict:
+    """
+    Assemble the parts of a resumable upload into the final file.
+
+    Parameters
+    ----------
+    upload_id : str
+        The id returned by `initiate_upload`.
+    part_numbers : list of int, optional
+        The parts the client sent. Default is None, which uses every received
+        part. Either way the parts must be numbered 1 to n with no gaps.
+
+    Returns
+    -------
+    dict
+        The path of the assembled file in `UPLOAD_FOLDER`, its size and its
+        SHA-256 hex digest.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no such upload.
+    ValueError
+        If parts are missing.
+    """
+    status = get_upload_status(upload_id)
+    upload_dir = _get_upload_dir(upload_id)
+    received = [part["part_number"] for part in status["parts"]]
+    expected = part_numbers if part_numbers is not None else received
+    if not expected:
+        raise ValueError(f"Upload {upload_id} has no parts")
+    missing = sorted(set(range(1, max(expected) + 1)) - set(received))
+    if missing:
+        raise ValueError(f"Upload {upload_id} is missing parts: {missing}")
+
+    upload_folder = current_app.config["UPLOAD_FOLDER"]
+    filename = os.path.join(upload_folder, status["filename"])
+    tmp_filename = f"{filename}.{upload_id}.tmp"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_filename, "wb") as out:
+            for part_number in range(1, max(expected) + 1):
+                with open(_get_part_filename(upload_dir, part_number), "rb") as f:
+                    for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+                        digest.update(block)
+                        size += len(block)
+                        out.write(block)
+        os.replace(tmp_filename, filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+    shutil.rmtree(upload_dir, ignore_errors=True)
+    return {"filename": filename, "size": size, "sha256": digest.hexdigest()}
+
+
+def abort_upload(upload_id: str) -> None:
+    """
+    Discard a resumable upload and the parts received so far.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no such upload.
+    """
+    shutil.rmtree(_get_existing_upload_dir(upload_id))
+
+
+def _get_upload_dir(upload_id: str) -> str:
+    if not _UPLOAD_ID.match(upload_id):
+        raise FileNotFoundError(f"Upload {upload_id} was not found")
+    return os.path.join(current_app.config["UPLOAD_FOLDER"], ".parts", upload_id)
+
+
+def _get_existing_upload_dir(upload_id: str) -> str:
+    upload_dir = _get_upload_dir(upload_id)
+    if not os.path.isdir(upload_dir):
+        raise FileNotFoundError(f"Upload {upload_id} was not found")
+    return upload_dir
+
+
+def _get_part_filename(upload_dir: str, part_number: int) -> str:
+    return os.path.join(upload_dir, f"part_{str(part_number).zfill(6)}")
+
+
+def _list_parts(upload_dir: str) -> List[dict]:
+    parts = []
+    for name in sorted(os.listdir(upload_dir)):
+        if name.startswith("part_") and name.endswith(".json"):
+            with open(os.path.join(upload_dir, name)) as f:
+                parts.append(json.load(f))
+    return parts
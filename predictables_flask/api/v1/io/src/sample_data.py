@@ -1,16 +1,212 @@
 import pandas as pd
-from flask import jsonify
+import pyarrow as pa
+import pyarrow.parquet as pq
+from flask import Response, current_app, jsonify
 
+from .arrow_store import open_arrow_table, use_arrow_store
+from .encode_table import TABLE_FORMATS, encode_table
+from .etags import make_etag, not_modified
+from .get_file_version import get_file_version
+from .get_parquet_filename import get_parquet_filename
+from .sample_data_cache import sample_data_cache
+from .table_query import TableQuery, read_parquet_schema
 
-def get_sample_data(ds_name: str, orient: str = "records") -> str:
+
+def get_sample_data(
+    ds_name: str, orient: str = "records", query: TableQuery = None
+) -> Response:
     """
     Get data from parquet file represented by ds_name and return it as a json string.
+
+    With a `query`, only its columns and the rows matching its filters are
+    read (see `read_query_table`) and returned.
+
+    Both the parsed DataFrame and the encoded response body are kept in
+    `sample_data_cache`, keyed by the dataset, the orient and the version of
+    the parquet file, so repeated requests skip parsing and serialization.
+    The response carries a strong ETag, and a matching `If-None-Match` is
+    answered with a 304 without touching the data.
     """
     try:
-        return jsonify(
-            pd.read_parquet(f"./api/v1/io/data/{ds_name}.parquet").to_json(
-                orient=orient
-            )
+        filename = get_parquet_filename(ds_name)
+        version = get_file_version(filename)
+        query = _bind_query(query, filename, version)
+        etag = make_etag("sample-data", ds_name, "json", orient, query, version)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+
+        key = ("json", ds_name, orient, query, version)
+        body = sample_data_cache.get(key)
+        if body is None:
+            if query:
+                df = read_query_table(ds_name, filename, version, query).to_pandas()
+            else:
+                df = get_sample_dataframe(ds_name, filename, version)
+            body = current_app.json.response(df.to_json(orient=orient)).get_data()
+            sample_data_cache.put(key, body, len(body))
+
+        response = current_app.response_class(
+            body, mimetype=current_app.json.mimetype
         )
+        response.set_etag(etag)
+        return response
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)})
+
+
+def get_sample_dataframe(ds_name: str, filename: str, version: tuple) -> pd.DataFrame:
+    """
+    Get the parsed DataFrame for a dataset, reading the parquet file on a cache miss.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+    filename : str
+        The path to the parquet file.
+    version : tuple
+        The version of the parquet file, as returned by `get_file_version`.
+
+    Returns
+    -------
+    df : pd.DataFrame
+        The cached DataFrame. It is shared between requests and must not be
+        modified. With `IO_USE_ARROW_STORE`, the frame is instead converted from
+        the memory-mapped table for each call and not cached, so no worker
+        keeps a private copy of the dataset.
+    """
+    if use_arrow_store():
+        return open_arrow_table(ds_name, filename, version).to_pandas()
+
+    def _load():
+        df = pd.read_parquet(filename)
+        return df, int(df.memory_usage(deep=True).sum())
+
+    return sample_data_cache.get_or_load(("frame", ds_name, version), _load)
+
+
+def get_sample_data_as(ds_name: str, fmt: str, query: TableQuery = None) -> Response:
+    """
+    Get data from parquet file represented by ds_name in a binary format.
+
+    The Arrow table is kept in `sample_data_cache`. The Arrow IPC stream is
+    written straight from the cached table; the parquet and msgpack encodings
+    are cached as well.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+    fmt : str
+        One of the keys of `TABLE_FORMATS`: 'arrow', 'parquet' or 'msgpack'.
+    query : TableQuery, optional
+        The columns and filters to apply. Default is None, which returns the
+        whole dataset.
+
+    Returns
+    -------
+    Response
+        The encoded dataset, with the mimetype of the format.
+    """
+    try:
+        filename = get_parquet_filename(ds_name)
+        version = get_file_version(filename)
+        query = _bind_query(query, filename, version)
+        etag = make_etag("sample-data", ds_name, fmt, query, version)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+
+        if fmt == "arrow":
+            table = _get_query_table(ds_name, filename, version, query)
+            response = Response(encode_table(table, fmt), mimetype=TABLE_FORMATS[fmt])
+        else:
+            key = (fmt, ds_name, query, version)
+            body = sample_data_cache.get(key)
+            if body is None:
+                table = _get_query_table(ds_name, filename, version, query)
+                body = b"".join(encode_table(table, fmt))
+                sample_data_cache.put(key, body, len(body))
+            response = Response(body, mimetype=TABLE_FORMATS[fmt])
+        response.set_etag(etag)
+        return response
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)})
+
+
+def get_sample_table(ds_name: str, filename: str, version: tuple) -> pa.Table:
+    """
+    Get the Arrow table for a dataset, reading the parquet file on a cache miss.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+    filename : str
+        The path to the parquet file.
+    version : tuple
+        The version of the parquet file, as returned by `get_file_version`.
+
+    Returns
+    -------
+    table : pa.Table
+        The cached (immutable) table. With `IO_USE_ARROW_STORE`, the table is
+        memory-mapped from the Arrow store (see `open_arrow_table`).
+    """
+    if use_arrow_store():
+        return open_arrow_table(ds_name, filename, version)
+
+    def _load():
+        table = pq.read_table(filename)
+        return table, table.nbytes
+
+    return sample_data_cache.get_or_load(("table", ds_name, version), _load)
+
+
+def read_query_table(
+    ds_name: str, filename: str, version: tuple, query: TableQuery
+) -> pa.Table:
+    """
+    Read the columns and rows of a dataset selected by a (bound) query.
+
+    The projection and filters are pushed down into the parquet scan, so
+    unselected columns are never decoded and row groups whose statistics rule
+    out the filters are skipped. With `IO_USE_ARROW_STORE`, the query is
+    applied to the memory-mapped table instead.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+    filename : str
+        The path to the parquet file.
+    version : tuple
+        The version of the parquet file, as returned by `get_file_version`.
+    query : TableQuery
+        The columns and filters, bound to the dataset's schema.
+
+    Returns
+    -------
+    table : pa.Table
+        The selected columns of the matching rows, in order.
+    """
+    if use_arrow_store():
+        return query.apply(open_arrow_table(ds_name, filename, version))
+    return query.read_parquet(filename)
+
+
+def _get_query_table(ds_name, filename, version, query) -> pa.Table:
+    if query:
+        return read_query_table(ds_name, filename, version, query)
+    return get_sample_table(ds_name, filename, version)
+
+
+def _bind_query(query: TableQuery, filename: str, version: tuple) -> TableQuery:
+    if not query:
+        return None
+    return query.bind(read_parquet_schema(filename, version))
@@ -0,0 +1,152 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+
+class SampleDataCache:
+    """
+    A thread-safe, byte-budgeted LRU cache for parsed datasets and their
+    serialized responses.
+
+    Keys are tuples whose first element is the kind of entry (eg. "frame" or
+    "json") and whose last element is the version of the file the entry was
+    built from (see `get_file_version`). When an entry is stored, any entry
+    with the same key but a different file version is dropped, so a rewritten
+    parquet file never serves stale data.
+
+    Values are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._kind_stats = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """
+        Read the byte budget from `SAMPLE_DATA_CACHE_MAX_BYTES` in the app config.
+        """
+        self.max_bytes = app.config.get("SAMPLE_DATA_CACHE_MAX_BYTES", self.max_bytes)
+        app.extensions["sample_data_cache"] = self
+        with self._lock:
+            self._evict()
+
+    def get(self, key: Tuple[Hashable, ...]) -> Any:
+        """
+        Get an entry from the cache, or None if it is not cached.
+
+        Parameters
+        ----------
+        key : tuple
+            The cache key, `(kind, ..., file_version)`.
+
+        Returns
+        -------
+        value : Any
+            The cached value, or None on a miss.
+        """
+        with self._lock:
+            kind_stats = self._kind_stats.setdefault(key[0], {"hits": 0, "misses": 0})
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                kind_stats["hits"] += 1
+                return self._entries[key][0]
+            self.misses += 1
+            kind_stats["misses"] += 1
+            return None
+
+    def put(self, key: Tuple[Hashable, ...], value: Any, nbytes: int) -> None:
+        """
+        Store an entry in the cache, evicting least recently used entries
+        until the cache fits in its byte budget.
+
+        Parameters
+        ----------
+        key : tuple
+            The cache key, `(kind, ..., file_version)`.
+        value : Any
+            The value to cache.
+        nbytes : int
+            The (estimated) size of the value in bytes. Values larger than the
+            whole budget are not cached.
+        """
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            stale = [k for k in self._entries if k[:-1] == key[:-1] and k != key]
+            for k in stale + [key]:
+                if k in self._entries:
+                    self.current_bytes -= self._entries.pop(k)[1]
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            self._evict()
+
+    def get_or_load(
+        self, key: Tuple[Hashable, ...], loader: Callable[[], Tuple[Any, int]]
+    ) -> Any:
+        """
+        Get an entry from the cache, calling `loader` on a miss.
+
+        Parameters
+        ----------
+        key : tuple
+            The cache key, `(kind, ..., file_version)`.
+        loader : callable
+            A function returning `(value, nbytes)` for the key.
+
+        Returns
+        -------
+        value : Any
+            The cached or freshly loaded value.
+        """
+        value = self.get(key)
+        if value is None:
+            value, nbytes = loader()
+            self.put(key, value, nbytes)
+        return value
+
+    def clear(self) -> None:
+        """
+        Remove every entry and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self._kind_stats = {}
+
+    def stats(self) -> dict:
+        """
+        Get the hit/miss counters and the memory usage of the cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "by_kind": {k: dict(v) for k, v in self._kind_stats.items()},
+            }
+
+    def _evict(self) -> None:
+        # Caller must hold the lock
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.current_bytes -= nbytes
+            self.evictions += 1
+
+
+# Shared cache for the io blueprint, configured in `create_app`
+sample_data_cache = SampleDataCache()
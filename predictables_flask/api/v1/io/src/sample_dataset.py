@@ -0,0 +1,344 @@
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from flask import Response, current_app, jsonify
+
+from .arrow_store import open_arrow_table, use_arrow_store
+from .encode_table import TABLE_FORMATS, encode_table
+from .etags import make_etag, not_modified
+from .get_file_version import get_file_version
+from .get_parquet_filename import get_parquet_filename
+from .negotiate_format import TEXT_FORMATS
+from .stream_sample_data import (
+    STREAMABLE_ORIENTS,
+    iter_json_batches,
+    iter_ndjson_batches,
+)
+from .table_query import TableQuery, read_parquet_schema
+
+SAMPLE_MODES = ("uniform", "stratified", "reservoir")
+
+
+def sample_dataset(
+    ds_name: str,
+    mode: str = "uniform",
+    fraction: float = None,
+    n: int = None,
+    by: str = None,
+    seed: int = None,
+    query: TableQuery = None,
+    batch_size: int = None,
+) -> pa.Table:
+    """
+    Draw a random sample of the rows of a dataset in one streaming pass.
+
+    The parquet file is read one record batch at a time (with the query's
+    projection and filters pushed down), and only the sampled rows are kept,
+    so memory is bounded by the size of the sample rather than the dataset.
+
+    - 'uniform' keeps each row independently with probability `fraction`.
+    - 'reservoir' keeps exactly `n` rows (or every row, if there are fewer),
+      each set of `n` rows being equally likely. Each row gets a random key
+      and the rows with the `n` smallest keys are kept.
+    - 'stratified' samples each distinct value of the `by` column separately:
+      `n` rows per stratum, or `fraction` of each stratum (rounded up, so
+      every stratum is represented). The stratum sizes for `fraction` are
+      counted in a first pass that only reads the `by` column.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+    mode : str, optional
+        One of `SAMPLE_MODES`. Default is 'uniform'.
+    fraction : float, optional
+        The fraction of rows to keep, in (0, 1]. Required for 'uniform'.
+    n : int, optional
+        The number of rows to keep (per stratum, for 'stratified'). Required
+        for 'reservoir'.
+    by : str, optional
+        The column to stratify by. Required for 'stratified'.
+    seed : int, optional
+        The seed of the random generator. The same seed, dataset version and
+        parameters always give the same sample. Default is None.
+    query : TableQuery, optional
+        The columns and filters to apply before sampling. Default is None.
+    batch_size : int, optional
+        The number of rows to read at a time. Default is None, which uses
+        `IO_STREAM_BATCH_ROWS` from the app config.
+
+    Returns
+    -------
+    pa.Table
+        The sampled rows, in the order of the dataset.
+
+    Raises
+    ------
+    ValueError
+        If the parameters are invalid for the mode, or the query or `by`
+        column do not match the dataset.
+    FileNotFoundError
+        If there is no parquet file for the dataset.
+    """
+    _check_parameters(mode, fraction, n, by)
+    if batch_size is None:
+        batch_size = current_app.config.get("IO_STREAM_BATCH_ROWS", 10000)
+
+    filename = get_parquet_filename(ds_name)
+    version = get_file_version(filename)
+    schema = read_parquet_schema(filename, version)
+    query = (query or TableQuery()).bind(schema)
+    if by is not None and schema.get_field_index(by) < 0:
+        raise ValueError(f"Unknown column `{by}`")
+
+    # The stratum column is read even if it is not projected
+    scan = query
+    if by is not None and query.columns is not None and by not in query.columns:
+        scan = TableQuery(query.columns + (by,), query.filters)
+    scan_schema = pa.schema(
+        [schema.field(name) for name in (scan.columns or schema.names)]
+    )
+
+    def _iter_batches(scan_query):
+        if use_arrow_store():
+            table = scan_query.apply(open_arrow_table(ds_name, filename, version))
+            return table.to_batches(max_chunksize=batch_size)
+        return scan_query.iter_parquet(filename, batch_size)
+
+    rng = np.random.default_rng(seed)
+    if mode == "uniform":
+        sample = _bernoulli_sample(_iter_batches(scan), scan_schema, fraction, rng)
+    elif mode == "reservoir":
+        sample = _keyed_sample(_iter_batches(scan), scan_schema, rng, lambda _: n)
+    else:
+        if n is not None:
+            limits = lambda uniques: np.full(len(uniques), n)  # noqa: E731
+        else:
+            counts = _count_strata(
+                _iter_batches(TableQuery((by,), query.filters)), by
+            )
+            limits = lambda uniques: np.ceil(  # noqa: E731
+                fraction * counts.reindex(uniques, fill_value=0).to_numpy()
+            )
+        sample = _keyed_sample(_iter_batches(scan), scan_schema, rng, limits, by)
+
+    if query.columns is not None:
+        sample = sample.select(list(query.columns))
+    return sample
+
+
+def get_dataset_sample(
+    ds_name: str,
+    mode: str = "uniform",
+    fraction: float = None,
+    n: int = None,
+    by: str = None,
+    seed: int = None,
+    query: TableQuery = None,
+    fmt: str = "json",
+    orient: str = "records",
+) -> Response:
+    """
+    Get a random sample of a dataset (see `sample_dataset`).
+
+    A seeded sample is reproducible, so it carries a strong ETag and a
+    matching `If-None-Match` is answered with a 304 without reading the data.
+
+    Parameters
+    ----------
+    fmt : str, optional
+        Either 'json', 'ndjson' or one of the keys of `TABLE_FORMATS`.
+        Default is 'json'.
+    orient : str, optional
+        The JSON orient, either 'records' or 'values'. Default is 'records'.
+
+    Returns
+    -------
+    Response
+        The sampled rows: a JSON array, one JSON record per line, or the
+        binary encoding of the table.
+        A 400 for invalid parameters, a 404 if there is no such dataset.
+    """
+    if fmt == "json" and orient not in STREAMABLE_ORIENTS:
+        return (
+            jsonify(
+                {
+                    "error": f"Unknown orient `{orient}`. Use one of {list(STREAMABLE_ORIENTS)}."
+                }
+            ),
+            400,
+        )
+
+    etag = None
+    if seed is not None:
+        try:
+            version = get_file_version(get_parquet_filename(ds_name))
+        except FileNotFoundError as e:
+            return jsonify({"error": str(e)}), 404
+        etag = make_etag(
+            "sample", ds_name, fmt, orient, mode, fraction, n, by, seed, query, version
+        )
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+
+    try:
+        sample = sample_dataset(ds_name, mode, fraction, n, by, seed, query)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+
+    if fmt == "json":
+        response = Response(
+            iter_json_batches(sample.to_batches(), orient), mimetype=TEXT_FORMATS[fmt]
+        )
+    elif fmt == "ndjson":
+        response = Response(
+            iter_ndjson_batches(sample.to_batches()), mimetype=TEXT_FORMATS[fmt]
+        )
+    else:
+        response = Response(encode_table(sample, fmt), mimetype=TABLE_FORMATS[fmt])
+    if etag is not None:
+        response.set_etag(etag)
+    return response
+
+
+def _check_parameters(mode: str, fraction: float, n: int, by: str) -> None:
+    if mode not in SAMPLE_MODES:
+        raise ValueError(f"Unknown sample mode `{mode}`. Use one of {list(SAMPLE_MODES)}.")
+    if fraction is not None and not 0 < fraction <= 1:
+        raise ValueError("`fraction` must be in (0, 1]")
+    if n is not None and n < 0:
+        raise ValueError("`n` must not be negative")
+    if mode == "uniform" and fraction is None:
+        raise ValueError("A uniform sample needs a `fraction`")
+    if mode == "reservoir" and n is None:
+        raise ValueError("A reservoir sample needs `n`")
+    if mode == "stratified":
+        if by is None:
+            raise ValueError("A stratified sample needs a `by` column")
+        if (fraction is None) == (n is None):
+            raise ValueError("A stratified sample needs either `n` or a `fraction`")
+
+
+def _bernoulli_sample(
+    batches: Iterable[pa.RecordBatch],
+    schema: pa.Schema,
+    fraction: float,
+    rng: np.random.Generator,
+) -> pa.Table:
+    kept = [
+        batch.filter(pa.array(rng.random(batch.num_rows) < fraction))
+        for batch in batches
+    ]
+    return pa.Table.from_batches(kept, schema=schema)
+
+
+def _keyed_sample(
+    batches: Iterable[pa.RecordBatch],
+    schema: pa.Schema,
+    rng: np.random.Generator,
+    limits,
+    by: str = None,
+) -> pa.Table:
+    """
+    Keep the rows with the smallest random keys: at most `limits(uniques)[i]`
+    rows of the i-th stratum, or `limits(None)` rows in all without `by`.
+
+    Each stratum is a reservoir: once full, it only takes rows that beat its
+    largest key. Taken rows are buffered, and the buffer is only compacted
+    (each stratum cut back to its smallest keys) once it holds twice as many
+    rows as the reservoirs can, so a row is ranked a constant number of times
+    on average rather than once per batch.
+    """
+    strata = pd.Index([])
+    n = np.empty(0, dtype=np.int64)
+    seen = np.empty(0, dtype=np.int64)
+    thresholds = np.empty(0)
+    pieces, keys, codes, rows = [], [], [], []
+    n_buffered = 0
+    offset = 0
+    for batch in batches:
+        batch_keys = rng.random(batch.num_rows)
+        batch_rows = np.arange(offset, offset + batch.num_rows)
+        offset += batch.num_rows
+        if by is None:
+            batch_codes, uniques = np.zeros(batch.num_rows, dtype=np.intp), [None]
+        else:
+            batch_codes, uniques = pd.factorize(
+                batch.column(by).to_pandas(), use_na_sentinel=False
+            )
+        index = strata.get_indexer(uniques)
+        is_new = index < 0
+        if is_new.any():
+            new = pd.Index(uniques)[is_new]
+            index[is_new] = np.arange(len(strata), len(strata) + len(new))
+            strata = strata.append(new)
+            new_n = np.asarray(
+                [limits(None)] if by is None else limits(new), dtype=np.int64
+            )
+            n = np.concatenate([n, new_n])
+            seen = np.concatenate([seen, np.zeros(len(new), dtype=np.int64)])
+            thresholds = np.concatenate(
+                [thresholds, np.where(new_n > 0, np.inf, -np.inf)]
+            )
+        batch_codes = index[batch_codes]
+        seen += np.bincount(batch_codes, minlength=len(strata))
+
+        mask = batch_keys < thresholds[batch_codes]
+        if not mask.all():
+            batch = batch.filter(pa.array(mask))
+            batch_keys, batch_codes = batch_keys[mask], batch_codes[mask]
+            batch_rows = batch_rows[mask]
+        if batch.num_rows == 0:
+            continue
+
+        pieces.append(pa.Table.from_batches([batch], schema=schema))
+        keys.append(batch_keys)
+        codes.append(batch_codes)
+        rows.append(batch_rows)
+        n_buffered += batch.num_rows
+        if n_buffered > 2 * np.minimum(seen, n).sum():
+            pieces, keys, codes, rows, thresholds = _compact(
+                pieces, keys, codes, rows, n
+            )
+            n_buffered = len(keys[0])
+
+    if not pieces:
+        return schema.empty_table()
+    if n_buffered > np.minimum(seen, n).sum():
+        pieces, keys, codes, rows, _ = _compact(pieces, keys, codes, rows, n)
+    order = np.argsort(np.concatenate(rows), kind="stable")
+    return pa.concat_tables(pieces).take(order)
+
+
+def _compact(pieces, keys, codes, rows, n):
+    """
+    Cut each stratum of the buffered rows of `_keyed_sample` back to its
+    `n[i]` smallest keys. Also returns the threshold a key must beat to enter
+    each stratum: its largest key if it is full, infinity otherwise.
+    """
+    keys = np.concatenate(keys)
+    codes = np.concatenate(codes)
+    rows = np.concatenate(rows)
+    ranks = pd.Series(keys).groupby(codes).rank(method="first").to_numpy()
+    keep = np.flatnonzero(ranks <= n[codes])
+    table = pa.concat_tables(pieces).take(keep).combine_chunks()
+    keys, codes, rows = keys[keep], codes[keep], rows[keep]
+
+    largest = np.full(len(n), -np.inf)
+    np.maximum.at(largest, codes, keys)
+    full = np.bincount(codes, minlength=len(n)) >= n
+    thresholds = np.where(full, largest, np.inf)
+    return [table], [keys], [codes], [rows], thresholds
+
+
+def _count_strata(batches: Iterable[pa.RecordBatch], by: str) -> pd.Series:
+    counts = pd.Series(dtype=np.int64)
+    for batch in batches:
+        values = batch.column(by).to_pandas().value_counts(dropna=False)
+        counts = counts.add(values, fill_value=0)
+    return counts
@@ -0,0 +1,134 @@
+import os
+
+from flask import Response, jsonify, send_file
+from werkzeug.datastructures import Accept
+
+from .chunk_container import open_chunk_container
+from .compress_chunk import CONTENT_ENCODINGS, choose_content_encoding
+from .dataset_catalog import get_dataset_manifest
+from .etags import not_modified
+from .get_chunk_folder import get_chunk_folder
+from .get_json_chunk_filename import get_json_chunk_filename
+
+
+def send_chunk_file(
+    dataset_name: str, chunk: int, accept_encodings: Accept, retry: bool = True
+) -> Response:
+    """
+    Send a chunk materialized by `write_chunk_container` or
+    `dataframe_to_json_chunks` straight from disk.
+
+    A chunk in a container is sliced out of the container's shared memory
+    map; a chunk file is sent with `send_file`. The best precompressed variant
+    for the request's `Accept-Encoding` is sent as-is with a matching
+    `Content-Encoding`, so nothing is compressed per request. The ETag is the
+    variant's SHA-256 hash from the chunk manifest, so a matching
+    `If-None-Match` is answered with a 304. If the container is replaced
+    between reading its manifest and opening it, the request is retried once
+    (see `retry`), then answered with a 503.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset.
+    chunk : int
+        The index of the chunk, starting at 0.
+    accept_encodings : Accept
+        The parsed `Accept-Encoding` header, ie. `request.accept_encodings`.
+    retry : bool, optional
+        Whether to look the manifest up again if the container no longer
+        matches it. Default is True.
+
+    Returns
+    -------
+    Response
+        The chunk's JSON records, with the chunk details in `X-Chunk-*` headers,
+        or a 404 if the dataset has not been chunked.
+    """
+    try:
+        manifest = get_dataset_manifest(dataset_name)
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+
+    if manifest is None:
+        return (
+            jsonify(
+                {
+                    "error": f"Dataset {dataset_name} has not been chunked. Run /data/chunk-dataset first."
+                }
+            ),
+            404,
+        )
+    n_chunks = manifest["n_chunks"]
+    if not 0 <= chunk < n_chunks:
+        return (
+            jsonify(
+                {
+                    "error": f"Chunk {chunk} is out of range for dataset {dataset_name} with {n_chunks} chunks"
+                }
+            ),
+            404,
+        )
+
+    entry = manifest["chunks"][chunk]
+    available = [e for e in entry["variants"] if e in CONTENT_ENCODINGS]
+    encoding = choose_content_encoding(accept_encodings, available)
+    part = entry["variants"][encoding] if encoding != "identity" else entry
+    etag = part["sha256"]
+
+    if "container" in manifest:
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            unchanged.vary.add("Accept-Encoding")
+            return unchanged
+        try:
+            index, data = open_chunk_container(
+                os.path.join(get_chunk_folder(), manifest["container"])
+            )
+        except FileNotFoundError:
+            index = None
+        if index is None or (index.get("version"), index["n_chunks"]) != (
+            manifest.get("version"),
+            n_chunks,
+        ):
+            # The container was replaced (or removed) since its manifest was read
+            if retry:
+                return send_chunk_file(dataset_name, chunk, accept_encodings, False)
+            return (
+                jsonify({"error": f"The chunks of {dataset_name} are being rewritten"}),
+                503,
+            )
+        # The offsets must come from the map's own index
+        entry = index["chunks"][chunk]
+        part = entry["variants"][encoding] if encoding != "identity" else entry
+        etag = part["sha256"]
+        response = Response(
+            data[part["offset"] : part["offset"] + part["n_bytes"]],
+            mimetype="application/json",
+        )
+        response.set_etag(etag)
+    else:
+        filename = os.path.join(
+            get_chunk_folder(), get_json_chunk_filename(dataset_name, chunk, n_chunks)
+        )
+        if encoding != "identity":
+            filename += CONTENT_ENCODINGS[encoding]
+        response = send_file(
+            os.path.abspath(filename),
+            mimetype="application/json",
+            conditional=True,
+            etag=etag,
+        )
+    if encoding != "identity":
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+
+    response.headers.update(
+        {
+            "X-Chunk-Number": chunk,
+            "X-Chunk-Count": n_chunks,
+            "X-Chunk-Start": entry["start"],
+            "X-Chunk-Stop": entry["stop"],
+        }
+    )
+    return response
@@ -1,26 +1,244 @@
 import asyncio
-from typing import List
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, List, Union
 
 import aiohttp
+import numpy as np
 import pandas as pd
 
+from .chunk_plan import ChunkPlan, plan_dataframe_chunks
+from .dataframe_to_json_chunks import iter_json_chunks
+
+# Statuses worth retrying: the server may succeed on a later attempt
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class SendStats:
+    """
+    The outcome of `send_chunks`: the response bodies in chunk order, and
+    throughput and latency statistics.
+
+    `results[i]` is None for a chunk that still failed after every retry; its
+    error is listed in `failures`.
+    """
+
+    results: List[str] = field(default_factory=list)
+    n_chunks: int = 0
+    n_bytes: int = 0
+    n_retries: int = 0
+    failures: List[tuple] = field(default_factory=list)
+    latencies: List[float] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def summary(self) -> dict:
+        """
+        Summarize the run: counts, throughput, and latency percentiles (in seconds).
+        """
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        elapsed = self.elapsed or float("nan")
+        return {
+            "n_chunks": self.n_chunks,
+            "n_bytes": self.n_bytes,
+            "n_retries": self.n_retries,
+            "n_failures": len(self.failures),
+            "elapsed": self.elapsed,
+            "chunks_per_second": self.n_chunks / elapsed,
+            "bytes_per_second": self.n_bytes / elapsed,
+            "latency_p50": float(np.percentile(latencies, 50)),
+            "latency_p95": float(np.percentile(latencies, 95)),
+            "latency_p99": float(np.percentile(latencies, 99)),
+            "latency_max": float(latencies.max()),
+        }
+
 
 # Asynchronous function to send the JSON data
-async def send_json_data(session, url, json_data):
-    async with session.post(url, json=json_data) as response:
-        return await response.text()
+async def send_json_data(
+    session: aiohttp.ClientSession,
+    url: str,
+    json_data: Union[str, bytes],
+    headers: dict = None,
+    retries: int = 3,
+    backoff: float = 0.1,
+    max_backoff: float = 10.0,
+    stats: SendStats = None,
+) -> str:
+    """
+    POST one JSON chunk, retrying transient failures with jittered exponential backoff.
+
+    Connection errors, timeouts and the statuses in `RETRY_STATUSES` are
+    retried; any other error status is not.
+
+    Parameters
+    ----------
+    session : aiohttp.ClientSession
+        The (pooled) session to send with. Its timeout applies to each attempt.
+    url : str
+        The URL to POST to.
+    json_data : str or bytes
+        The JSON string, sent as-is as the request body.
+    headers : dict, optional
+        Extra request headers. Default is None.
+    retries : int, optional
+        The number of retries after the first attempt. Default is 3.
+    backoff : float, optional
+        The base delay, in seconds. Before retry n the sender sleeps a random
+        time between 0 and `backoff * 2 ** n` ("full jitter"). Default is 0.1.
+    max_backoff : float, optional
+        The maximum delay before a retry, in seconds. Default is 10.0.
+    stats : SendStats, optional
+        Statistics to count retries in. Default is None.
+
+    Returns
+    -------
+    str
+        The response body.
+
+    Raises
+    ------
+    aiohttp.ClientError or asyncio.TimeoutError
+        If the last attempt fails. A response with a status that is not in
+        `RETRY_STATUSES` raises `aiohttp.ClientResponseError` at once.
+    """
+    data = json_data.encode("utf-8") if isinstance(json_data, str) else json_data
+    headers = {"Content-Type": "application/json", **(headers or {})}
+    for attempt in range(retries + 1):
+        try:
+            async with session.post(url, data=data, headers=headers) as response:
+                if response.status < 400:
+                    return await response.text()
+                error = aiohttp.ClientResponseError(
+                    response.request_info,
+                    response.history,
+                    status=response.status,
+                    message=response.reason,
+                    headers=response.headers,
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # Connection errors and timeouts are transient
+            if attempt == retries:
+                raise
+        else:
+            # Other statuses (eg. a 400 for a malformed chunk) fail the same way again
+            if error.status not in RETRY_STATUSES or attempt == retries:
+                raise error
+        if stats is not None:
+            stats.n_retries += 1
+        await asyncio.sleep(random.uniform(0, min(max_backoff, backoff * 2**attempt)))
 
 
 # Function to handle the sending of each chunk
-async def send_chunks(url: str, chunks: List[str]):
-    async with aiohttp.ClientSession() as session:
-        tasks = [send_json_data(session, url, chunk) for chunk in chunks]
-        results = await asyncio.gather(*tasks)
-        return results
+async def send_chunks(
+    url: str,
+    chunks: Iterable[str],
+    max_in_flight: int = 8,
+    retries: int = 3,
+    backoff: float = 0.1,
+    timeout: float = 30.0,
+    session: aiohttp.ClientSession = None,
+    n_chunks: int = None,
+) -> SendStats:
+    """
+    POST chunks to a URL with bounded concurrency.
+
+    Chunks are pulled lazily from `chunks`, so at most `max_in_flight` of them
+    are held in memory at once, whatever the size of the dataset. Each request
+    carries `X-Chunk-Number` (and `X-Chunk-Count`, if the number of chunks is known).
+
+    Parameters
+    ----------
+    url : str
+        The URL to POST to.
+    chunks : iterable of str or bytes
+        The JSON chunks, eg. from `iter_json_chunks`. Generators are consumed lazily.
+    max_in_flight : int, optional
+        The maximum number of concurrent requests, which is also the size of the
+        connection pool. Default is 8.
+    retries : int, optional
+        The number of retries per chunk after the first attempt. Default is 3.
+    backoff : float, optional
+        The base delay between retries, in seconds. Default is 0.1.
+    timeout : float, optional
+        The timeout of each attempt, in seconds. Default is 30.0.
+    session : aiohttp.ClientSession, optional
+        A session to reuse. Default is None, which opens a session with a
+        pooled connector sized to `max_in_flight` for the duration of the call.
+    n_chunks : int, optional
+        The total number of chunks. Default is None, which uses `len(chunks)`
+        when `chunks` has a length.
+
+    Returns
+    -------
+    SendStats
+        The response bodies in chunk order, and throughput and latency statistics.
+    """
+    stats = SendStats()
+    if n_chunks is None and hasattr(chunks, "__len__"):
+        n_chunks = len(chunks)
+    chunk_iter = enumerate(iter(chunks))
+    results = {}
+
+    async def worker(session):
+        # Workers share the iterator; asyncio runs one at a time, so `next` is safe
+        for i, chunk in chunk_iter:
+            headers = {"X-Chunk-Number": str(i)}
+            if n_chunks is not None:
+                headers["X-Chunk-Count"] = str(n_chunks)
+            data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+            started = time.perf_counter()
+            try:
+                results[i] = await send_json_data(
+                    session, url, data, headers, retries, backoff, stats=stats
+                )
+                stats.latencies.append(time.perf_counter() - started)
+                stats.n_bytes += len(data)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                results[i] = None
+                stats.failures.append((i, repr(e)))
+
+    started = time.perf_counter()
+    if session is None:
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=max_in_flight),
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as session:
+            await asyncio.gather(*[worker(session) for _ in range(max_in_flight)])
+    else:
+        await asyncio.gather(*[worker(session) for _ in range(max_in_flight)])
+
+    stats.elapsed = time.perf_counter() - started
+    stats.n_chunks = len(results)
+    stats.results = [results[i] for i in range(len(results))]
+    return stats
 
 
 # Main coroutine to split the DataFrame and send the chunks
-async def split_and_send_dataframe(df: pd.DataFrame, url: str, n_chunks: int = 20):
-    chunks = dataframe_to_json_chunks(df, n_chunks)
-    results = await send_chunks(url, chunks)
-    print(results)  # Or handle the results as needed
+async def split_and_send_dataframe(
+    df: pd.DataFrame, url: str, plan: ChunkPlan = None, **kwargs
+) -> SendStats:
+    """
+    Split a DataFrame into JSON chunks and POST them to a URL.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The pandas DataFrame to send.
+    url : str
+        The URL to POST to.
+    plan : ChunkPlan, optional
+        The row ranges of the chunks. Default is None, which uses `plan_dataframe_chunks`.
+    **kwargs
+        Passed on to `send_chunks`.
+
+    Returns
+    -------
+    SendStats
+        The response bodies in chunk order, and throughput and latency statistics.
+    """
+    if plan is None:
+        plan = plan_dataframe_chunks(df)
+    return await send_chunks(
+        url, iter_json_chunks(df, plan), n_chunks=plan.n_chunks, **kwargs
+    )
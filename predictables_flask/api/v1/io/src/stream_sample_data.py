@@ -0,0 +1,157 @@
+from typing import Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from flask import Response, current_app, jsonify
+
+from .arrow_store import open_arrow_table, use_arrow_store
+from .etags import make_etag, not_modified
+from .get_file_version import get_file_version
+from .get_parquet_filename import get_parquet_filename
+from .negotiate_format import TEXT_FORMATS
+from .table_query import TableQuery, read_parquet_schema
+
+STREAMABLE_ORIENTS = ("records", "values")
+
+
+def stream_sample_data(
+    ds_name: str,
+    orient: str = "records",
+    batch_size: int = None,
+    query: TableQuery = None,
+    fmt: str = "json",
+) -> Response:
+    """
+    Stream data from the parquet file represented by ds_name as a JSON array,
+    or as newline-delimited JSON.
+
+    Unlike `get_sample_data`, the JSON is not wrapped in a string: the body is
+    the array itself, produced one record batch at a time, so peak memory is
+    bounded by `batch_size` rather than by the size of the dataset. With
+    NDJSON, each row is a complete JSON object on its own line, so clients
+    can parse rows as they arrive rather than after the closing bracket.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+    orient : str, optional
+        Either 'records' or 'values'. Default is 'records'. NDJSON is always
+        one record per line.
+    batch_size : int, optional
+        The number of rows to read and encode at a time, at least 1. Default is
+        None, which uses `IO_STREAM_BATCH_ROWS` from the app config.
+    query : TableQuery, optional
+        The columns and filters to apply, pushed down into the parquet scan.
+        Default is None, which streams the whole dataset.
+    fmt : str, optional
+        Either 'json' or 'ndjson'. Default is 'json'.
+
+    Returns
+    -------
+    Response
+        A streaming (chunked transfer) response.
+    """
+    if fmt == "ndjson":
+        orient = "records"
+    if orient not in STREAMABLE_ORIENTS:
+        return (
+            jsonify(
+                {
+                    "error": f"Cannot stream orient `{orient}`. Use one of {list(STREAMABLE_ORIENTS)}."
+                }
+            ),
+            400,
+        )
+    if batch_size is None:
+        batch_size = current_app.config.get("IO_STREAM_BATCH_ROWS", 10000)
+    if batch_size < 1:
+        return (
+            jsonify({"error": f"batch_size must be at least 1, got {batch_size}"}),
+            400,
+        )
+
+    try:
+        filename = get_parquet_filename(ds_name)
+        version = get_file_version(filename)
+        if query:
+            query = query.bind(read_parquet_schema(filename, version))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 404
+
+    etag = make_etag("sample-data", ds_name, f"{fmt}-stream", orient, query, version)
+    unchanged = not_modified(etag)
+    if unchanged is not None:
+        return unchanged
+    if use_arrow_store():
+        # Zero-copy slices of the memory-mapped table
+        table = open_arrow_table(ds_name, filename, version)
+        if query:
+            table = query.apply(table)
+        batches = table.to_batches(max_chunksize=batch_size)
+    elif query:
+        batches = query.iter_parquet(filename, batch_size)
+    else:
+        batches = pq.ParquetFile(filename).iter_batches(batch_size=batch_size)
+
+    if fmt == "ndjson":
+        body = iter_ndjson_batches(batches)
+    else:
+        body = iter_json_batches(batches, orient)
+    response = Response(body, mimetype=TEXT_FORMATS[fmt])
+    response.set_etag(etag)
+    return response
+
+
+def iter_json_batches(
+    batches: Iterable[pa.RecordBatch], orient: str = "records"
+) -> Iterator[bytes]:
+    """
+    Encode record batches as the pieces of a single JSON array.
+
+    Parameters
+    ----------
+    batches : iterable of pa.RecordBatch
+        The record batches to encode. They are consumed lazily.
+    orient : str, optional
+        Either 'records' or 'values'. Default is 'records'.
+
+    Yields
+    ------
+    bytes
+        The opening bracket, the encoded rows of each batch (comma separated)
+        and the closing bracket.
+    """
+    yield b"["
+    first = True
+    for batch in batches:
+        # Strip the brackets from each batch's array so the pieces join into one array
+        rows = batch.to_pandas().to_json(orient=orient)[1:-1]
+        if not rows:
+            continue
+        if not first:
+            yield b","
+        yield rows.encode("utf-8")
+        first = False
+    yield b"]"
+
+
+def iter_ndjson_batches(batches: Iterable[pa.RecordBatch]) -> Iterator[bytes]:
+    """
+    Encode record batches as newline-delimited JSON, one record per line.
+
+    Parameters
+    ----------
+    batches : iterable of pa.RecordBatch
+        The record batches to encode. They are consumed lazily.
+
+    Yields
+    ------
+    bytes
+        The rows of each batch, each terminated by a newline.
+    """
+    for batch in batches:
+        if batch.num_rows:
+            yield batch.to_pandas().to_json(orient="records", lines=True).encode("utf-8")
@@ -0,0 +1,192 @@
+import hashlib
+from functools import lru_cache
+from typing import BinaryIO, Dict, List, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from flask import Response, jsonify
+
+from .column_summary import ColumnSummary, merge_summaries
+from .etags import make_etag, not_modified
+from .get_file_version import get_file_version
+from .get_parquet_filename import get_parquet_filename
+from .sample_data_cache import sample_data_cache
+
+# Bump when the way summaries are computed changes, so cached ones are not reused
+SUMMARY_VERSION = 1
+
+# The (rough) size of one cached summary, in bytes
+SUMMARY_NBYTES = 256
+
+
+def get_dataset_summary(ds_name: str, columns: List[str] = None) -> Response:
+    """
+    Get per-column summary statistics of a dataset: counts, null rates, means,
+    variances and min/max.
+
+    Each column of each parquet row group is summarized separately with
+    `ColumnSummary.from_array`, and the parts are merged. Part summaries are
+    cached in `sample_data_cache` by dataset, row group and column, and by
+    the SHA-256 of the column chunk's bytes on disk, which is much cheaper to
+    compute than decoding it, and is itself computed once per version of the
+    file. A rewritten file (eg. with rows appended as new row groups) only has
+    its changed row groups decoded and summarized again.
+
+    Parameters
+    ----------
+    ds_name : str
+        The name of the dataset.
+    columns : list of str, optional
+        The columns to summarize. Default is None, which summarizes every column.
+
+    Returns
+    -------
+    Response
+        The number of rows and row groups, the number of column chunks that
+        had to be summarized for this request, and the statistics of each
+        column (see `ColumnSummary.to_dict`). A 404 if there is no such
+        dataset, a 400 for an unknown column.
+    """
+    try:
+        filename = get_parquet_filename(ds_name)
+        version = get_file_version(filename)
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+
+    etag = make_etag("summary", ds_name, columns, SUMMARY_VERSION, version)
+    unchanged = not_modified(etag)
+    if unchanged is not None:
+        return unchanged
+
+    parquet_file = pq.ParquetFile(filename)
+    names = parquet_file.schema_arrow.names
+    if columns is None:
+        columns = names
+    unknown = [column for column in columns if column not in names]
+    if unknown:
+        return jsonify({"error": f"Unknown columns: {unknown}"}), 400
+
+    metadata = parquet_file.metadata
+    hashes = _hash_column_chunks(filename, *version)
+    parts = {column: [] for column in columns}
+    n_computed = 0
+    for row_group in range(metadata.num_row_groups):
+        missing = {}
+        for column in columns:
+            key = (
+                "summary",
+                ds_name,
+                row_group,
+                column,
+                hashes[column][row_group],
+                SUMMARY_VERSION,
+            )
+            summary = sample_data_cache.get(key)
+            if summary is None:
+                missing[column] = key
+            else:
+                parts[column].append(summary)
+
+        if missing:
+            table = parquet_file.read_row_group(row_group, columns=list(missing))
+            for column, key in missing.items():
+                summary = ColumnSummary.from_array(table[column])
+                sample_data_cache.put(key, summary, SUMMARY_NBYTES)
+                parts[column].append(summary)
+            n_computed += len(missing)
+
+    response = jsonify(
+        {
+            "dataset": ds_name,
+            "n_rows": metadata.num_rows,
+            "n_row_groups": metadata.num_row_groups,
+            "n_computed": n_computed,
+            "columns": {
+                column: merge_summaries(parts[column]).to_dict() for column in columns
+            },
+        }
+    )
+    response.set_etag(etag)
+    return response
+
+
+@lru_cache(maxsize=64)
+def _hash_column_chunks(
+    filename: str, mtime_ns: int, size: int
+) -> Dict[str, Tuple[str, ...]]:
+    """
+    Hash every column chunk of a parquet file, once per version of the file.
+
+    `mtime_ns` and `size` (see `get_file_version`) are only part of the cache
+    key. Returns the hash of each row group's chunk, by top-level column.
+    """
+    parquet_file = pq.ParquetFile(filename)
+    metadata = parquet_file.metadata
+    schema = parquet_file.schema_arrow
+    leaves = _get_leaf_columns(metadata, schema)
+    with open(filename, "rb") as f:
+        return {
+            name: tuple(
+                _hash_column_chunk(
+                    f, metadata, row_group, leaves[name], schema.field(name)
+                )
+                for row_group in range(metadata.num_row_groups)
+            )
+            for name in schema.names
+        }
+
+
+def _get_leaf_columns(metadata: pq.FileMetaData, schema: pa.Schema) -> dict:
+    # A nested column is stored as several leaf columns in the parquet file,
+    # in the order of the fields. Match them by position: a column name may
+    # contain ".", the separator of the leaves' paths
+    leaves = {}
+    start = 0
+    for field in schema:
+        n_leaves = _count_leaves(field.type)
+        leaves[field.name] = list(range(start, start + n_leaves))
+        start += n_leaves
+    if start != metadata.num_columns:
+        raise ValueError(
+            f"The schema has {start} leaf columns, but the file has {metadata.num_columns}"
+        )
+    return leaves
+
+
+def _count_leaves(data_type: pa.DataType) -> int:
+    if pa.types.is_struct(data_type):
+        return sum(
+            _count_leaves(data_type.field(i).type) for i in range(data_type.num_fields)
+        )
+    if pa.types.is_map(data_type):
+        return _count_leaves(data_type.key_type) + _count_leaves(data_type.item_type)
+    if (
+        pa.types.is_list(data_type)
+        or pa.types.is_large_list(data_type)
+        or pa.types.is_fixed_size_list(data_type)
+    ):
+        return _count_leaves(data_type.value_type)
+    return 1
+
+
+def _hash_column_chunk(
+    f: BinaryIO,
+    metadata: pq.FileMetaData,
+    row_group: int,
+    leaves: List[int],
+    field: pa.Field,
+) -> str:
+    """
+    Hash the encoded bytes of a column in a row group, without decoding them.
+    """
+    # The Arrow type decides how the bytes are read back, eg. int64 or timestamp
+    digest = hashlib.sha256(str(field.type).encode("utf-8"))
+    for i in leaves:
+        chunk = metadata.row_group(row_group).column(i)
+        digest.update(f"{chunk.path_in_schema}:{chunk.physical_type}".encode("utf-8"))
+        start = chunk.data_page_offset
+        if chunk.has_dictionary_page and chunk.dictionary_page_offset:
+            start = min(start, chunk.dictionary_page_offset)
+        f.seek(start)
+        digest.update(f.read(chunk.total_compressed_size))
+    return digest.hexdigest()
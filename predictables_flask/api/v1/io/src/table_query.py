@@ -0,0 +1,194 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterator, List, Mapping, Tuple
+
+import pyarrow as pa
+import pyarrow.dataset as pads
+import pyarrow.parquet as pq
+
+# The comparison operators of a filter, and the operator pyarrow calls them
+OPERATORS = {
+    "==": "==",
+    "=": "==",
+    "!=": "!=",
+    ">=": ">=",
+    "<=": "<=",
+    ">": ">",
+    "<": "<",
+    "in": "in",
+    "not in": "not in",
+}
+
+_FILTER = re.compile(
+    r"^\s*(?P<column>[^\s=!<>]+?)\s*"
+    r"(?P<op>==|!=|>=|<=|=|>|<|\s+not\s+in\s+|\s+in\s+)\s*"
+    r"(?P<value>.*?)\s*$",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class TableQuery:
+    """
+    A column projection and a conjunction of filters to apply to a dataset.
+
+    Filters are `(column, op, value)` tuples, in the format of the `filters`
+    argument of `pq.read_table`, and are all ANDed together. Reads go through
+    the pyarrow dataset scanner, so only the projected (and filtered) columns
+    are decoded, and row groups whose statistics rule out the filters are
+    skipped without being read.
+
+    A query parsed from a request holds the filter values as strings; `bind`
+    checks it against the dataset's schema and casts the values to the
+    column types.
+    """
+
+    columns: Tuple[str, ...] = None
+    filters: Tuple[Tuple[str, str, Any], ...] = ()
+
+    def __bool__(self) -> bool:
+        return self.columns is not None or bool(self.filters)
+
+    @property
+    def expression(self) -> pads.Expression:
+        """
+        The filters as a pyarrow expression, or None if there are no filters.
+        """
+        if not self.filters:
+            return None
+        return pq.filters_to_expression(
+            [
+                (column, op, list(value) if op in ("in", "not in") else value)
+                for column, op, value in self.filters
+            ]
+        )
+
+    def bind(self, schema: pa.Schema) -> "TableQuery":
+        """
+        Check the query against a schema and cast the filter values to the
+        types of their columns.
+
+        Raises
+        ------
+        ValueError
+            If a column is not in the schema, or a value cannot be cast.
+        """
+        for column in list(self.columns or []) + [f[0] for f in self.filters]:
+            if schema.get_field_index(column) < 0:
+                raise ValueError(f"Unknown column `{column}`")
+
+        filters = []
+        for column, op, value in self.filters:
+            field_type = schema.field(column).type
+            if op in ("in", "not in"):
+                value = tuple(_cast(v, field_type, column) for v in value)
+            else:
+                value = _cast(value, field_type, column)
+            filters.append((column, op, value))
+        return TableQuery(self.columns, tuple(filters))
+
+    def apply(self, table: pa.Table) -> pa.Table:
+        """
+        Filter and project a table that is already in memory.
+        """
+        if self.filters:
+            table = table.filter(self.expression)
+        if self.columns is not None:
+            table = table.select(list(self.columns))
+        return table
+
+    def read_parquet(self, filename: str) -> pa.Table:
+        """
+        Read the matching rows and columns of a parquet file.
+        """
+        return pads.dataset(filename, format="parquet").to_table(
+            columns=self._scan_columns(), filter=self.expression
+        )
+
+    def iter_parquet(self, filename: str, batch_size: int) -> Iterator[pa.RecordBatch]:
+        """
+        Lazily read the matching rows and columns of a parquet file, in order.
+        """
+        return pads.dataset(filename, format="parquet").to_batches(
+            columns=self._scan_columns(), filter=self.expression, batch_size=batch_size
+        )
+
+    def read_columns(self, schema: pa.Schema) -> List[str]:
+        """
+        The columns to read from a file to apply the query in memory: the
+        projected columns and the filtered ones. None if every column is needed.
+        """
+        if self.columns is None:
+            return None
+        needed = set(self.columns) | {f[0] for f in self.filters}
+        return [name for name in schema.names if name in needed]
+
+    def _scan_columns(self) -> List[str]:
+        return list(self.columns) if self.columns is not None else None
+
+
+def parse_table_query(args: Mapping) -> TableQuery:
+    """
+    Parse a column projection and filters from request query parameters.
+
+    Columns are given as `columns=a,b,c` (or repeated `columns=` parameters),
+    and each filter as a `filter=` parameter holding a comparison, eg.
+    `filter=price>=100`, `filter=state==CA`, or a list membership,
+    `filter=state in CA,NV,OR` (or `not in`).
+
+    Parameters
+    ----------
+    args : werkzeug.datastructures.MultiDict
+        The query parameters, ie. `request.args`.
+
+    Returns
+    -------
+    TableQuery
+        The unbound query: its filter values are strings until `bind` is called.
+
+    Raises
+    ------
+    ValueError
+        If a filter cannot be parsed.
+    """
+    columns = None
+    if "columns" in args:
+        columns = tuple(
+            column.strip()
+            for value in args.getlist("columns")
+            for column in value.split(",")
+            if column.strip()
+        )
+
+    filters = []
+    for raw in args.getlist("filter"):
+        match = _FILTER.match(raw)
+        if match is None:
+            raise ValueError(f"Cannot parse filter `{raw}`")
+        op = OPERATORS[" ".join(match["op"].lower().split())]
+        value = match["value"]
+        if op in ("in", "not in"):
+            value = tuple(v.strip() for v in value.strip("()[]").split(",") if v.strip())
+        filters.append((match["column"], op, value))
+    return TableQuery(columns, tuple(filters))
+
+
+def read_parquet_schema(filename: str, version: tuple) -> pa.Schema:
+    """
+    Read the Arrow schema of a parquet file, once per version of the file.
+    """
+    return _read_parquet_schema(filename, *version)
+
+
+@lru_cache(maxsize=256)
+def _read_parquet_schema(filename: str, mtime_ns: int, size: int) -> pa.Schema:
+    # mtime_ns and size are only part of the cache key
+    return pq.read_schema(filename)
+
+
+def _cast(value: str, field_type: pa.DataType, column: str) -> Any:
+    try:
+        return pa.array([value]).cast(field_type)[0].as_py()
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(f"Cannot compare column `{column}` with `{value}`: {e}")
@@ -0,0 +1,28 @@
+import os
+import uuid
+from typing import Union
+
+
+def write_atomic(filename: str, contents: Union[str, bytes]) -> None:
+    """
+    Write a file under a temporary name and rename it into place, so readers
+    only ever see a complete file.
+
+    Parameters
+    ----------
+    filename : str
+        The path to write to.
+    contents : str or bytes
+        The contents of the file. Strings are written as text.
+    """
+    tmp_filename = f"{filename}.{os.getpid()}-{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_filename, "wb" if isinstance(contents, bytes) else "w") as f:
+            f.write(contents)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+from predictables_flask.api.v1.io.src.chunk_plan import plan_dataset_chunks
+from predictables_flask.api.v1.io.src.dataframe_to_json_chunks import (
+    dataframe_to_json_chunks,
+)
+from predictables_flask.api.v1.io.src.get_chunk_folder import get_chunk_folder
+from predictables_flask.api.v1.io.src.get_file_version import get_file_version
+from predictables_flask.api.v1.io.src.get_parquet_filename import get_parquet_filename
+from predictables_flask.api.v1.io.src.job_manager import job_manager
+from predictables_flask.api.v1.io.src.sample_data_cache import sample_data_cache
+from predictables_flask.app import create_app
+from predictables_flask.config import TestingConfig
+from predictables_flask.models.db import db
+from predictables_flask.models.password_hasher import password_hasher
+
+IO_ROOT = "/predictables/api/v1/io"
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "a": range(1000),
+            "b": [i / 4 for i in range(1000)],
+            "c": ["x", "y", "z", "w"] * 250,
+        }
+    )
+
+
+@pytest.fixture
+def data_folder(tmp_path, df):
+    df.to_parquet(tmp_path / "test_data.parquet", row_group_size=100)
+    return tmp_path
+
+
+@pytest.fixture
+def app(data_folder):
+    class Config(TestingConfig):
+        IO_DATA_FOLDER = str(data_folder)
+        IO_CHUNK_FOLDER = str(data_folder / "chunks")
+        UPLOAD_FOLDER = str(data_folder / "uploads")
+        IO_JOB_FOLDER = str(data_folder / "jobs")
+        # Roughly 28 bytes per row, so the 1000 test rows plan into 20 chunks
+        IO_TARGET_CHUNK_BYTES = 1400
+        SQLALCHEMY_ECHO = False
+
+    (data_folder / "uploads").mkdir()
+    sample_data_cache.clear()
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+    yield app
+    job_manager.shutdown()
+    password_hasher.shutdown()
+    sample_data_cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def chunked(app, df):
+    with app.app_context():
+        dataframe_to_json_chunks(
+            df,
+            dataset_name="test_data",
+            output_dir=get_chunk_folder(),
+            plan=plan_dataset_chunks("test_data"),
+            version=get_file_version(get_parquet_filename("test_data")),
+        )
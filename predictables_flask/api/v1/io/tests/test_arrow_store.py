@@ -0,0 +1,64 @@
+import os
+
+import pyarrow as pa
+import pytest
+
+from predictables_flask.api.v1.io.src.arrow_store import open_arrow_table
+from predictables_flask.api.v1.io.src.get_file_version import get_file_version
+from predictables_flask.api.v1.io.src.get_parquet_filename import get_parquet_filename
+from predictables_flask.api.v1.io.src.sample_data_cache import sample_data_cache
+
+from .conftest import IO_ROOT
+
+
+@pytest.fixture
+def store_app(app, data_folder):
+    app.config["IO_USE_ARROW_STORE"] = True
+    app.config["IO_ARROW_FOLDER"] = str(data_folder / "arrow")
+    return app
+
+
+def open_test_data():
+    filename = get_parquet_filename("test_data")
+    return open_arrow_table("test_data", filename, get_file_version(filename))
+
+
+def test_table_is_memory_mapped(store_app, df):
+    with store_app.app_context():
+        open_test_data()  # Convert the parquet file first
+        sample_data_cache.clear()
+        allocated = pa.total_allocated_bytes()
+        table = open_test_data()
+        # Opening the table allocated nothing: its buffers are the mapped file
+        assert pa.total_allocated_bytes() == allocated
+    assert table.to_pandas().equals(df)
+
+
+def test_new_file_version_replaces_the_arrow_copy(store_app, data_folder, df):
+    with store_app.app_context():
+        open_test_data()
+        df.iloc[:10].to_parquet(data_folder / "test_data.parquet")
+        assert len(open_test_data()) == 10
+    assert len(os.listdir(data_folder / "arrow")) == 1
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "sample-data/test-data/records",
+        "sample-data/test-data/records?stream=true&batch_size=64",
+        "sample-data/test-data?format=parquet",
+        "data/chunk/test-data/3",
+        "data/chunk/test-data/3?stream=true",
+        "data/chunk/test-data/3?format=arrow",
+    ],
+)
+def test_routes_serve_the_same_data_from_the_store(app, client, data_folder, url):
+    expected = client.get(f"{IO_ROOT}/{url}")
+    app.config["IO_USE_ARROW_STORE"] = True
+    app.config["IO_ARROW_FOLDER"] = str(data_folder / "arrow")
+    sample_data_cache.clear()
+    actual = client.get(f"{IO_ROOT}/{url}")
+    assert actual.status_code == expected.status_code == 200
+    assert actual.data == expected.data
+    assert os.listdir(data_folder / "arrow")
@@ -0,0 +1,119 @@
+import gzip
+import hashlib
+import json
+import os
+
+import pytest
+
+from predictables_flask.api.v1.io.src.chunk_container import (
+    get_chunk_container_filename,
+    open_chunk_container,
+    read_chunk_container_index,
+    write_chunk_container,
+)
+from predictables_flask.api.v1.io.src import send_chunk_file
+from predictables_flask.api.v1.io.src.chunk_plan import ChunkPlan
+
+from .conftest import IO_ROOT
+from .test_job_manager import wait_for
+
+
+def test_container_round_trips(tmp_path, df):
+    progress = []
+    manifest = write_chunk_container(
+        df,
+        "test",
+        str(tmp_path),
+        plan=ChunkPlan(1000, 7),
+        max_workers=2,
+        encodings=["gzip"],
+        progress=lambda done, total: progress.append((done, total)),
+        version=(1, 2),
+    )
+    assert os.listdir(tmp_path) == ["test.chunks"]
+    assert progress[-1] == (7, 7)
+    assert read_chunk_container_index(str(tmp_path / "test.chunks")) == manifest
+    assert manifest["version"] == [1, 2]
+
+    index, data = open_chunk_container(str(tmp_path / "test.chunks"))
+    for entry, (start, stop) in zip(index["chunks"], ChunkPlan(1000, 7)):
+        chunk = data[entry["offset"] : entry["offset"] + entry["n_bytes"]]
+        assert hashlib.sha256(chunk).hexdigest() == entry["sha256"]
+        expected = df.iloc[start:stop].to_json(orient="records")
+        assert json.loads(chunk) == json.loads(expected)
+
+        variant = entry["variants"]["gzip"]
+        compressed = data[variant["offset"] : variant["offset"] + variant["n_bytes"]]
+        assert gzip.decompress(compressed) == chunk
+
+
+def test_missing_and_invalid_containers(tmp_path):
+    assert read_chunk_container_index(str(tmp_path / "missing.chunks")) is None
+    (tmp_path / "bad.chunks").write_bytes(b"not a container at all")
+    with pytest.raises(ValueError):
+        read_chunk_container_index(str(tmp_path / "bad.chunks"))
+
+
+def test_chunk_dataset_writes_a_container(client, df, data_folder):
+    job_id = client.post(f"{IO_ROOT}/data/chunk-dataset/test-data").get_json()["job_id"]
+    assert wait_for(client, job_id)["status"] == "done"
+
+    manifest = client.get(f"{IO_ROOT}/data/manifest/test-data").get_json()
+    assert manifest["container"] == "test_data.chunks"
+    assert manifest["n_chunks"] == 20
+
+    response = client.get(
+        f"{IO_ROOT}/data/chunk-file/test-data/4", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.get_etag()[0] == manifest["chunks"][4]["variants"]["gzip"]["sha256"]
+    rows = json.loads(gzip.decompress(response.data))
+    assert rows == json.loads(df.iloc[200:250].to_json(orient="records"))
+
+    etag = manifest["chunks"][4]["sha256"]
+    revalidated = client.get(
+        f"{IO_ROOT}/data/chunk-file/test-data/4", headers={"If-None-Match": f'"{etag}"'}
+    )
+    assert revalidated.status_code == 304
+
+    # Re-chunking replaces the one container
+    job_id = client.post(f"{IO_ROOT}/data/chunk-dataset/test-data/8").get_json()["job_id"]
+    assert wait_for(client, job_id)["status"] == "done"
+    assert client.get(f"{IO_ROOT}/data/manifest/test-data").get_json()["n_chunks"] == 8
+    response = client.get(f"{IO_ROOT}/data/chunk-file/test-data/7")
+    assert response.headers["X-Chunk-Start"] == "875"
+    assert client.get(f"{IO_ROOT}/data/chunk-file/test-data/8").status_code == 404
+    assert os.path.exists(
+        get_chunk_container_filename("test_data", str(data_folder / "chunks"))
+    )
+
+
+def test_container_of_an_older_file_is_not_served(client, df, data_folder):
+    job_id = client.post(f"{IO_ROOT}/data/chunk-dataset/test-data").get_json()["job_id"]
+    wait_for(client, job_id)
+    assert client.get(f"{IO_ROOT}/data/chunk-file/test-data/0").status_code == 200
+
+    df.iloc[:500].to_parquet(data_folder / "test_data.parquet", row_group_size=100)
+    response = client.get(f"{IO_ROOT}/data/chunk-file/test-data/0")
+    assert response.status_code == 404
+    assert "has not been chunked" in response.get_json()["error"]
+
+
+def test_container_that_keeps_changing_is_retried_once(
+    client, data_folder, monkeypatch
+):
+    job_id = client.post(f"{IO_ROOT}/data/chunk-dataset/test-data").get_json()["job_id"]
+    wait_for(client, job_id)
+    calls = []
+
+    def open_replaced_container(filename):
+        # Another version of the container on every open
+        calls.append(filename)
+        index, data = open_chunk_container(filename)
+        return {**index, "version": [len(calls), 0]}, data
+
+    monkeypatch.setattr(send_chunk_file, "open_chunk_container", open_replaced_container)
+    response = client.get(f"{IO_ROOT}/data/chunk-file/test-data/0")
+    assert response.status_code == 503
+    assert len(calls) == 2
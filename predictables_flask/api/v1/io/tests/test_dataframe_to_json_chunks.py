@@ -0,0 +1,124 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from predictables_flask.api.v1.io.src import dataframe_to_json_chunks as module
+from predictables_flask.api.v1.io.src.chunk_plan import plan_dataframe_chunks
+from predictables_flask.api.v1.io.src.dataframe_to_json_chunks import (
+    _check_if_json_exists_already,
+    dataframe_to_json_chunks,
+)
+
+from .conftest import IO_ROOT
+from .test_job_manager import wait_for
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_chunks_are_written_in_order(tmp_path, df, executor):
+    json_chunks = dataframe_to_json_chunks(
+        df.iloc[:103],
+        n_chunks=10,
+        dataset_name="test",
+        output_dir=str(tmp_path),
+        max_workers=2,
+        executor=executor,
+    )
+    assert len(json_chunks) == 10
+    # The remainder is spread across the chunks
+    assert [len(json.loads(c)) for c in json_chunks] == [10, 10, 10, 11, 10, 10, 11, 10, 10, 11]
+    assert pd.concat(
+        [pd.DataFrame(json.loads(c)) for c in json_chunks], ignore_index=True
+    ).equals(df.iloc[:103])
+
+    for i, json_chunk in enumerate(json_chunks):
+        with open(tmp_path / f"test_{str(i + 1).zfill(3)}_of_010.json") as f:
+            assert f.read() == json_chunk
+    assert _check_if_json_exists_already("test", 10, str(tmp_path))
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".tmp")]
+
+
+def test_partial_chunks_are_rebuilt(tmp_path, df):
+    # Every chunk file exists, but without a completion marker
+    for i in range(1, 21):
+        (tmp_path / f"test_{str(i).zfill(3)}_of_020.json").write_text("[")
+    assert not _check_if_json_exists_already("test", 20, str(tmp_path))
+
+    dataframe_to_json_chunks(df, dataset_name="test", output_dir=str(tmp_path))
+    assert json.loads((tmp_path / "test_001_of_020.json").read_text())[0]["a"] == 0
+
+
+def test_existing_chunks_are_skipped(tmp_path, df):
+    dataframe_to_json_chunks(df, dataset_name="test", output_dir=str(tmp_path))
+    assert dataframe_to_json_chunks(df, dataset_name="test", output_dir=str(tmp_path)) is None
+
+
+def test_chunks_of_another_version_are_rebuilt(tmp_path, df):
+    dataframe_to_json_chunks(
+        df, dataset_name="test", output_dir=str(tmp_path), version=(1, 100)
+    )
+    assert _check_if_json_exists_already("test", 20, str(tmp_path), (1, 100))
+    assert not _check_if_json_exists_already("test", 20, str(tmp_path), (2, 100))
+
+    json_chunks = dataframe_to_json_chunks(
+        df.iloc[::-1], dataset_name="test", output_dir=str(tmp_path), version=(2, 100)
+    )
+    assert json.loads(json_chunks[0])[0]["a"] == df["a"].iloc[-1]
+    assert module.read_json_chunk_manifest("test", 20, str(tmp_path))["version"] == [2, 100]
+
+
+def test_chunk_files_of_a_rewritten_dataset_are_rebuilt(app, client, df, data_folder):
+    app.config["IO_CHUNK_LAYOUT"] = "files"
+    job_id = client.post(f"{IO_ROOT}/data/chunk-dataset/test-data").get_json()["job_id"]
+    assert wait_for(client, job_id)["status"] == "done"
+    assert client.get(f"{IO_ROOT}/data/manifest/test-data").status_code == 200
+
+    # Rewritten with the same number of chunks, but different rows
+    df.iloc[::-1].to_parquet(data_folder / "test_data.parquet", row_group_size=100)
+    assert client.get(f"{IO_ROOT}/data/manifest/test-data").status_code == 404
+
+    job_id = client.post(f"{IO_ROOT}/data/chunk-dataset/test-data").get_json()["job_id"]
+    assert wait_for(client, job_id)["status"] == "done"
+    response = client.get(f"{IO_ROOT}/data/chunk-file/test-data/0")
+    assert response.get_json()[0]["a"] == df["a"].iloc[-1]
+
+
+def test_chunks_are_serialized_on_processes_by_default(app):
+    from predictables_flask.api.v1.io.src.dataframe_to_json_chunks import get_chunk_pool
+
+    assert app.config["IO_CHUNK_EXECUTOR"] == "process"
+    with get_chunk_pool("process", max_workers=1) as pool:
+        # Workers are not forked from a server that may be running threads
+        assert pool._mp_context.get_start_method() != "fork"
+
+
+def test_failed_write_leaves_no_marker(tmp_path, df, monkeypatch):
+    def fail(chunk, filename, return_json, encodings):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(module, "_serialize_chunk", fail)
+    with pytest.raises(OSError):
+        dataframe_to_json_chunks(
+            df, dataset_name="test", output_dir=str(tmp_path), executor="thread"
+        )
+    assert not _check_if_json_exists_already("test", 20, str(tmp_path))
+
+
+def test_chunks_follow_plan(tmp_path, df):
+    plan = plan_dataframe_chunks(df, target_chunk_bytes=10_000)
+    json_chunks = dataframe_to_json_chunks(df, write_json=False, plan=plan)
+    assert len(json_chunks) == plan.n_chunks == 3
+    assert [len(json.loads(c)) for c in json_chunks] == [333, 333, 334]
+
+    with pytest.raises(ValueError):
+        dataframe_to_json_chunks(df.iloc[:10], write_json=False, plan=plan)
+
+
+def test_return_filenames_without_json(tmp_path, df):
+    filenames = dataframe_to_json_chunks(
+        df, n_chunks=4, dataset_name="test", output_dir=str(tmp_path), return_json=False
+    )
+    assert filenames == [
+        os.path.join(str(tmp_path), f"test_00{i}_of_004.json") for i in range(1, 5)
+    ]
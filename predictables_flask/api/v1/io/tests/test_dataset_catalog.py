@@ -0,0 +1,110 @@
+import hashlib
+import os
+
+from predictables_flask.api.v1.io.src import dataset_catalog
+from predictables_flask.api.v1.io.src.content_hash import record_content_hash
+from predictables_flask.models.Dataset import Dataset
+from predictables_flask.models.db import db
+
+from .conftest import IO_ROOT
+
+
+def test_dataset_is_recorded_on_first_lookup(app, client, data_folder):
+    # As an ingest does when it writes the file
+    record_content_hash(str(data_folder / "test_data.parquet"))
+    response = client.get(f"{IO_ROOT}/datasets/test-data")
+    assert response.status_code == 200
+    info = response.get_json()
+    assert info["n_rows"] == 1000
+    assert info["n_row_groups"] == 10
+    assert [column["name"] for column in info["schema"]] == ["a", "b", "c"]
+    content = (data_folder / "test_data.parquet").read_bytes()
+    assert info["content_hash"] == hashlib.sha256(content).hexdigest()
+    assert info["n_chunks"] is None
+
+    with app.app_context():
+        assert Dataset.get_by_name("test_data").id == info["id"]
+        matches = Dataset.get_by_hash(info["content_hash"])
+        assert [dataset.name for dataset in matches] == ["test_data"]
+
+
+def test_dataset_is_refreshed_when_its_file_changes(client, data_folder, df):
+    before = client.get(f"{IO_ROOT}/datasets/test-data").get_json()
+    df.iloc[:10].to_parquet(data_folder / "test_data.parquet")
+    after = client.get(f"{IO_ROOT}/datasets/test-data").get_json()
+    assert after["id"] == before["id"]
+    assert after["n_rows"] == 10
+    assert after["content_hash"] != before["content_hash"]
+
+
+def test_file_is_not_hashed_in_the_request(client, data_folder, df):
+    content = (data_folder / "test_data.parquet").read_bytes()
+    before = client.get(f"{IO_ROOT}/datasets/test-data").get_json()
+    assert before["content_hash"] != hashlib.sha256(content).hexdigest()
+
+    df.iloc[:10].to_parquet(data_folder / "test_data.parquet")
+    after = client.get(f"{IO_ROOT}/datasets/test-data").get_json()
+    assert after["content_hash"] != before["content_hash"]
+
+
+def test_catalog_is_only_queried_when_the_file_changes(
+    client, data_folder, df, monkeypatch
+):
+    calls = []
+    sync_dataset = dataset_catalog._sync_dataset
+
+    def counting_sync_dataset(*args):
+        calls.append(args)
+        return sync_dataset(*args)
+
+    monkeypatch.setattr(dataset_catalog, "_sync_dataset", counting_sync_dataset)
+    for _ in range(3):
+        assert client.get(f"{IO_ROOT}/datasets/test-data").status_code == 200
+    assert len(calls) == 1
+
+    df.iloc[:10].to_parquet(data_folder / "test_data.parquet")
+    assert client.get(f"{IO_ROOT}/datasets/test-data").get_json()["n_rows"] == 10
+    assert len(calls) == 2
+
+
+def test_lookup_survives_any_catalog_failure(client, monkeypatch):
+    def fail(*args):
+        raise ValueError("bad row")
+
+    monkeypatch.setattr(dataset_catalog, "_sync_dataset", fail)
+    response = client.get(f"{IO_ROOT}/datasets/test-data")
+    assert response.status_code == 200
+    assert response.get_json()["n_rows"] == 1000
+    assert response.get_json()["id"] is None
+
+
+def test_missing_dataset_is_forgotten(app, client, data_folder):
+    client.get(f"{IO_ROOT}/datasets/test-data")
+    os.remove(data_folder / "test_data.parquet")
+    assert client.get(f"{IO_ROOT}/datasets/test-data").status_code == 404
+    with app.app_context():
+        assert Dataset.get_by_name("test_data") is None
+
+
+def test_chunk_layout_is_recorded(client, chunked, data_folder):
+    assert client.get(f"{IO_ROOT}/data/manifest/test-data").status_code == 200
+    info = client.get(f"{IO_ROOT}/datasets/test-data").get_json()
+    assert info["n_chunks"] == 20
+    assert info["manifest_path"] == str(
+        data_folder / "chunks" / "test_data_of_020.complete"
+    )
+
+    # Removed chunks are noticed, and dropped from the catalog
+    os.remove(info["manifest_path"])
+    assert client.get(f"{IO_ROOT}/data/chunk-file/test-data/0").status_code == 404
+    assert client.get(f"{IO_ROOT}/datasets/test-data").get_json()["n_chunks"] is None
+
+
+def test_lookup_falls_back_to_the_file_without_a_catalog(app, client):
+    with app.app_context():
+        db.drop_all()
+    response = client.get(f"{IO_ROOT}/datasets/test-data")
+    assert response.status_code == 200
+    assert response.get_json()["n_rows"] == 1000
+    chunk_count = client.get(f"{IO_ROOT}/data/get-chunk-count/test-data").get_json()
+    assert chunk_count["n_chunks"] == 20
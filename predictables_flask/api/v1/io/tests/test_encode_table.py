@@ -0,0 +1,78 @@
+import io
+import json
+
+import msgpack
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from predictables_flask.api.v1.io.src.encode_table import TABLE_FORMATS, encode_table
+
+from .conftest import IO_ROOT
+
+
+def decode(fmt, data):
+    if fmt == "arrow":
+        return pa.ipc.open_stream(data).read_all().to_pandas()
+    elif fmt == "parquet":
+        return pq.read_table(io.BytesIO(data)).to_pandas()
+    else:
+        return pa.table(msgpack.unpackb(data)).to_pandas()
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet", "msgpack"])
+def test_encode_table_round_trips(df, fmt):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    assert decode(fmt, b"".join(encode_table(table, fmt))).equals(df)
+
+
+def test_arrow_stream_is_written_per_batch(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = pa.concat_tables([table.slice(0, 500), table.slice(500)])
+    # schema, one message per batch, end-of-stream marker
+    assert len(list(encode_table(table, "arrow"))) == 4
+
+
+@pytest.mark.parametrize(
+    "query, accept, fmt",
+    [
+        ("", "application/vnd.apache.arrow.stream", "arrow"),
+        ("?format=parquet", "*/*", "parquet"),
+        ("", "application/msgpack;q=0.9, application/json;q=0.5", "msgpack"),
+        ("?format=arrow", "application/json", "arrow"),
+    ],
+)
+def test_sample_data_formats(client, df, query, accept, fmt):
+    response = client.get(
+        f"{IO_ROOT}/sample-data/test-data/records{query}", headers={"Accept": accept}
+    )
+    assert response.status_code == 200
+    assert response.mimetype == TABLE_FORMATS[fmt]
+    assert "Accept" in response.vary
+    assert decode(fmt, response.data).equals(df)
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet", "msgpack"])
+def test_chunk_formats(client, df, fmt):
+    response = client.get(f"{IO_ROOT}/data/chunk/test-data/3?format={fmt}")
+    assert response.status_code == 200
+    assert response.headers["X-Chunk-Start"] == "150"
+    assert response.headers["X-Chunk-Stop"] == "200"
+    assert decode(fmt, response.data).equals(df.iloc[150:200].reset_index(drop=True))
+
+
+def test_json_remains_the_default(client, df):
+    response = client.get(f"{IO_ROOT}/data/chunk/test-data/3", headers={"Accept": "*/*"})
+    assert response.mimetype == "application/json"
+    assert json.loads(response.data)["chunk_number"] == 3
+
+
+@pytest.mark.parametrize(
+    "query, accept",
+    [("?format=xml", "*/*"), ("", "text/csv")],
+)
+def test_unsupported_format(client, query, accept):
+    response = client.get(
+        f"{IO_ROOT}/sample-data/test-data/records{query}", headers={"Accept": accept}
+    )
+    assert response.status_code == 406
@@ -0,0 +1,92 @@
+import hashlib
+import os
+
+import pytest
+
+from .conftest import IO_ROOT
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "sample-data/test-data/records",
+        "sample-data/test-data/records?stream=true",
+        "sample-data/test-data/records?format=arrow",
+        "sample-data/test-data/records?format=parquet",
+        "data/chunk/test-data/2",
+        "data/chunk/test-data/2?format=arrow",
+    ],
+)
+def test_conditional_get(client, path):
+    first = client.get(f"{IO_ROOT}/{path}")
+    etag, is_weak = first.get_etag()
+    assert etag and not is_weak
+
+    second = client.get(f"{IO_ROOT}/{path}", headers={"If-None-Match": f'"{etag}"'})
+    assert second.status_code == 304
+    assert second.data == b""
+    assert second.get_etag() == (etag, False)
+
+
+def test_etags_differ_between_representations(client):
+    etags = {
+        client.get(f"{IO_ROOT}/{path}").get_etag()[0]
+        for path in [
+            "sample-data/test-data/records",
+            "sample-data/test-data/split",
+            "sample-data/test-data/records?format=arrow",
+            "data/chunk/test-data/0",
+            "data/chunk/test-data/1",
+        ]
+    }
+    assert len(etags) == 5
+
+
+def test_etag_changes_when_dataset_is_rewritten(client, df, data_folder):
+    path = f"{IO_ROOT}/data/chunk/test-data/0"
+    etag = client.get(path).get_etag()[0]
+    df.to_parquet(data_folder / "test_data.parquet", row_group_size=50)
+    os.utime(data_folder / "test_data.parquet", ns=(0, 0))
+
+    response = client.get(path, headers={"If-None-Match": f'"{etag}"'})
+    assert response.status_code == 200
+    assert response.get_etag()[0] != etag
+
+
+def test_manifest_lists_chunk_hashes(client, chunked, data_folder):
+    response = client.get(f"{IO_ROOT}/data/manifest/test-data")
+    assert response.status_code == 200
+    manifest = response.get_json()
+    assert manifest["n_chunks"] == len(manifest["chunks"]) == 20
+
+    chunk = manifest["chunks"][3]
+    assert (chunk["start"], chunk["stop"]) == (150, 200)
+    data = (data_folder / "chunks" / chunk["filename"]).read_bytes()
+    assert chunk["n_bytes"] == len(data)
+    assert chunk["sha256"] == hashlib.sha256(data).hexdigest()
+    assert set(chunk["variants"]) == {"gzip", "zstd", "br"}
+
+    etag = response.get_etag()[0]
+    revalidated = client.get(
+        f"{IO_ROOT}/data/manifest/test-data", headers={"If-None-Match": f'"{etag}"'}
+    )
+    assert revalidated.status_code == 304
+
+
+def test_chunk_file_etag_is_content_hash(client, chunked):
+    manifest = client.get(f"{IO_ROOT}/data/manifest/test-data").get_json()
+    chunk = manifest["chunks"][5]
+    for encoding, expected in [
+        ("identity", chunk["sha256"]),
+        ("gzip", chunk["variants"]["gzip"]["sha256"]),
+    ]:
+        path = f"{IO_ROOT}/data/chunk-file/test-data/5"
+        headers = {"Accept-Encoding": encoding}
+        assert client.get(path, headers=headers).get_etag() == (expected, False)
+
+        headers["If-None-Match"] = f'"{expected}"'
+        assert client.get(path, headers=headers).status_code == 304
+
+
+def test_manifest_requires_materialized_chunks(client):
+    assert client.get(f"{IO_ROOT}/data/manifest/test-data").status_code == 404
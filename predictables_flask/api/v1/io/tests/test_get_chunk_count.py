@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+from predictables_flask.api.v1.io.src.chunk_plan import ChunkPlan
+from predictables_flask.api.v1.io.src.get_chunk_count import get_chunk_count
+from predictables_flask.api.v1.io.src.get_dataset_metadata import (
+    read_parquet_footer,
+    get_dataset_metadata,
+)
+
+from .conftest import IO_ROOT
+
+
+@pytest.mark.parametrize(
+    "n_columns, target_chunk_bytes, expected",
+    [(1, 10_000, 2), (1, 1_000, 14), (100, 10_000, 129), (100, 1_000, 1000)],
+)
+def test_get_chunk_count_scales_with_width(n_columns, target_chunk_bytes, expected):
+    df = pd.DataFrame({f"col_{i}": range(1000) for i in range(n_columns)})
+    assert get_chunk_count(df, target_chunk_bytes) == expected
+
+
+@pytest.mark.parametrize("n_rows, n_chunks", [(10, 3), (1000, 7), (5, 5), (0, 1)])
+def test_chunk_plan_is_balanced(n_rows, n_chunks):
+    plan = ChunkPlan(n_rows, n_chunks)
+    ranges = list(plan)
+    sizes = [stop - start for start, stop in ranges]
+    assert len(plan) == n_chunks
+    assert ranges[0][0] == 0 and ranges[-1][1] == n_rows
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert max(sizes) - min(sizes) <= 1
+
+
+def test_chunk_plan_rejects_bad_splits():
+    with pytest.raises(ValueError):
+        ChunkPlan(10, 11)
+    with pytest.raises(IndexError):
+        ChunkPlan(10, 2).row_range(2)
+
+
+def test_get_dataset_metadata_reads_footer_once(app):
+    read_parquet_footer.cache_clear()
+    with app.app_context():
+        metadata = get_dataset_metadata("test_data")
+        get_dataset_metadata("test_data")
+        assert get_chunk_count("test_data") == 20
+
+    assert metadata["n_rows"] == 1000
+    assert metadata["n_row_groups"] == 10
+    assert metadata["n_bytes"] > 0
+    assert read_parquet_footer.cache_info().misses == 1
+
+
+def test_get_chunk_count_route(client):
+    body = client.get(f"{IO_ROOT}/data/get-chunk-count/test-data").get_json()
+    assert body["dataset"] == "test_data"
+    assert body["n_chunks"] == 20
+    assert body["n_rows"] == 1000
+
+
+def test_get_chunk_count_route_missing_dataset(client):
+    response = client.get(f"{IO_ROOT}/data/get-chunk-count/missing-data")
+    assert response.status_code == 404
+    body = response.get_json()
+    assert body["n_chunks"] == 0
+    assert "was not found" in body["error"]
+
+
+def test_get_chunk_count_route_names_the_dataframe(client):
+    body = client.get(f"{IO_ROOT}/data/get-chunk-count/alias/test-data").get_json()
+    assert (body["dataset"], body["n_chunks"]) == ("alias", 20)
+    response = client.get(f"{IO_ROOT}/data/get-chunk-count/alias/missing")
+    assert response.status_code == 404
+    assert response.get_json()["n_chunks"] == 0
@@ -0,0 +1,57 @@
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from predictables_flask.api.v1.io.src.read_parquet_rows import (
+    iter_parquet_rows,
+    read_parquet_rows,
+)
+
+from .conftest import IO_ROOT
+
+
+@pytest.mark.parametrize("start, stop", [(0, 10), (95, 205), (990, 1000), (0, 1000)])
+def test_read_parquet_rows_matches_slice(data_folder, df, start, stop):
+    parquet_file = pq.ParquetFile(data_folder / "test_data.parquet")
+    expected = df.iloc[start:stop].reset_index(drop=True)
+
+    table = read_parquet_rows(parquet_file, start, stop)
+    assert table.to_pandas().reset_index(drop=True).equals(expected)
+
+    batches = list(iter_parquet_rows(parquet_file, start, stop, batch_size=32))
+    streamed = pa.Table.from_batches(batches).to_pandas().reset_index(drop=True)
+    assert streamed.equals(expected)
+
+
+def test_read_parquet_rows_only_reads_overlapping_row_groups(data_folder, monkeypatch):
+    parquet_file = pq.ParquetFile(data_folder / "test_data.parquet")
+    read = []
+    original = parquet_file.read_row_groups
+    monkeypatch.setattr(
+        parquet_file,
+        "read_row_groups",
+        lambda row_groups, **kwargs: read.append(row_groups)
+        or original(row_groups, **kwargs),
+    )
+    read_parquet_rows(parquet_file, 150, 250)
+    assert read == [[1, 2]]
+
+
+@pytest.mark.parametrize("i, start, stop", [(0, 0, 50), (7, 350, 400), (19, 950, 1000)])
+@pytest.mark.parametrize("stream", ["false", "true"])
+def test_get_chunk(client, df, i, start, stop, stream):
+    response = client.get(f"{IO_ROOT}/data/chunk/test-data/{i}?stream={stream}")
+    assert response.status_code == 200
+
+    body = json.loads(response.data)
+    assert body["chunk_number"] == i
+    assert body["n_chunks"] == 20
+    assert (body["start"], body["stop"]) == (start, stop)
+    assert body["data"] == json.loads(df.iloc[start:stop].to_json(orient="records"))
+
+
+@pytest.mark.parametrize("path", ["test-data/20", "missing-data/0"])
+def test_get_chunk_not_found(client, path):
+    assert client.get(f"{IO_ROOT}/data/chunk/{path}").status_code == 404
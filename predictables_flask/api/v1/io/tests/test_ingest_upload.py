@@ -0,0 +1,95 @@
+import hashlib
+import time
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from predictables_flask.api.v1.io.src.content_hash import read_content_hash
+from predictables_flask.api.v1.io.src.get_file_version import get_file_version
+from predictables_flask.api.v1.io.src.ingest_upload import ingest_upload
+
+from .conftest import IO_ROOT
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame(
+        {
+            "id": range(5000),
+            "value": [i / 8 for i in range(5000)],
+            "label": [f"row-{i % 7}" for i in range(5000)],
+        }
+    )
+
+
+@pytest.mark.parametrize("extension", ["csv", "json", "parquet"])
+def test_ingest_writes_row_groups(tmp_path, frame, extension):
+    filename = tmp_path / f"My-Data.{extension}"
+    if extension == "csv":
+        frame.to_csv(filename, index=False)
+    elif extension == "json":
+        frame.to_json(filename, orient="records", lines=True)
+    else:
+        frame.to_parquet(filename)
+
+    result = ingest_upload(
+        str(filename),
+        data_folder=str(tmp_path / "data"),
+        row_group_size=1200,
+        block_size=16 * 1024,
+        sample_bytes=4 * 1024,
+    )
+    assert result["dataset"] == "my_data"
+    assert result["n_rows"] == 5000
+
+    parquet_file = pq.ParquetFile(tmp_path / "data" / "my_data.parquet")
+    sizes = [parquet_file.metadata.row_group(i).num_rows for i in range(5)]
+    assert sizes == [1200, 1200, 1200, 1200, 200]
+    assert parquet_file.read().to_pandas().equals(frame)
+
+    # Hashed once, at ingest time, for the dataset catalog
+    output = str(tmp_path / "data" / "my_data.parquet")
+    content = (tmp_path / "data" / "my_data.parquet").read_bytes()
+    assert read_content_hash(output, get_file_version(output)) == (
+        hashlib.sha256(content).hexdigest()
+    )
+
+
+def test_ingest_pins_schema_inferred_from_sample(tmp_path):
+    # Every sampled value is an integer; later ones must still parse as int64
+    filename = tmp_path / "ints.csv"
+    pd.DataFrame({"a": range(100000)}).to_csv(filename, index=False)
+    ingest_upload(str(filename), data_folder=str(tmp_path), sample_bytes=1024)
+    assert str(pq.read_schema(tmp_path / "ints.parquet").field("a").type) == "int64"
+
+
+def test_ingest_rejects_unsupported_files(tmp_path):
+    (tmp_path / "notes.txt").write_text("hello")
+    with pytest.raises(ValueError):
+        ingest_upload(str(tmp_path / "notes.txt"), data_folder=str(tmp_path))
+
+
+def test_completed_upload_becomes_queryable(client, frame):
+    content = frame.to_csv(index=False).encode()
+    upload_id = client.post(
+        f"{IO_ROOT}/upload/initiate", json={"filename": "Uploaded-Data.csv"}
+    ).get_json()["upload_id"]
+    client.put(
+        f"{IO_ROOT}/upload/{upload_id}/parts/1",
+        data=content,
+        headers={"X-Part-SHA256": hashlib.sha256(content).hexdigest()},
+    )
+    completed = client.post(f"{IO_ROOT}/upload/{upload_id}/complete").get_json()
+    assert completed["dataset"] == "uploaded_data"
+
+    for _ in range(100):
+        status = client.get(f"{IO_ROOT}/data/ingest/uploaded-data").get_json()
+        if status["status"] not in ("queued", "running"):
+            break
+        time.sleep(0.05)
+    assert status["status"] == "done"
+    assert status["result"]["n_rows"] == 5000
+
+    chunk_count = client.get(f"{IO_ROOT}/data/get-chunk-count/uploaded-data").get_json()
+    assert chunk_count["n_rows"] == 5000
@@ -0,0 +1,183 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from flask import current_app
+
+from predictables_flask.api.v1.io.src.job_manager import (
+    JOB_FUNCTIONS,
+    JobManager,
+    job_manager,
+)
+
+from .conftest import IO_ROOT
+
+_release = threading.Event()
+
+
+def wait_for_release(x=None, progress=None):
+    # A job that runs until the test releases it
+    _release.wait(10)
+    return {"extensions": sorted(current_app.extensions)}
+
+
+@pytest.fixture
+def blocking_job(monkeypatch):
+    monkeypatch.setitem(JOB_FUNCTIONS, "wait", f"{__name__}:wait_for_release")
+    _release.clear()
+    yield
+    _release.set()
+
+
+def wait_for(client, job_id, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"{IO_ROOT}/jobs/{job_id}").get_json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.02)
+    raise TimeoutError(f"Job {job_id} did not finish")
+
+
+@pytest.mark.parametrize("url, n_chunks", [("test-data", 20), ("test-data/8", 8)])
+def test_chunk_dataset_runs_as_a_job(client, data_folder, url, n_chunks):
+    response = client.post(f"{IO_ROOT}/data/chunk-dataset/{url}")
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+    assert response.headers["Location"].endswith(f"/jobs/{job_id}")
+
+    job = wait_for(client, job_id)
+    assert job["status"] == "done"
+    assert job["progress"] == {"done": n_chunks, "total": n_chunks}
+    assert os.path.exists(data_folder / "jobs" / f"{job_id}.json")
+
+    result = client.get(f"{IO_ROOT}/jobs/{job_id}/result")
+    assert result.status_code == 200
+    assert result.get_json()["n_chunks"] == n_chunks
+    progress = client.get(f"{IO_ROOT}/jobs/{job_id}/progress").get_json()
+    assert progress == {"status": "done", "done": n_chunks, "total": n_chunks}
+    # Every chunk is in the one container file
+    assert sorted(os.listdir(data_folder / "chunks")) == [
+        "test_data.chunks",
+        "test_data.sketches.json",
+    ]
+
+
+def test_chunked_dataset_is_served(client):
+    job_id = client.post(f"{IO_ROOT}/data/chunk-dataset/test-data").get_json()["job_id"]
+    wait_for(client, job_id)
+    assert client.get(f"{IO_ROOT}/data/manifest/test-data").status_code == 200
+
+
+def test_identical_jobs_are_deduplicated(client):
+    job_ids = {
+        client.post(f"{IO_ROOT}/data/chunk-dataset/test-data").get_json()["job_id"]
+        for _ in range(5)
+    }
+    assert len(job_ids) == 1
+    wait_for(client, job_ids.pop())
+
+    # A finished job is not reused
+    job_id = client.post(f"{IO_ROOT}/data/chunk-dataset/test-data").get_json()["job_id"]
+    assert job_id not in job_ids
+
+
+@pytest.mark.parametrize(
+    "url, status",
+    [
+        ("missing-data", 404),
+        ("test-data/0", 400),
+        ("test-data/1001", 400),
+    ],
+)
+def test_chunk_dataset_rejects_bad_requests(client, url, status):
+    assert client.post(f"{IO_ROOT}/data/chunk-dataset/{url}").status_code == status
+
+
+def test_failed_job_reports_its_error(app, client, data_folder):
+    with app.app_context():
+        job = job_manager.submit(
+            "ingest", {"filename": str(data_folder / "notes.txt"), "ds_name": "notes"}
+        )
+    job = wait_for(client, job["job_id"])
+    assert job["status"] == "failed"
+    response = client.get(f"{IO_ROOT}/jobs/{job['job_id']}/result")
+    assert response.status_code == 500
+    assert "unsupported file type" in response.get_json()["error"]
+
+
+def test_unknown_jobs(app, client):
+    assert client.get(f"{IO_ROOT}/jobs/{'0' * 32}").status_code == 404
+    assert client.get(f"{IO_ROOT}/jobs/not-a-job/result").status_code == 404
+    with pytest.raises(ValueError):
+        job_manager.submit("not-a-job")
+
+
+def test_process_pool(app, client, data_folder):
+    manager = JobManager()
+    app.config["IO_JOB_EXECUTOR"] = "process"
+    manager.init_app(app)
+    try:
+        job = manager.submit("chunk_dataset", {"ds_name": "test_data"})
+        job = wait_for(client, job["job_id"], timeout=60)
+    finally:
+        manager.shutdown()
+    assert job["status"] == "done"
+    assert job["result"]["n_rows"] == 1000
+
+
+def _write_job(folder, job_id, owner):
+    with open(folder / f"{job_id}.json", "w") as f:
+        json.dump({"job_id": job_id, "status": "running", "owner": owner}, f)
+
+
+def test_app_creation_leaves_the_job_folder_alone(app, data_folder):
+    assert not (data_folder / "jobs").exists()
+
+
+def test_only_jobs_of_gone_owners_are_failed_on_first_use(app, data_folder):
+    folder = data_folder / "jobs"
+    folder.mkdir()
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    host = socket.gethostname()
+    _write_job(folder, "a" * 32, {"host": host, "pid": dead.pid})
+    _write_job(folder, "b" * 32, None)
+    _write_job(folder, "c" * 32, {"host": host, "pid": os.getpid()})
+    _write_job(folder, "d" * 32, {"host": f"not-{host}", "pid": dead.pid})
+
+    # Another web worker starting on the same job folder
+    JobManager().init_app(app)
+    assert json.loads((folder / ("a" * 32 + ".json")).read_text())["status"] == "running"
+    manager = JobManager()
+    manager.init_app(app)
+    assert manager.get("e" * 32) is None
+    statuses = {
+        name[0]: json.loads((folder / name).read_text())["status"]
+        for name in os.listdir(folder)
+        if name.endswith(".json")
+    }
+    assert statuses == {"a": "failed", "b": "failed", "c": "running", "d": "running"}
+
+
+def test_jobs_are_shared_between_web_workers(app, client, blocking_job):
+    # Two managers on one job folder, like two gunicorn workers
+    other = JobManager()
+    other.init_app(app)
+    try:
+        job = job_manager.submit("wait", {"x": 1}, tag="waiting")
+        assert other.submit("wait", {"x": 1})["job_id"] == job["job_id"]
+        assert other.get_tagged("waiting")["job_id"] == job["job_id"]
+        assert other.get_tagged("missing") is None
+    finally:
+        _release.set()
+        other.shutdown()
+    job = wait_for(client, job["job_id"])
+    # The job ran under the real app, with its extensions
+    assert {"sqlalchemy", "job_manager"} <= set(job["result"]["extensions"])
+    assert job["owner"] == {"host": socket.gethostname(), "pid": os.getpid()}
@@ -0,0 +1,101 @@
+import hashlib
+import os
+
+import pytest
+
+from .conftest import IO_ROOT
+
+CONTENT = b"a,b\n" + b"".join(f"{i},{i * 2}\n".encode() for i in range(10000))
+PARTS = [CONTENT[i : i + 20000] for i in range(0, len(CONTENT), 20000)]
+
+
+def initiate(client, filename="big.csv"):
+    response = client.post(f"{IO_ROOT}/upload/initiate", json={"filename": filename})
+    assert response.status_code == 201
+    return response.get_json()["upload_id"]
+
+
+def put_part(client, upload_id, number, data, sha256=None):
+    return client.put(
+        f"{IO_ROOT}/upload/{upload_id}/parts/{number}",
+        data=data,
+        headers={"X-Part-SHA256": sha256 or hashlib.sha256(data).hexdigest()},
+        content_type="application/octet-stream",
+    )
+
+
+def test_upload_in_parts_out_of_order(client, data_folder):
+    upload_id = initiate(client)
+    for number in reversed(range(1, len(PARTS) + 1)):
+        assert put_part(client, upload_id, number, PARTS[number - 1]).status_code == 200
+
+    response = client.post(f"{IO_ROOT}/upload/{upload_id}/complete")
+    assert response.status_code == 200
+    assert response.get_json()["sha256"] == hashlib.sha256(CONTENT).hexdigest()
+    assert (data_folder / "uploads" / "big.csv").read_bytes() == CONTENT
+    assert not os.listdir(data_folder / "uploads" / ".parts")
+
+
+def test_upload_resumes_from_reported_parts(client, data_folder):
+    upload_id = initiate(client)
+    put_part(client, upload_id, 1, PARTS[0])
+    put_part(client, upload_id, 3, PARTS[2])
+
+    # The connection drops; the client asks what the server already has
+    status = client.get(f"{IO_ROOT}/upload/{upload_id}").get_json()
+    have = {part["part_number"]: part["sha256"] for part in status["parts"]}
+    assert have == {
+        1: hashlib.sha256(PARTS[0]).hexdigest(),
+        3: hashlib.sha256(PARTS[2]).hexdigest(),
+    }
+
+    incomplete = client.post(
+        f"{IO_ROOT}/upload/{upload_id}/complete", json={"parts": [1, 2, 3, 4]}
+    )
+    assert incomplete.status_code == 400
+    assert "[2, 4]" in incomplete.get_json()["error"]
+
+    for number in range(1, len(PARTS) + 1):
+        if number not in have:
+            put_part(client, upload_id, number, PARTS[number - 1])
+    assert client.post(f"{IO_ROOT}/upload/{upload_id}/complete").status_code == 200
+    assert (data_folder / "uploads" / "big.csv").read_bytes() == CONTENT
+
+
+def test_corrupted_part_is_rejected(client):
+    upload_id = initiate(client)
+    response = put_part(client, upload_id, 1, PARTS[0], sha256="0" * 64)
+    assert response.status_code == 400
+    assert "does not match its hash" in response.get_json()["error"]
+    assert client.get(f"{IO_ROOT}/upload/{upload_id}").get_json()["parts"] == []
+
+
+def test_oversized_part_is_rejected(app, client):
+    app.config["UPLOAD_MAX_PART_BYTES"] = 1000
+    upload_id = initiate(client)
+    assert put_part(client, upload_id, 1, PARTS[0]).status_code == 400
+
+
+@pytest.mark.parametrize(
+    "method, path, expected_status",
+    [
+        ("get", "/upload/" + "0" * 32, 404),
+        ("get", "/upload/..%2F..%2Fetc", 404),
+        ("post", "/upload/" + "0" * 32 + "/complete", 404),
+        ("delete", "/upload/" + "0" * 32, 404),
+    ],
+)
+def test_unknown_uploads(client, method, path, expected_status):
+    assert getattr(client, method)(f"{IO_ROOT}{path}").status_code == expected_status
+
+
+def test_invalid_file_type_is_rejected(client):
+    response = client.post(f"{IO_ROOT}/upload/initiate", json={"filename": "run.exe"})
+    assert response.status_code == 400
+
+
+def test_abort_upload(client, data_folder):
+    upload_id = initiate(client)
+    put_part(client, upload_id, 1, PARTS[0])
+    assert client.delete(f"{IO_ROOT}/upload/{upload_id}").status_code == 200
+    assert client.get(f"{IO_ROOT}/upload/{upload_id}").status_code == 404
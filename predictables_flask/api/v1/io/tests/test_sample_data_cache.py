@@ -0,0 +1,68 @@
+import os
+from io import StringIO
+
+import pandas as pd
+import pytest
+
+from predictables_flask.api.v1.io.src.sample_data_cache import (
+    SampleDataCache,
+    sample_data_cache,
+)
+
+from .conftest import IO_ROOT
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SampleDataCache(max_bytes=10)
+    cache.put(("json", "a", 1), b"aaaa", 4)
+    cache.put(("json", "b", 1), b"bbbb", 4)
+    assert cache.get(("json", "a", 1)) == b"aaaa"  # a is now most recent
+
+    cache.put(("json", "c", 1), b"cccc", 4)
+    assert cache.get(("json", "b", 1)) is None
+    assert cache.get(("json", "a", 1)) == b"aaaa"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["current_bytes"] == 8
+
+
+def test_cache_drops_stale_versions():
+    cache = SampleDataCache()
+    cache.put(("json", "a", "records", (1, 10)), b"old", 3)
+    cache.put(("json", "a", "records", (2, 12)), b"new", 3)
+    assert cache.get(("json", "a", "records", (1, 10))) is None
+    assert cache.stats()["entries"] == 1
+
+
+@pytest.mark.parametrize("nbytes, expected_entries", [(10, 1), (11, 0)])
+def test_cache_skips_values_over_budget(nbytes, expected_entries):
+    cache = SampleDataCache(max_bytes=10)
+    cache.put(("frame", "a", 1), object(), nbytes)
+    assert cache.stats()["entries"] == expected_entries
+
+
+def test_sample_data_is_served_from_cache(client, df):
+    first = client.get(f"{IO_ROOT}/sample-data/test-data/records")
+    second = client.get(f"{IO_ROOT}/sample-data/test-data/records")
+    assert first.data == second.data
+    pd.testing.assert_frame_equal(
+        pd.read_json(StringIO(first.get_json()), orient="records"), df, check_dtype=False
+    )
+
+    stats = client.get(f"{IO_ROOT}/cache/stats").get_json()
+    assert stats["by_kind"]["json"] == {"hits": 1, "misses": 1}
+    assert stats["by_kind"]["frame"] == {"hits": 0, "misses": 1}
+
+
+def test_sample_data_reuses_frame_across_orients(client):
+    client.get(f"{IO_ROOT}/sample-data/test-data/records")
+    client.get(f"{IO_ROOT}/sample-data/test-data/split")
+    assert sample_data_cache.stats()["by_kind"]["frame"] == {"hits": 1, "misses": 1}
+
+
+def test_sample_data_reloads_rewritten_file(client, data_folder):
+    client.get(f"{IO_ROOT}/sample-data/test-data/records")
+    pd.DataFrame({"a": [1, 2]}).to_parquet(data_folder / "test_data.parquet")
+    os.utime(data_folder / "test_data.parquet", ns=(0, 0))
+
+    response = client.get(f"{IO_ROOT}/sample-data/test-data/records")
+    assert pd.read_json(StringIO(response.get_json()), orient="records")["a"].tolist() == [1, 2]
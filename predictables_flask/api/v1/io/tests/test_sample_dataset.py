@@ -0,0 +1,131 @@
+import io
+
+import pyarrow as pa
+import pytest
+
+from predictables_flask.api.v1.io.src.sample_dataset import sample_dataset
+
+from .conftest import IO_ROOT
+
+
+def test_uniform_sample(app, df):
+    with app.app_context():
+        sample = sample_dataset("test_data", fraction=0.2, seed=0, batch_size=64)
+        again = sample_dataset("test_data", fraction=0.2, seed=0, batch_size=64)
+
+    assert sample.equals(again)
+    assert sample.num_rows == pytest.approx(200, abs=50)
+    a = sample["a"].to_pylist()
+    assert a == sorted(a)
+    assert sample.to_pandas().equals(df.iloc[a].reset_index(drop=True))
+
+
+def test_reservoir_sample(app, df):
+    with app.app_context():
+        sample = sample_dataset("test_data", "reservoir", n=37, seed=1, batch_size=64)
+        everything = sample_dataset("test_data", "reservoir", n=5000, batch_size=64)
+        nothing = sample_dataset("test_data", "reservoir", n=0)
+
+    assert sample.num_rows == 37
+    assert len(set(sample["a"].to_pylist())) == 37
+    assert everything.to_pandas().equals(df)
+    assert nothing.num_rows == 0 and nothing.schema.names == ["a", "b", "c"]
+
+
+def test_reservoir_sample_is_uniform(app):
+    # Every row should be picked about n / N of the time
+    with app.app_context():
+        picks = [
+            sample_dataset("test_data", "reservoir", n=100, seed=s, batch_size=128)["a"]
+            for s in range(50)
+        ]
+    hits = pa.chunked_array(picks).to_numpy()
+    assert (hits < 500).mean() == pytest.approx(0.5, abs=0.03)
+
+
+def test_stratified_sample(app, df):
+    with app.app_context():
+        per_stratum = sample_dataset("test_data", "stratified", n=3, by="c", seed=2)
+        proportional = sample_dataset(
+            "test_data", "stratified", fraction=0.01, by="c", seed=2
+        )
+
+    counts = per_stratum.to_pandas()["c"].value_counts()
+    assert counts.to_dict() == {"x": 3, "y": 3, "z": 3, "w": 3}
+    # ceil(250 * 0.01) rows of each of the 4 strata
+    assert proportional.num_rows == 12
+
+
+def test_stratified_sample_is_compacted_rarely(app, monkeypatch):
+    from predictables_flask.api.v1.io.src import sample_dataset as module
+
+    calls = []
+    compact = module._compact
+    monkeypatch.setattr(
+        module, "_compact", lambda *args: calls.append(1) or compact(*args)
+    )
+    with app.app_context():
+        batched = sample_dataset(
+            "test_data", "stratified", n=20, by="c", seed=4, batch_size=10
+        )
+        whole = sample_dataset(
+            "test_data", "stratified", n=20, by="c", seed=4, batch_size=1000
+        )
+
+    # The 100 batches only fill the reservoirs past twice their size a few times
+    assert 1 < len(calls) < 20
+    assert batched.equals(whole)
+    counts = batched.to_pandas()["c"].value_counts()
+    assert counts.to_dict() == dict.fromkeys("xyzw", 20)
+
+
+def test_sample_query(app):
+    from predictables_flask.api.v1.io.src.table_query import TableQuery
+
+    query = TableQuery(("a",), (("c", "==", "x"), ("a", "<", 400)))
+    with app.app_context():
+        sample = sample_dataset(
+            "test_data", "stratified", fraction=0.1, by="c", query=query, seed=3
+        )
+    assert sample.schema.names == ["a"]
+    assert sample.num_rows == 10
+    assert all(a % 4 == 0 and a < 400 for a in sample["a"].to_pylist())
+
+
+def test_sample_endpoint(client):
+    url = f"{IO_ROOT}/data/sample/test-data?mode=reservoir&n=10&seed=4"
+    response = client.get(url)
+    assert response.status_code == 200
+    rows = response.get_json()
+    assert len(rows) == 10 and set(rows[0]) == {"a", "b", "c"}
+    etag = response.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    response = client.get(url + "&format=arrow&columns=a")
+    table = pa.ipc.open_stream(io.BytesIO(response.data)).read_all()
+    assert table.schema.names == ["a"]
+    assert table["a"].to_pylist() == [row["a"] for row in rows]
+
+    assert "ETag" not in client.get(f"{IO_ROOT}/data/sample/test-data?fraction=0.1").headers
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        "mode=bogus&fraction=0.1",
+        "mode=uniform",
+        "fraction=2",
+        "mode=reservoir",
+        "mode=stratified&n=1",
+        "mode=stratified&by=x&n=1",
+        "mode=stratified&by=c&n=1&fraction=0.5",
+        "fraction=0.1&orient=split",
+        "fraction=0.1&filter=x>1",
+    ],
+)
+def test_invalid_sample_parameters(client, params):
+    assert client.get(f"{IO_ROOT}/data/sample/test-data?{params}").status_code == 400
+
+
+def test_sample_missing_dataset(client):
+    assert client.get(f"{IO_ROOT}/data/sample/missing?fraction=0.1").status_code == 404
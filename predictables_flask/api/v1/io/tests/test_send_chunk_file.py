@@ -0,0 +1,67 @@
+import gzip
+import json
+
+import brotli
+import pytest
+import zstandard
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+from predictables_flask.api.v1.io.src.compress_chunk import (
+    choose_content_encoding,
+    compress_chunk,
+)
+
+from .conftest import IO_ROOT
+
+DECOMPRESS = {
+    "identity": lambda data: data,
+    "gzip": gzip.decompress,
+    "zstd": lambda data: zstandard.ZstdDecompressor().decompress(data),
+    "br": brotli.decompress,
+}
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "zstd", "br"])
+def test_compress_chunk_round_trips(encoding):
+    data = b'[{"a":1}]' * 100
+    compressed = compress_chunk(data, encoding)
+    assert len(compressed) < len(data)
+    assert DECOMPRESS[encoding](compressed) == data
+
+
+@pytest.mark.parametrize(
+    "header, available, expected",
+    [
+        ("gzip, br, zstd", ["gzip", "zstd", "br"], "br"),
+        ("gzip, br;q=0.5", ["gzip", "zstd", "br"], "gzip"),
+        ("gzip, br", ["gzip"], "gzip"),
+        ("*", ["gzip", "zstd"], "zstd"),
+        ("identity", ["gzip", "zstd", "br"], "identity"),
+        ("", ["gzip"], "identity"),
+    ],
+)
+def test_choose_content_encoding(header, available, expected):
+    accept = parse_accept_header(header, Accept)
+    assert choose_content_encoding(accept, available) == expected
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip", "zstd", "br"])
+def test_chunk_file_is_sent_precompressed(client, df, chunked, encoding):
+    response = client.get(
+        f"{IO_ROOT}/data/chunk-file/test-data/4", headers={"Accept-Encoding": encoding}
+    )
+    assert response.status_code == 200
+    assert response.headers.get("Content-Encoding", "identity") == encoding
+    assert "Accept-Encoding" in response.vary
+    assert response.headers["X-Chunk-Start"] == "200"
+
+    response.direct_passthrough = False
+    rows = json.loads(DECOMPRESS[encoding](response.get_data()))
+    assert rows == json.loads(df.iloc[200:250].to_json(orient="records"))
+
+
+def test_chunk_file_requires_materialized_chunks(client):
+    response = client.get(f"{IO_ROOT}/data/chunk-file/test-data/0")
+    assert response.status_code == 404
+    assert "has not been chunked" in response.get_json()["error"]
@@ -0,0 +1,160 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from predictables_flask.api.v1.io.src.chunk_plan import ChunkPlan
+from predictables_flask.api.v1.io.src.send_data_chunks import (
+    send_chunks,
+    split_and_send_dataframe,
+)
+
+
+class StandInServer:
+    """
+    A local aiohttp server that records chunks, with injected latency and failures.
+    """
+
+    def __init__(self, latency=0.01, fail_first=0, fail_status=503, hang_first=0):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.hang_first = hang_first
+        self.attempts = {}
+        self.received = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, request):
+        i = int(request.headers["X-Chunk-Number"])
+        self.attempts[i] = self.attempts.get(i, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.attempts[i] <= self.hang_first:
+                await asyncio.sleep(1)
+            await asyncio.sleep(self.latency)
+            if self.attempts[i] <= self.fail_first:
+                return web.Response(status=self.fail_status)
+            self.received[i] = await request.read()
+            return web.Response(text=f"ok {i}")
+        finally:
+            self.in_flight -= 1
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/chunks", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/chunks"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_chunks_are_sent_with_bounded_concurrency():
+    chunks = [json.dumps([{"a": i}]) for i in range(40)]
+
+    async def main():
+        async with StandInServer(latency=0.02) as server:
+            stats = await send_chunks(server.url, chunks, max_in_flight=4)
+        return server, stats
+
+    server, stats = run(main())
+    assert stats.results == [f"ok {i}" for i in range(40)]
+    assert [server.received[i].decode() for i in range(40)] == chunks
+    assert server.max_in_flight == 4
+    assert stats.summary()["n_chunks"] == 40
+    assert stats.summary()["latency_p99"] >= 0.02
+
+
+def test_chunks_are_consumed_lazily():
+    server = StandInServer(latency=0.01)
+    ahead = []
+
+    def generate():
+        for i in range(20):
+            # How many chunks have been pulled but not yet received
+            ahead.append(i + 1 - len(server.received))
+            yield json.dumps([i])
+
+    async def main():
+        async with server:
+            return await send_chunks(server.url, generate(), max_in_flight=3)
+
+    stats = run(main())
+    assert len(stats.results) == 20
+    assert max(ahead) <= 3
+
+
+@pytest.mark.parametrize("fail_status", [500, 503, 429])
+def test_transient_failures_are_retried(fail_status):
+    async def main():
+        async with StandInServer(fail_first=2, fail_status=fail_status) as server:
+            stats = await send_chunks(
+                server.url, ["[1]", "[2]", "[3]"], retries=3, backoff=0.001
+            )
+        return server, stats
+
+    server, stats = run(main())
+    assert stats.results == ["ok 0", "ok 1", "ok 2"]
+    assert stats.n_retries == 6
+    assert all(attempts == 3 for attempts in server.attempts.values())
+
+
+def test_client_errors_are_not_retried():
+    async def main():
+        async with StandInServer(fail_first=5, fail_status=400) as server:
+            stats = await send_chunks(server.url, ["[1]"], retries=3, backoff=0.001)
+        return server, stats
+
+    server, stats = run(main())
+    assert server.attempts == {0: 1}
+    assert stats.n_retries == 0
+    assert stats.results == [None]
+    assert "400" in stats.failures[0][1]
+
+
+def test_timeouts_are_retried():
+    async def main():
+        async with StandInServer(hang_first=1) as server:
+            return await send_chunks(
+                server.url, ["[1]", "[2]"], timeout=0.2, backoff=0.001
+            )
+
+    stats = run(main())
+    assert stats.results == ["ok 0", "ok 1"]
+    assert stats.n_retries == 2
+
+
+def test_exhausted_retries_are_reported_without_aborting():
+    async def main():
+        async with StandInServer(fail_first=5) as server:
+            return await send_chunks(
+                server.url, ["[1]", "[2]"], retries=1, backoff=0.001
+            )
+
+    stats = run(main())
+    assert stats.results == [None, None]
+    assert sorted(i for i, _ in stats.failures) == [0, 1]
+
+
+def test_split_and_send_dataframe_follows_plan(df):
+    async def main():
+        async with StandInServer(latency=0) as server:
+            stats = await split_and_send_dataframe(df, server.url, plan=ChunkPlan(1000, 7))
+        return server, stats
+
+    server, stats = run(main())
+    assert stats.n_chunks == 7
+    rows = [row for i in range(7) for row in json.loads(server.received[i])]
+    assert rows == json.loads(df.to_json(orient="records"))
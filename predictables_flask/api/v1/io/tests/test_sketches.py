@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from predictables_flask.api.v1.io.src.sketches import HyperLogLog, KllSketch
+
+from .conftest import IO_ROOT
+from .test_job_manager import wait_for
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def test_kll_quantiles_are_within_the_rank_error():
+    values = np.random.default_rng(0).lognormal(size=200_000)
+    sketch = KllSketch(seed=0)
+    for part in np.array_split(values, 37):
+        sketch.update(part)
+
+    assert sketch.n == len(values)
+    assert sum(len(level) for level in sketch.levels) < 1000
+    ranks = np.searchsorted(np.sort(values), sketch.quantiles(QUANTILES)) / len(values)
+    assert np.abs(ranks - QUANTILES).max() <= sketch.rank_error
+    assert sketch.quantiles([0, 1]) == [values.min(), values.max()]
+
+
+def test_kll_rank_error_holds_for_every_rank():
+    # The largest error over all ranks, across independent sketches
+    errors = []
+    for seed in range(10):
+        values = np.random.default_rng(seed).random(1_000_000)
+        sketch = KllSketch(seed=seed)
+        for part in np.array_split(values, 100):
+            sketch.update(part)
+        items, weights = sketch._sorted_items()
+        estimated = np.cumsum(weights) / sketch.n
+        actual = np.searchsorted(np.sort(values), items, side="right") / sketch.n
+        errors.append(np.abs(estimated - actual).max())
+
+    assert max(errors) <= sketch.rank_error
+
+
+def test_kll_merge_and_round_trip():
+    values = np.random.default_rng(1).normal(size=50_000)
+    left, right = KllSketch(seed=1), KllSketch(seed=2)
+    left.update(values[:20_000])
+    right.update(values[20_000:])
+    merged = KllSketch.from_dict(left.to_dict()).merge(right)
+
+    assert merged.n == len(values)
+    assert merged.rank(0.0) == pytest.approx(0.5, abs=merged.rank_error)
+    for q in (1.5, -0.1, float("nan")):
+        with pytest.raises(ValueError):
+            merged.quantiles([q])
+
+
+def test_hyperloglog_is_within_the_relative_error():
+    rng = np.random.default_rng(2)
+    left, right = HyperLogLog(), HyperLogLog()
+    left.update(rng.permutation(np.tile(np.arange(60_000), 2)))
+    right.update(np.arange(40_000, 140_000).astype(str).astype(object))
+    assert left.estimate() == pytest.approx(60_000, rel=3 * left.relative_error)
+
+    # Strings and integers hash differently, so the union has ~160k values
+    merged = HyperLogLog.from_dict(left.to_dict()).merge(right)
+    assert merged.estimate() == pytest.approx(160_000, rel=3 * merged.relative_error)
+
+    small = HyperLogLog()
+    small.update(np.arange(100))
+    assert small.estimate() == pytest.approx(100, abs=2)
+
+
+def test_sketch_endpoint_builds_the_sketches_in_a_job(client, df):
+    url = f"{IO_ROOT}/data/sketches/test-data?q=0.5,0.9"
+    response = client.get(url)
+    assert response.status_code == 202
+    assert wait_for(client, response.get_json()["job_id"])["status"] == "done"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    columns = response.get_json()["columns"]
+    assert columns["c"] == {
+        "distinct_count": 4,
+        "distinct_count_error": pytest.approx(0.01625),
+    }
+    a = columns["a"]
+    assert a["count"] == 1000
+    assert a["distinct_count"] == pytest.approx(1000, rel=0.05)
+    for q, value in a["quantiles"].items():
+        assert value / 1000 == pytest.approx(float(q), abs=a["rank_error"])
+
+    assert client.get(f"{IO_ROOT}/data/sketches/test-data?columns=x").status_code == 400
+    for q in ("2", "-1", "nan", "x"):
+        url = f"{IO_ROOT}/data/sketches/test-data?q={q}"
+        assert client.get(url).status_code == 400
+    assert client.get(f"{IO_ROOT}/data/sketches/test-data?filter=a").status_code == 400
+    assert client.get(f"{IO_ROOT}/data/sketches/test-data?filter=a>1").status_code == 400
+    assert client.get(f"{IO_ROOT}/data/sketches/missing").status_code == 404
+
+
+def test_invalid_quantiles_do_not_build_the_sketches(client, monkeypatch):
+    from predictables_flask.api.v1.io.src.job_manager import job_manager
+
+    submitted = []
+    monkeypatch.setattr(job_manager, "submit", lambda *args: submitted.append(args))
+    for q in ("2", "nan", "0.5,-0.5"):
+        url = f"{IO_ROOT}/data/sketches/test-data?q={q}"
+        assert client.get(url).status_code == 400
+    assert submitted == []
+
+
+def test_chunking_builds_the_sketches(client, data_folder, df):
+    job = client.post(f"{IO_ROOT}/data/chunk-dataset/test-data").get_json()
+    assert wait_for(client, job["job_id"])["status"] == "done"
+    assert (data_folder / "chunks" / "test_data.sketches.json").exists()
+    assert client.get(f"{IO_ROOT}/data/sketches/test-data").status_code == 200
+
+    # A rewritten file makes the sketches stale
+    df.iloc[:500].to_parquet(data_folder / "test_data.parquet", row_group_size=100)
+    assert client.get(f"{IO_ROOT}/data/sketches/test-data").status_code == 202
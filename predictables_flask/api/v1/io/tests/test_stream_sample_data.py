@@ -0,0 +1,103 @@
+import json
+
+import pyarrow as pa
+import pytest
+
+from predictables_flask.api.v1.io.src.stream_sample_data import (
+    iter_json_batches,
+    iter_ndjson_batches,
+)
+
+from .conftest import IO_ROOT
+
+
+@pytest.mark.parametrize("orient", ["records", "values"])
+def test_streamed_sample_data_matches_dataset(client, df, orient):
+    response = client.get(
+        f"{IO_ROOT}/sample-data/test-data/{orient}?stream=true&batch_size=64"
+    )
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert json.loads(response.data) == json.loads(df.to_json(orient=orient))
+
+
+def test_stream_defaults_to_records(client, df):
+    response = client.get(f"{IO_ROOT}/sample-data/test-data?stream=true")
+    assert response.status_code == 200
+    assert json.loads(response.data) == json.loads(df.to_json(orient="records"))
+    # Without a stream, the default orient is still 'split'
+    response = client.get(f"{IO_ROOT}/sample-data/test-data")
+    assert set(json.loads(response.get_json())) == {"columns", "index", "data"}
+
+
+def test_iter_json_batches_yields_one_piece_per_batch(df):
+    table = pa.Table.from_pandas(df)
+    pieces = list(iter_json_batches(table.to_batches(max_chunksize=250)))
+    # "[", 4 batches with 3 separators between them, "]"
+    assert len(pieces) == 9
+    assert json.loads(b"".join(pieces)) == json.loads(df.to_json(orient="records"))
+
+
+def test_iter_json_batches_handles_empty_input():
+    assert b"".join(iter_json_batches([])) == b"[]"
+
+
+@pytest.mark.parametrize(
+    "path, expected_status",
+    [
+        ("test-data/split?stream=true", 400),
+        ("test-data/records?stream=true&batch_size=0", 400),
+        ("test-data?stream=true&batch_size=-5", 400),
+        ("missing-data/records?stream=true", 404),
+    ],
+)
+def test_streamed_sample_data_errors(client, path, expected_status):
+    assert client.get(f"{IO_ROOT}/sample-data/{path}").status_code == expected_status
+
+
+def test_iter_ndjson_batches_yields_one_line_per_row(df):
+    table = pa.Table.from_pandas(df)
+    pieces = list(iter_ndjson_batches(table.to_batches(max_chunksize=250)))
+    assert len(pieces) == 4
+    assert all(piece.endswith(b"\n") for piece in pieces)
+    lines = b"".join(pieces).splitlines()
+    assert [json.loads(line) for line in lines] == df.to_dict(orient="records")
+    assert b"".join(iter_ndjson_batches([])) == b""
+
+
+@pytest.mark.parametrize(
+    "path, headers",
+    [
+        ("sample-data/test-data?format=ndjson&batch_size=64", {}),
+        ("sample-data/test-data/values", {"Accept": "application/x-ndjson"}),
+        ("data/sample/test-data?fraction=1&format=ndjson", {}),
+    ],
+)
+def test_ndjson_sample_data(client, df, path, headers):
+    response = client.get(f"{IO_ROOT}/{path}", headers=headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.data.splitlines()]
+    assert rows == df.to_dict(orient="records")
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet", "msgpack"])
+def test_binary_formats_take_precedence_over_stream(client, fmt):
+    plain = client.get(f"{IO_ROOT}/sample-data/test-data?format={fmt}")
+    response = client.get(f"{IO_ROOT}/sample-data/test-data?format={fmt}&stream=true")
+    assert response.status_code == 200
+    assert response.mimetype == plain.mimetype
+    assert response.data == plain.data
+
+
+@pytest.mark.parametrize("stream", ["false", "true"])
+def test_ndjson_chunk(client, df, stream):
+    response = client.get(
+        f"{IO_ROOT}/data/chunk/test-data/7?format=ndjson&columns=a,c&stream={stream}"
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.headers["X-Chunk-Start"] == "350"
+    rows = [json.loads(line) for line in response.data.splitlines()]
+    assert rows == df[["a", "c"]].iloc[350:400].to_dict(orient="records")
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from predictables_flask.api.v1.io.src.column_summary import (
+    ColumnSummary,
+    merge_summaries,
+)
+
+from .conftest import IO_ROOT
+
+
+@pytest.mark.parametrize("n_parts", [1, 2, 7, 50])
+def test_merged_parts_match_the_whole(n_parts):
+    rng = np.random.default_rng(0)
+    values = rng.normal(1e6, 3.0, size=1000)
+    values[::13] = np.nan
+    parts = np.array_split(values, n_parts)
+    summary = merge_summaries(
+        ColumnSummary.from_array(pa.chunked_array([part])) for part in parts
+    )
+
+    expected = pd.Series(values)
+    stats = summary.to_dict()
+    assert stats["count"] == expected.count()
+    assert stats["null_count"] == expected.isna().sum()
+    assert stats["mean"] == pytest.approx(expected.mean(), rel=1e-12)
+    assert stats["variance"] == pytest.approx(expected.var(), rel=1e-9)
+    assert stats["min"] == expected.min()
+    assert stats["max"] == expected.max()
+
+
+def test_non_numeric_and_empty_columns():
+    strings = ColumnSummary.from_array(pa.chunked_array([["b", None, "a"]]))
+    assert strings.to_dict() == {
+        "count": 2,
+        "null_count": 1,
+        "null_rate": 1 / 3,
+        "mean": None,
+        "variance": None,
+        "std": None,
+        "min": "a",
+        "max": "b",
+    }
+    nulls = ColumnSummary.from_array(pa.chunked_array([[None, None]], pa.int64()))
+    assert nulls.merge(ColumnSummary.from_array(pa.chunked_array([[5]]))).mean == 5
+
+
+def test_summary_endpoint(client, df):
+    response = client.get(f"{IO_ROOT}/data/summary/test-data")
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert summary["n_rows"] == 1000
+    # 10 row groups of 3 columns
+    assert summary["n_computed"] == 30
+
+    b = summary["columns"]["b"]
+    assert b["mean"] == pytest.approx(df["b"].mean())
+    assert b["variance"] == pytest.approx(df["b"].var())
+    assert (b["min"], b["max"]) == (0.0, 249.75)
+    assert summary["columns"]["a"]["max"] == 999
+    assert summary["columns"]["c"]["min"] == "w"
+
+    assert client.get(f"{IO_ROOT}/data/summary/test-data").get_json()["n_computed"] == 0
+
+
+def test_appended_rows_only_summarize_new_row_groups(client, data_folder, df):
+    client.get(f"{IO_ROOT}/data/summary/test-data")
+    appended = pd.concat([df, df.iloc[:100].assign(a=lambda d: d["a"] + 1000)])
+    appended.reset_index(drop=True).to_parquet(
+        data_folder / "test_data.parquet", row_group_size=100
+    )
+    summary = client.get(f"{IO_ROOT}/data/summary/test-data").get_json()
+    assert summary["n_rows"] == 1100
+    # The first 10 row groups are unchanged, only the new one is summarized
+    assert summary["n_computed"] == 3
+    assert summary["columns"]["a"]["max"] == 1099
+    assert summary["columns"]["a"]["count"] == 1100
+
+
+def test_summary_columns(client):
+    summary = client.get(f"{IO_ROOT}/data/summary/test-data?columns=a").get_json()
+    assert list(summary["columns"]) == ["a"]
+    assert client.get(f"{IO_ROOT}/data/summary/test-data?columns=x").status_code == 400
+    assert client.get(f"{IO_ROOT}/data/summary/test-data?filter=a>1").status_code == 400
+    assert client.get(f"{IO_ROOT}/data/summary/test-data?filter=a").status_code == 400
+    assert client.get(f"{IO_ROOT}/data/summary/missing").status_code == 404
+
+
+def test_dotted_and_nested_column_names(client, data_folder):
+    table = pa.table(
+        {
+            "x.y": pa.array(range(100)),
+            "s": pa.array([{"t": i, "u": str(i)} for i in range(100)]),
+            "x": pa.array(range(100, 200)),
+        }
+    )
+    pq.write_table(table, data_folder / "dotted.parquet", row_group_size=10)
+    summary = client.get(f"{IO_ROOT}/data/summary/dotted").get_json()
+    assert summary["n_computed"] == 30
+    dotted = summary["columns"]["x.y"]
+    assert (dotted["count"], dotted["min"], dotted["max"]) == (100, 0, 99)
+    assert dotted["mean"] == pytest.approx(49.5)
+    assert summary["columns"]["x"]["max"] == 199
+    assert summary["columns"]["s"]["count"] == 100
+
+
+def test_row_groups_with_equal_bytes_do_not_share_a_summary(client, data_folder):
+    pd.DataFrame({"a": [1, 2] * 50}).to_parquet(
+        data_folder / "repeated.parquet", row_group_size=2
+    )
+    summary = client.get(f"{IO_ROOT}/data/summary/repeated").get_json()
+    assert summary["n_computed"] == 50
+    assert summary["columns"]["a"]["count"] == 100
+
+
+def test_column_chunks_are_hashed_once_per_file_version(client, monkeypatch):
+    from predictables_flask.api.v1.io.src import summarize_dataset
+
+    calls = []
+    hash_column_chunk = summarize_dataset._hash_column_chunk
+    monkeypatch.setattr(
+        summarize_dataset,
+        "_hash_column_chunk",
+        lambda *args: calls.append(args) or hash_column_chunk(*args),
+    )
+    summarize_dataset._hash_column_chunks.cache_clear()
+    client.get(f"{IO_ROOT}/data/summary/test-data")
+    n_chunks = len(calls)
+    assert n_chunks > 0
+    client.get(f"{IO_ROOT}/data/summary/test-data?columns=a")
+    assert client.get(f"{IO_ROOT}/data/summary/test-data").status_code == 200
+    assert len(calls) == n_chunks
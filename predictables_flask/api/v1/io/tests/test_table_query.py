@@ -0,0 +1,123 @@
+import io
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from predictables_flask.api.v1.io.src.table_query import TableQuery, parse_table_query
+
+from .conftest import IO_ROOT
+
+SCHEMA = pa.schema([("a", pa.int64()), ("b", pa.float64()), ("c", pa.string())])
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        ([], TableQuery()),
+        ([("columns", "a, c")], TableQuery(("a", "c"))),
+        ([("columns", "a"), ("columns", "b")], TableQuery(("a", "b"))),
+        ([("filter", "a>=10")], TableQuery(filters=(("a", ">=", "10"),))),
+        ([("filter", "a = 10")], TableQuery(filters=(("a", "==", "10"),))),
+        ([("filter", "c in x,y")], TableQuery(filters=(("c", "in", ("x", "y")),))),
+        (
+            [("filter", "c NOT IN (x, y)"), ("filter", "b<1.5")],
+            TableQuery(filters=(("c", "not in", ("x", "y")), ("b", "<", "1.5"))),
+        ),
+    ],
+)
+def test_parse_table_query(args, expected):
+    assert parse_table_query(MultiDict(args)) == expected
+
+
+def test_bind_casts_values_to_column_types():
+    query = parse_table_query(
+        MultiDict([("filter", "a in 1,2"), ("filter", "b>0.5"), ("filter", "c!=x")])
+    ).bind(SCHEMA)
+    assert query.filters == (("a", "in", (1, 2)), ("b", ">", 0.5), ("c", "!=", "x"))
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        [("columns", "a,d")],
+        [("filter", "d==1")],
+        [("filter", "a>ten")],
+    ],
+)
+def test_bind_rejects_bad_queries(args):
+    with pytest.raises(ValueError):
+        parse_table_query(MultiDict(args)).bind(SCHEMA)
+
+
+def test_unparseable_filter():
+    with pytest.raises(ValueError):
+        parse_table_query(MultiDict([("filter", "a")]))
+
+
+QUERY = "columns=a,c&filter=a>=500&filter=c in x,y"
+
+
+def expected_rows(df):
+    return df[(df["a"] >= 500) & df["c"].isin(["x", "y"])][["a", "c"]]
+
+
+@pytest.mark.parametrize("store", [False, True])
+@pytest.mark.parametrize("stream", [False, True])
+def test_sample_data_query(app, client, df, data_folder, store, stream):
+    app.config["IO_USE_ARROW_STORE"] = store
+    app.config["IO_ARROW_FOLDER"] = str(data_folder / "arrow")
+    url = f"{IO_ROOT}/sample-data/test-data/records?{QUERY}&stream={stream}"
+    response = client.get(url)
+    assert response.status_code == 200
+    data = response.get_json()
+    if not stream:
+        data = json.loads(data)
+    expected = expected_rows(df)
+    assert pd.DataFrame(data).equals(expected.reset_index(drop=True))
+
+
+def test_sample_data_query_as_parquet(client, df):
+    response = client.get(f"{IO_ROOT}/sample-data/test-data?{QUERY}&format=parquet")
+    assert response.status_code == 200
+    result = pd.read_parquet(io.BytesIO(response.data))
+    assert result.equals(expected_rows(df).reset_index(drop=True))
+
+
+def test_different_queries_get_different_etags(client):
+    first = client.get(f"{IO_ROOT}/sample-data/test-data/records?columns=a")
+    second = client.get(f"{IO_ROOT}/sample-data/test-data/records?columns=b")
+    assert first.headers["ETag"] != second.headers["ETag"]
+    assert json.loads(second.get_json())[0] == {"b": 0.0}
+
+
+@pytest.mark.parametrize("store", [False, True])
+@pytest.mark.parametrize("fmt", ["json", "parquet"])
+def test_chunk_query(app, client, df, data_folder, store, fmt):
+    app.config["IO_USE_ARROW_STORE"] = store
+    app.config["IO_ARROW_FOLDER"] = str(data_folder / "arrow")
+    response = client.get(f"{IO_ROOT}/data/chunk/test-data/11?{QUERY}&format={fmt}")
+    assert response.status_code == 200
+    if fmt == "json":
+        result = pd.DataFrame(response.get_json()["data"])
+    else:
+        result = pd.read_parquet(io.BytesIO(response.data))
+    expected = expected_rows(df.iloc[550:600]).reset_index(drop=True)
+    assert result.equals(expected)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "sample-data/test-data/records?columns=nope",
+        "sample-data/test-data/records?filter=a>x",
+        "sample-data/test-data/records?filter=a",
+        "sample-data/test-data/records?stream=true&columns=nope",
+        "sample-data/test-data?format=parquet&columns=nope",
+        "data/chunk/test-data/0?filter=nope==1",
+    ],
+)
+def test_bad_queries_are_rejected(client, url):
+    assert client.get(f"{IO_ROOT}/{url}").status_code == 400
@@ -14,24 +14,37 @@ from flask_login import (
     logout_user,
 )
 from flask_migrate import Migrate
-from flask_sqlalchemy import SQLAlchemy
 
 from predictables_flask.api.v1 import io as io_pt
+from predictables_flask.api.v1.io.src.job_manager import job_manager
+from predictables_flask.api.v1.io.src.sample_data_cache import sample_data_cache
 from predictables_flask.config import DevelopmentConfig, ProductionConfig, TestingConfig
+from predictables_flask.manage import users_cli
+from predictables_flask.models.Dataset import Dataset  # noqa: F401 (registers the table for migrations)
 from predictables_flask.models.db import db
+from predictables_flask.models.password_hasher import password_hasher
+from predictables_flask.models.User import User
+from predictables_flask.models.user_cache import user_cache
 
 login_manager = LoginManager()
 login_manager.session_protection = "strong"
 login_manager.login_view = "login"
 login_manager.login_message_category = "info"
 
-db = SQLAlchemy()
+
+@login_manager.user_loader
+def load_user(user_id: str):
+    # A cached, detached copy: steady-state requests do not query the database
+    return User.get_cached(int(user_id))
+
+
 migrate = Migrate()
 bcrypt = Bcrypt()
 
 # create a "root" route, so this can be easily integrated with a separate already existing flask app
 root_route = "/predictables/api/v1"
 
+from predictables_flask.api.v1.auth.auth_blueprint import auth_blueprint
 from predictables_flask.api.v1.io import io_blueprint
 
 # from predictables_flask.api.v1.data import data_blueprint
@@ -66,10 +79,17 @@ def create_app(config_class=get_config(), root_route=root_route):
     db.init_app(app)
     migrate.init_app(app, db)
     bcrypt.init_app(app)
+    sample_data_cache.init_app(app)
+    user_cache.init_app(app)
+    password_hasher.init_app(app)
+    job_manager.init_app(app)
+
+    # register cli commands
+    app.cli.add_command(users_cli)
 
     # register blueprints
     app.register_blueprint(io_blueprint, url_prefix=f"{root_route}/io")
-    # app.register_blueprint(auth_blueprint, url_prefix="/api/v1/auth")
+    app.register_blueprint(auth_blueprint, url_prefix=f"{root_route}/auth")
     # app.register_blueprint(dashboard_blueprint, url_prefix="/api/v1/dashboard")
     # app.register_blueprint(data_blueprint, url_prefix="/api/v1/data")
     # app.register_blueprint(feeds_blueprint, url_prefix="/api/v1/feeds")
@@ -0,0 +1,107 @@
+"""
+Throughput of JSON chunk serialization on thread and process pools.
+
+Each run writes a synthetic dataframe as JSON chunks (without compressed
+variants) with `dataframe_to_json_chunks`, as the 'chunk_dataset' job does:
+
+    python -m predictables_flask.benchmarks.json_chunks --workers 1 2 4 8
+
+prints, for each executor and pool size, the rows and megabytes serialized per
+second and the speedup over a single worker of the same executor.
+`DataFrame.to_json` holds the GIL, so only the process pool should scale.
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from predictables_flask.api.v1.io.src.dataframe_to_json_chunks import (
+    dataframe_to_json_chunks,
+)
+
+
+def make_dataframe(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    A dataframe of mixed numeric, string and date columns.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "id": np.arange(n_rows),
+            "x": rng.normal(size=n_rows),
+            "y": rng.lognormal(size=n_rows),
+            "n": rng.integers(0, 1000, n_rows),
+            "label": rng.choice(["alpha", "beta", "gamma", "delta"], n_rows),
+            "date": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 365, n_rows), unit="D"),
+        }
+    )
+
+
+def benchmark_chunks(
+    df: pd.DataFrame, executor: str, max_workers: int, n_chunks: int = 64
+) -> dict:
+    """
+    Time writing `df` as `n_chunks` JSON chunks on a pool of `max_workers`.
+
+    Returns
+    -------
+    result : dict
+        The executor, the pool size, the seconds taken and the JSON megabytes.
+    """
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        filenames = dataframe_to_json_chunks(
+            df,
+            n_chunks=n_chunks,
+            dataset_name="benchmark",
+            output_dir=output_dir,
+            max_workers=max_workers,
+            executor=executor,
+            return_json=False,
+            encodings=[],
+        )
+        elapsed = time.perf_counter() - start
+        n_bytes = sum(len(open(name, "rb").read()) for name in filenames)
+
+    return {
+        "executor": executor,
+        "max_workers": max_workers,
+        "seconds": elapsed,
+        "megabytes": n_bytes / 1e6,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunks", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument(
+        "--executors",
+        nargs="+",
+        choices=["thread", "process"],
+        default=["thread", "process"],
+    )
+    args = parser.parse_args(argv)
+
+    df = make_dataframe(args.rows)
+    print(f"{'executor':<10}{'workers':>8}{'rows/s':>14}{'MB/s':>10}{'speedup':>10}")
+    for executor in args.executors:
+        baseline = None
+        for max_workers in args.workers:
+            result = benchmark_chunks(df, executor, max_workers, args.chunks)
+            baseline = baseline or result["seconds"]
+            print(
+                f"{executor:<10}{max_workers:>8}"
+                f"{args.rows / result['seconds']:>14.0f}"
+                f"{result['megabytes'] / result['seconds']:>10.1f}"
+                f"{baseline / result['seconds']:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
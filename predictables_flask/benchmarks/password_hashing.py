@@ -0,0 +1,99 @@
+"""
+Login throughput and latency of the password hasher, at several cost settings.
+
+Each simulated request thread checks a password (the CPU-heavy part of a
+login) through a `PasswordHasher`, as `User.check_password` does:
+
+    python -m predictables_flask.benchmarks.password_hashing --concurrency 16
+
+prints, for each method, the logins per second and the p50/p99 latency of a
+single login.
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from predictables_flask.models.password_hasher import PasswordHasher, hash_password
+
+DEFAULT_METHODS = [
+    "pbkdf2:sha256:100000",
+    "pbkdf2:sha256:600000",
+    "scrypt:16384:8:1",
+    "scrypt:32768:8:1",
+    "scrypt:65536:8:1",
+    "bcrypt:10",
+    "bcrypt:12",
+]
+
+
+def benchmark_logins(
+    method: str,
+    n_logins: int = 200,
+    concurrency: int = 16,
+    max_workers: int = None,
+    executor: str = "process",
+) -> dict:
+    """
+    Time `n_logins` password checks made by `concurrency` request threads.
+
+    Returns
+    -------
+    result : dict
+        The method, the logins per second and the p50/p99 latency in milliseconds.
+    """
+    password = "correct horse battery staple"
+    password_hash = hash_password(password, method)
+    hasher = PasswordHasher(method, max_workers=max_workers, executor=executor)
+
+    def _login(_) -> float:
+        start = time.perf_counter()
+        assert hasher.check(password_hash, password)
+        return time.perf_counter() - start
+
+    try:
+        # Warm up the pool, so starting its workers is not timed
+        list(map(_login, range(2)))
+        with ThreadPoolExecutor(max_workers=concurrency) as requests:
+            start = time.perf_counter()
+            latencies = np.array(list(requests.map(_login, range(n_logins))))
+            elapsed = time.perf_counter() - start
+    finally:
+        hasher.shutdown()
+
+    return {
+        "method": method,
+        "logins_per_second": n_logins / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--methods", nargs="+", default=DEFAULT_METHODS)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--executor", choices=["thread", "process"], default="process")
+    args = parser.parse_args(argv)
+
+    print(f"{'method':<24}{'logins/s':>12}{'p50 ms':>12}{'p99 ms':>12}")
+    for method in args.methods:
+        result = benchmark_logins(
+            method,
+            n_logins=args.logins,
+            concurrency=args.concurrency,
+            max_workers=args.max_workers,
+            executor=args.executor,
+        )
+        print(
+            f"{result['method']:<24}{result['logins_per_second']:>12.1f}"
+            f"{result['p50_ms']:>12.1f}{result['p99_ms']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,36 @@ class Config:
     SQLALCHEMY_ECHO = False
     DEBUG = False
     TESTING = False
+
+    # io settings
+    IO_DATA_FOLDER = "./api/v1/io/data"
+    IO_CHUNK_FOLDER = "./api/v1/io/data/chunks"
+    SAMPLE_DATA_CACHE_MAX_BYTES = 512 * 1024 * 1024
+    IO_STREAM_BATCH_ROWS = 10000
+    IO_TARGET_CHUNK_BYTES = 4 * 1024 * 1024
+    UPLOAD_FOLDER = "./api/v1/io/uploads"
+    UPLOAD_MAX_PART_BYTES = 64 * 1024 * 1024
+    IO_INGEST_ROW_GROUP_SIZE = 128 * 1024
+    IO_INGEST_BLOCK_SIZE = 16 * 1024 * 1024
+    IO_INGEST_SAMPLE_BYTES = 1024 * 1024
+    IO_JOB_FOLDER = "./api/v1/io/data/jobs"
+    IO_JOB_EXECUTOR = "thread"
+    IO_JOB_MAX_WORKERS = 2
+    IO_CHUNK_EXECUTOR = "process"
+    IO_CHUNK_MAX_WORKERS = None
+    IO_CHUNK_LAYOUT = "container"
+    IO_USE_ARROW_STORE = False
+    IO_ARROW_FOLDER = "./api/v1/io/data/arrow"
+    IO_SKETCH_K = 200
+    IO_SKETCH_HLL_PRECISION = 12
+
+    # user settings
+    USER_CACHE_MAX_ENTRIES = 10000
+    USER_CACHE_TTL = 300
+    PASSWORD_HASH_METHOD = "scrypt:32768:8:1"
+    PASSWORD_HASH_EXECUTOR = "process"
+    PASSWORD_HASH_MAX_WORKERS = None
+    USER_IMPORT_BATCH_SIZE = 1000
     # Other general settings
 
 
@@ -27,6 +57,10 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = (
         "sqlite:///:memory:"  # Use an in-memory SQLite database for tests
     )
+    SAMPLE_DATA_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    # Cheap hashes keep the user tests fast
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
+    PASSWORD_HASH_EXECUTOR = "thread"
     # Other test-specific settings
 
 
@@ -36,4 +70,6 @@ class ProductionConfig(Config):
     DEBUG = False
     TESTING = False
     SQLALCHEMY_ECHO = False
+    SAMPLE_DATA_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+    PASSWORD_HASH_METHOD = "scrypt:65536:8:1"
     # Production-specific settings
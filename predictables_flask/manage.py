@@ -1,3 +1,15 @@
+import json
+import os
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from predictables_flask.models.user_import import IMPORT_FORMATS
+
+users_cli = AppGroup("users", help="Manage users.")
+
+
 def deploy():
     """Run deployment tasks."""
     from flask_migrate import init, migrate, stamp, upgrade
@@ -17,3 +29,55 @@ def deploy():
 
 
 # deploy()
+
+
+@users_cli.command("import")
+@click.argument("filename", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(IMPORT_FORMATS),
+    default=None,
+    help="Default is the file's extension.",
+)
+@click.option("--batch-size", type=int, default=None, help="Rows per transaction.")
+@click.option(
+    "--allow-missing-password",
+    is_flag=True,
+    help="Create the users of rows without a password, instead of failing them.",
+)
+def import_users_command(filename, fmt, batch_size, allow_missing_password):
+    """Create the users in a CSV or JSON file, eg. `flask users import users.csv`."""
+    from predictables_flask.models.user_import import import_users, read_user_records
+
+    if fmt is None:
+        fmt = os.path.splitext(filename)[1].lstrip(".").lower()
+    if batch_size is None:
+        batch_size = current_app.config["USER_IMPORT_BATCH_SIZE"]
+    with open(filename, "rb") as f:
+        try:
+            records = read_user_records(f.read(), fmt)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="FILENAME") from e
+    report = import_users(records, batch_size, allow_missing_password)
+    for error in report["errors"]:
+        click.echo(json.dumps(error), err=True)
+    click.echo(
+        f"Created {report['n_created']} of {report['n_rows']} users "
+        f"({report['n_failed']} failed)"
+    )
+
+
+@users_cli.command("set-admin")
+@click.argument("username")
+@click.option("--revoke", is_flag=True, help="Take the admin role away instead.")
+def set_admin_command(username, revoke):
+    """Make a user an admin, eg. `flask users set-admin ada`."""
+    from predictables_flask.models.User import User
+
+    user = User.get_by_username(username)
+    if user is None:
+        raise click.BadParameter(f"User `{username}` does not exist", param_hint="USERNAME")
+    user.is_admin = not revoke
+    user.update()
+    click.echo(f"User `{username}` is {'no longer' if revoke else 'now'} an admin")
@@ -0,0 +1,144 @@
+import json
+from datetime import datetime, timezone
+from typing import List
+
+from predictables_flask.logger import create_logger
+from predictables_flask.models.db import db
+
+logger = create_logger(__file__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Dataset(db.Model):
+    """
+    A class used to represent a dataset in the io catalog.
+
+    One row per parquet file in the data folder, recording its size, schema and
+    content hash (as of the file version `mtime_ns`/`n_bytes_on_disk`), and the
+    layout of its JSON chunks once they have been written.
+    """
+
+    __tablename__ = "datasets"
+    __table_args__ = {"extend_existing": True}
+    __repr_attrs__ = ["id", "name", "content_hash"]
+    __repr_json__ = [
+        "id",
+        "name",
+        "n_rows",
+        "n_columns",
+        "n_row_groups",
+        "n_bytes",
+        "n_bytes_on_disk",
+        "content_hash",
+        "parquet_path",
+        "mtime_ns",
+        "n_chunks",
+        "chunk_folder",
+        "manifest_path",
+    ]
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), unique=True, nullable=False, index=True)
+    content_hash = db.Column(db.String(64), nullable=False, index=True)
+
+    # The parquet file, and the version of it the row describes
+    parquet_path = db.Column(db.String(1024), nullable=False)
+    mtime_ns = db.Column(db.BigInteger, nullable=False)
+    n_bytes_on_disk = db.Column(db.BigInteger, nullable=False)
+
+    # Size and schema, from the parquet footer
+    n_rows = db.Column(db.BigInteger, nullable=False)
+    n_columns = db.Column(db.Integer, nullable=False)
+    n_row_groups = db.Column(db.Integer, nullable=False)
+    n_bytes = db.Column(db.BigInteger, nullable=False)
+    schema_json = db.Column(db.Text, nullable=False)
+
+    # Chunk layout: null until the chunks have been written
+    n_chunks = db.Column(db.Integer)
+    chunk_folder = db.Column(db.String(1024))
+    manifest_path = db.Column(db.String(1024))
+
+    created_at = db.Column(db.DateTime(timezone=True), default=_utcnow)
+    updated_at = db.Column(db.DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
+
+    def __repr__(self) -> str:
+        return "<Dataset %r>" % self.name
+
+    @property
+    def schema(self) -> List[dict]:
+        """
+        The columns of the dataset, as a list of {'name': ..., 'type': ...}.
+        """
+        return json.loads(self.schema_json)
+
+    @schema.setter
+    def schema(self, schema: List[dict]) -> None:
+        self.schema_json = json.dumps(schema)
+
+    def to_dict(self) -> dict:
+        return {
+            **{attr: getattr(self, attr) for attr in self.__repr_json__},
+            "schema": self.schema,
+        }
+
+    # CRUD operations
+    def save(self) -> None:
+        """
+        Save a dataset.
+        """
+        try:
+            db.session.add(self)
+            db.session.commit()
+            logger.info(f"Dataset `{self.name}` saved successfully")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error saving dataset `{self.name}`: {e}")
+            raise e
+
+    def delete(self) -> None:
+        """
+        Delete a dataset.
+        """
+        try:
+            db.session.delete(self)
+            db.session.commit()
+            logger.info(f"Dataset `{self.name}` deleted successfully")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error deleting dataset `{self.name}`: {e}")
+            raise e
+
+    # Class methods
+    @classmethod
+    def get_by_name(cls, name: str) -> "Dataset":
+        """
+        Get a dataset by name.
+
+        Parameters
+        ----------
+        name : str
+            The name of the dataset to get.
+
+        Returns
+        -------
+        Dataset
+            The dataset with the given name, or None.
+        """
+        return cls.query.filter_by(name=name).first()
+
+    @classmethod
+    def get_by_hash(cls, content_hash: str) -> List["Dataset"]:
+        """
+        Get the datasets whose parquet file has the given SHA-256 hash.
+        """
+        return cls.query.filter_by(content_hash=content_hash).all()
+
+    @classmethod
+    def get_all(cls) -> List["Dataset"]:
+        """
+        Get all datasets, by name.
+        """
+        return cls.query.order_by(cls.name).all()
@@ -1,10 +1,13 @@
 from typing import List, Tuple
 
 from flask_login import UserMixin
-from werkzeug.security import check_password_hash, generate_password_hash
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
 
 from predictables_flask.logger import create_logger
 from predictables_flask.models.db import db
+from predictables_flask.models.password_hasher import password_hasher
+from predictables_flask.models.user_cache import CachedUser, user_cache
 
 print(f"db: {db}")
 print(f"db.Model: {db.Model}")
@@ -22,13 +25,20 @@ class User(UserMixin, db.Model):
     __tablename__ = "users"
     __table_args__ = {"extend_existing": True}
     __repr_attrs__ = ["id", "username", "email"]
-    __repr_json__ = ["id", "username", "email"]
+    __repr_json__ = ["id", "username", "email", "is_admin"]
     __repr_json_exclude__ = ["password_hash"]
 
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128))
+    # Unique indexes: lookups by username or email do not scan the table, and
+    # concurrent registrations of the same user fail with an IntegrityError
+    username = db.Column(db.String(80), unique=True, index=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, index=True, nullable=False)
+    password_hash = db.Column(db.String(256))
+    # Admins may manage other users (eg. import them in bulk). Only granted
+    # with `flask users set-admin`, never through the API
+    is_admin = db.Column(
+        db.Boolean, nullable=False, default=False, server_default=db.false()
+    )
 
     def __repr__(self) -> str:
         return "<User %r>" % self.username
@@ -58,6 +68,23 @@ class User(UserMixin, db.Model):
         qry = self.query.filter_by(email=email).first()
         return qry is not None, qry
 
+    def _are_username_and_email_taken(
+        self, username: str, email: str
+    ) -> Tuple[bool, bool]:
+        """
+        Check if the username and the email already exist, in one (indexed)
+        query. Returns whether each of them is taken.
+        """
+        rows = db.session.execute(
+            select(User.username, User.email)
+            .where(or_(User.username == username, User.email == email))
+            .limit(2)
+        ).all()
+        return (
+            any(row.username == username for row in rows),
+            any(row.email == email for row in rows),
+        )
+
     def _does_email_include_at_symbol(self, email: str) -> bool:
         """
         Check if email includes the @ symbol. Returns True if email includes the @ symbol, False otherwise.
@@ -131,12 +158,6 @@ class User(UserMixin, db.Model):
             # Check if email is empty
             logger.info(f"Email is empty: `{email}`")
             return False
-        elif self._does_email_already_exist(email)[0]:
-            # Check if email already exists
-            logger.info(
-                f"Email already exists for user {self._does_email_already_exist(email)[1]}: `{email}`"
-            )
-            return False
         elif not self._does_email_include_at_symbol(email):
             # Check if email includes the @ symbol
             logger.info(f"Email does not include @ symbol: `{email}`")
@@ -145,10 +166,70 @@ class User(UserMixin, db.Model):
             # Check if email follows the text@text format
             logger.info(f"Email does not follow text@text.text format: `{email}`")
             return False
-        else:
-            # Email is valid
-            logger.info(f"Email is valid: `{email}`")
-            return True
+
+        # Check if email already exists (only once the format is valid)
+        exists, user = self._does_email_already_exist(email)
+        if exists:
+            logger.info(f"Email already exists for user {user}: `{email}`")
+            return False
+        # Email is valid
+        logger.info(f"Email is valid: `{email}`")
+        return True
+
+    def validate_username_and_email_before_adding_new_user(
+        self, username: str, email: str
+    ) -> bool:
+        """
+        Validate the username and email of a new user together. They are
+        considered valid under the same rules as
+        `validate_username_before_adding_new_user` and
+        `validate_email_before_adding_new_user`, but whether either already
+        exists is checked in a single query.
+
+        Returns True if both are valid, False otherwise.
+
+        Parameters
+        ----------
+        username : str
+            The username to validate.
+        email : str
+            The email to validate.
+
+        Returns
+        -------
+        bool
+            True if the username and email are valid, False otherwise.
+
+        Note
+        ----
+        1. This method is used in the POST /api/v1/auth/register endpoint.
+        2. A user registered concurrently can still pass this check. The unique
+           indexes on username and email make `create` fail for it instead.
+        """
+        if self._is_username_empty(username):
+            logger.info(f"Username is empty: `{username}`")
+            return False
+        elif self._is_email_empty(email):
+            logger.info(f"Email is empty: `{email}`")
+            return False
+        elif not self._does_email_include_at_symbol(email):
+            logger.info(f"Email does not include @ symbol: `{email}`")
+            return False
+        elif not self._does_email_follow_text_at_text_dot_text_format(email):
+            logger.info(f"Email does not follow text@text.text format: `{email}`")
+            return False
+
+        username_taken, email_taken = self._are_username_and_email_taken(
+            username, email
+        )
+        if username_taken:
+            logger.info(f"User already exists: `{username}`")
+            return False
+        elif email_taken:
+            logger.info(f"Email already exists: `{email}`")
+            return False
+        logger.info(f"Username and email are valid: `{username}`, `{email}`")
+        return True
 
     # Password hashing and checking
     def _is_password_empty(self, password: str) -> bool:
@@ -262,12 +343,20 @@ class User(UserMixin, db.Model):
             return True
 
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password)
+        """
+        Hash the password with `PASSWORD_HASH_METHOD`, on the `password_hasher` pool.
+        """
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
         """
         Check if the password is correct.
 
+        The check runs on the `password_hasher` pool. If the password is correct
+        but its hash was made with an outdated method or cost, it is rehashed
+        with the current `PASSWORD_HASH_METHOD` and the user is updated; a
+        failure to save the new hash is logged, and does not fail the check.
+
         Parameters
         ----------
         password : str
@@ -279,10 +368,20 @@ class User(UserMixin, db.Model):
             True if the password is correct, False otherwise.
         """
         try:
-            return check_password_hash(self.password_hash, password)
+            is_correct = password_hasher.check(self.password_hash, password)
         except Exception as e:
             logger.error(f"Error checking password: {e}")
             raise e
+        if is_correct:
+            try:
+                if password_hasher.needs_rehash(self.password_hash):
+                    self.set_password(password)
+                    self.update()
+                    logger.info(f"Password of user `{self.username}` rehashed")
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error rehashing password of user `{self.username}`: {e}")
+        return is_correct
 
     def to_dict(self) -> dict:
         return {attr: getattr(self, attr) for attr in self.__repr_json__}
@@ -291,11 +390,24 @@ class User(UserMixin, db.Model):
     def create(self) -> None:
         """
         Create a new user.
+
+        Raises
+        ------
+        ValueError
+            If the username or email already exists. The unique indexes make
+            this race-free, even if the user was validated before another
+            request created the same username or email.
         """
         try:
             db.session.add(self)
             db.session.commit()
             logger.info(f"User `{self.username}` created successfully")
+        except IntegrityError as e:
+            db.session.rollback()
+            logger.info(f"User `{self.username}` or email `{self.email}` already exists")
+            raise ValueError(
+                f"User `{self.username}` or email `{self.email}` already exists"
+            ) from e
         except Exception as e:
             logger.error(f"Error creating user `{self.username}`: {e}")
             raise e
@@ -306,6 +418,7 @@ class User(UserMixin, db.Model):
         """
         try:
             db.session.commit()
+            user_cache.invalidate(self.id)
             logger.info(f"User `{self.username}` updated successfully")
         except Exception as e:
             logger.error(f"Error updating user `{self.username}`: {e}")
@@ -318,6 +431,7 @@ class User(UserMixin, db.Model):
         try:
             db.session.add(self)
             db.session.commit()
+            user_cache.invalidate(self.id)
             logger.info(f"User `{self.username}` saved successfully")
         except Exception as e:
             logger.error(f"Error saving user `{self.username}`: {e}")
@@ -328,8 +442,10 @@ class User(UserMixin, db.Model):
         Delete a user.
         """
         try:
+            user_id = self.id
             db.session.delete(self)
             db.session.commit()
+            user_cache.invalidate(user_id)
             logger.info(f"User `{self.username}` deleted successfully")
         except Exception as e:
             logger.error(f"Error deleting user `{self.username}`: {e}")
@@ -385,6 +501,32 @@ class User(UserMixin, db.Model):
             logger.error(f"Error retrieving user `{id}`: {e}")
             raise e
 
+    @classmethod
+    def get_cached(cls, id: int) -> CachedUser:
+        """
+        Get a detached, read-only copy of a user by ID, from `user_cache`.
+
+        Only a cache miss (or an expired entry) queries the database, so this
+        is the lookup for flask-login's user loader. Use `get_by_id` to get a
+        `User` that can be changed.
+
+        Parameters
+        ----------
+        id : int
+            The ID of the user to get.
+
+        Returns
+        -------
+        CachedUser
+            The user's id, username and email, or None if there is no such user.
+        """
+
+        def _load(user_id: int) -> CachedUser:
+            user = cls.get_by_id(user_id)
+            return CachedUser.from_user(user) if user is not None else None
+
+        return user_cache.get_or_load(id, _load)
+
     @classmethod
     def get_all(cls) -> List["User"]:
         """
@@ -0,0 +1,187 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from typing import List
+
+import bcrypt
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    generate_password_hash,
+)
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+# The full parameters of each method, when the config only names the method
+DEFAULT_METHODS = {
+    "scrypt": "scrypt:32768:8:1",
+    "pbkdf2": f"pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}",
+    "bcrypt": "bcrypt:12",
+}
+
+
+class PasswordHasher:
+    """
+    Hash and check passwords on a bounded worker pool.
+
+    Key derivation is deliberately CPU-heavy; running it on a pool of
+    `max_workers` processes keeps a burst of logins from pinning every
+    request worker, and the GIL from serializing it. The pool is started on
+    first use, so each server process (eg. each gunicorn worker) gets its own.
+    Its processes are started by a fork server (or spawned where there is
+    none) rather than forked from the multithreaded server process, which
+    can deadlock on a lock another thread held at the fork.
+
+    The method is a werkzeug method string ('scrypt:N:r:p' or
+    'pbkdf2:hash:iterations') or 'bcrypt:rounds'. Hashes made with any other
+    method or cost are still checked, and `needs_rehash` reports them so
+    they can be upgraded when the password is next known, ie. at login.
+    """
+
+    def __init__(
+        self,
+        method: str = "scrypt",
+        max_workers: int = None,
+        executor: str = "process",
+    ):
+        self.method = normalize_method(method)
+        self.max_workers = max_workers
+        self.executor = executor
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """
+        Read `PASSWORD_HASH_METHOD`, `PASSWORD_HASH_MAX_WORKERS` and
+        `PASSWORD_HASH_EXECUTOR` ('thread' or 'process') from the app config.
+        """
+        executor = app.config.get("PASSWORD_HASH_EXECUTOR", self.executor)
+        if executor not in EXECUTORS:
+            raise ValueError(
+                f"Unknown executor `{executor}`. Use one of {list(EXECUTORS)}."
+            )
+        self.shutdown()
+        self.method = normalize_method(
+            app.config.get("PASSWORD_HASH_METHOD", self.method)
+        )
+        self.max_workers = app.config.get("PASSWORD_HASH_MAX_WORKERS", self.max_workers)
+        self.executor = executor
+        app.extensions["password_hasher"] = self
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured method, on the pool.
+        """
+        return self._get_pool().submit(hash_password, password, self.method).result()
+
+    def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Hash many passwords in parallel, in order, eg. for a bulk import.
+        """
+        n_workers = self.max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(passwords) // (4 * n_workers))
+        return list(
+            self._get_pool().map(
+                hash_password,
+                passwords,
+                repeat(self.method),
+                chunksize=chunksize,
+            )
+        )
+
+    def check(self, password_hash: str, password: str) -> bool:
+        """
+        Check a password against a hash made with any supported method, on the pool.
+        """
+        return self._get_pool().submit(check_password, password_hash, password).result()
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """
+        Whether a hash was made with another method or cost than the configured
+        one. A hash in a format this module cannot parse (eg. a legacy method)
+        needs a rehash too.
+        """
+        try:
+            return get_hash_method(password_hash) != self.method
+        except (ValueError, IndexError):
+            return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker pool. It is started again on the next hash or check.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.executor == "process":
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=_get_mp_context()
+                    )
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+
+def _get_mp_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def hash_password(password: str, method: str) -> str:
+    """
+    Hash a password, eg. `hash_password("secret", "scrypt:32768:8:1")`.
+    """
+    if method.startswith("bcrypt:"):
+        rounds = int(method.split(":")[1])
+        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode()
+    return generate_password_hash(password, method=method)
+
+
+def check_password(password_hash: str, password: str) -> bool:
+    """
+    Check a password against a werkzeug or bcrypt hash.
+    """
+    if not password_hash:
+        return False
+    if password_hash.startswith("$2"):
+        return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+    return check_password_hash(password_hash, password)
+
+
+def get_hash_method(password_hash: str) -> str:
+    """
+    Get the method and cost a hash was made with, in the format of `PASSWORD_HASH_METHOD`.
+    """
+    if password_hash.startswith("$2"):
+        # Modular crypt format: $2b$<rounds>$<salt and hash>
+        return f"bcrypt:{int(password_hash.split('$')[2])}"
+    return normalize_method(password_hash.split("$", 1)[0])
+
+
+def normalize_method(method: str) -> str:
+    """
+    Fill in the default parameters of a method, eg. 'scrypt' -> 'scrypt:32768:8:1'.
+    """
+    name, _, params = method.partition(":")
+    if name not in DEFAULT_METHODS:
+        raise ValueError(
+            f"Unknown password hash method `{name}`. Use one of {list(DEFAULT_METHODS)}."
+        )
+    if not params:
+        return DEFAULT_METHODS[name]
+    if name == "pbkdf2" and ":" not in params:
+        # 'pbkdf2:sha256' uses werkzeug's default number of iterations
+        return f"pbkdf2:{params}:{DEFAULT_PBKDF2_ITERATIONS}"
+    return method
+
+
+# Shared hasher for the User model, configured in `create_app`
+password_hasher = PasswordHasher()
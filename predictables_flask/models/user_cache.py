@@ -0,0 +1,170 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from flask_login import UserMixin
+
+
+@dataclass(frozen=True)
+class CachedUser(UserMixin):
+    """
+    A detached, read-only copy of a user, for flask-login's user loader.
+
+    It holds no database session, so it can be shared between requests and
+    threads. The password hash is deliberately left out: code that checks or
+    changes credentials must load the `User` itself.
+    """
+
+    id: int
+    username: str
+    email: str
+    is_admin: bool = False
+
+    @classmethod
+    def from_user(cls, user) -> "CachedUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_admin=bool(user.is_admin),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "username": self.username,
+            "email": self.email,
+            "is_admin": self.is_admin,
+        }
+
+
+class UserCache:
+    """
+    A thread-safe LRU cache of `CachedUser` records, by user id.
+
+    Entries expire `ttl` seconds after they were loaded, which bounds how long
+    another process's cache can serve a user after it changed. Within a
+    process, `User.update`, `User.save` and `User.delete` invalidate the
+    user's entry as soon as their change is committed. Missing users are not
+    cached, so a new user needs no invalidation.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """
+        Read the size and time-to-live from `USER_CACHE_MAX_ENTRIES` and
+        `USER_CACHE_TTL` in the app config.
+        """
+        self.max_entries = app.config.get("USER_CACHE_MAX_ENTRIES", self.max_entries)
+        self.ttl = app.config.get("USER_CACHE_TTL", self.ttl)
+        app.extensions["user_cache"] = self
+        with self._lock:
+            self._evict()
+
+    def get(self, user_id: int) -> CachedUser:
+        """
+        Get a user from the cache, or None if it is not cached (or has expired).
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._entries[user_id]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, user: CachedUser, generation: int = None) -> None:
+        """
+        Store a user, evicting the least recently used users over `max_entries`.
+
+        With a `generation` (see `get_or_load`), the user is only stored if
+        nothing was invalidated since, so a record loaded before a concurrent
+        update is never cached after it.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries.pop(user.id, None)
+            self._entries[user.id] = (user, time.monotonic() + self.ttl)
+            self._evict()
+
+    def get_or_load(
+        self, user_id: int, loader: Callable[[int], CachedUser]
+    ) -> CachedUser:
+        """
+        Get a user from the cache, calling `loader` with its id on a miss.
+        """
+        user = self.get(user_id)
+        if user is None:
+            generation = self._generation
+            user = loader(user_id)
+            if user is not None:
+                self.put(user, generation)
+        return user
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        Drop a user from the cache, eg. after it was changed or deleted.
+        """
+        with self._lock:
+            self._generation += 1
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """
+        Remove every entry and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.expirations = 0
+            self.evictions = 0
+            self.invalidations = 0
+
+    def stats(self) -> dict:
+        """
+        Get the hit/miss counters and the size of the cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+            }
+
+    def _evict(self) -> None:
+        # Caller must hold the lock
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+# Shared cache for flask-login's user loader, configured in `create_app`
+user_cache = UserCache()
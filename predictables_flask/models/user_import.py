@@ -0,0 +1,215 @@
+import csv
+import io
+import json
+from typing import Dict, Iterable, List, Set
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from predictables_flask.logger import create_logger
+from predictables_flask.models.db import db
+from predictables_flask.models.password_hasher import password_hasher
+from predictables_flask.models.User import User
+
+logger = create_logger(__file__)
+
+IMPORT_FORMATS = ["csv", "json"]
+
+# Bound parameters per `IN (...)` query, under SQLite's historical limit of 999
+_LOOKUP_BATCH = 500
+
+
+def read_user_records(data, fmt: str) -> List[dict]:
+    """
+    Read the users to import from CSV or JSON.
+
+    Parameters
+    ----------
+    data : str or bytes
+        CSV with a header row, or JSON: a list of objects, or an object with
+        the list under "users". Each user has a username, an email and a
+        password.
+    fmt : str
+        Either 'csv' or 'json'.
+
+    Returns
+    -------
+    records : list of dict
+        One dict per user, in the order they were given.
+
+    Raises
+    ------
+    ValueError
+        If the format is unknown, or the data cannot be parsed.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown format `{fmt}`. Use one of {IMPORT_FORMATS}.")
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    if fmt == "csv":
+        return [dict(row) for row in csv.DictReader(io.StringIO(data))]
+
+    try:
+        records = json.loads(data)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}") from e
+    if isinstance(records, dict):
+        records = records.get("users", None)
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise ValueError("Expected a list of users, or an object with a `users` list")
+    return records
+
+
+def import_users(
+    records: Iterable[dict], batch_size: int = 1000, allow_missing_password: bool = False
+) -> dict:
+    """
+    Create many users at once.
+
+    Every row is validated like a registration (username, email format,
+    password rules), then checked for uniqueness against the rest of the
+    batch and against the database with a few set-based `IN` queries, rather
+    than one query per user. The passwords of the valid rows are hashed in
+    parallel on the `password_hasher` pool, and the users are inserted with
+    one `executemany` per `batch_size` rows, each chunk in its own
+    transaction.
+
+    An invalid row is reported and skipped. If a chunk still violates a
+    unique constraint (eg. a user registered concurrently), it is rolled back
+    and its rows are inserted one at a time, so only the conflicting rows
+    fail.
+
+    Parameters
+    ----------
+    records : iterable of dict
+        The users, each with a username, an email and a password.
+    batch_size : int, optional
+        The number of rows per insert and transaction. Default is 1000.
+    allow_missing_password : bool, optional
+        Whether to create the users of rows without a password, with no
+        password set (so they cannot log in until one is). Default is False,
+        which reports those rows as failed.
+
+    Returns
+    -------
+    report : dict
+        The number of rows, of users created and of failed rows, and an
+        error (with its 0-based row number, username and message) per failed row.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    records = list(records)
+    errors = []
+    rows, row_numbers = _validate_records(records, errors, allow_missing_password)
+
+    # Every row needs the same keys for an executemany
+    passwords = {}
+    for i, row in enumerate(rows):
+        password = row.pop("password")
+        row["password_hash"] = None
+        if password:
+            passwords[i] = password
+    hashes = password_hasher.hash_many(list(passwords.values()))
+    for i, password_hash in zip(passwords, hashes):
+        rows[i]["password_hash"] = password_hash
+
+    n_created = 0
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start : start + batch_size]
+        try:
+            db.session.execute(insert(User.__table__), chunk)
+            db.session.commit()
+            n_created += len(chunk)
+        except IntegrityError:
+            db.session.rollback()
+            numbers = row_numbers[start : start + batch_size]
+            n_created += _insert_one_by_one(chunk, numbers, errors)
+
+    errors.sort(key=lambda error: error["row"])
+    logger.info(
+        f"Imported {n_created} of {len(records)} users ({len(errors)} rows failed)"
+    )
+    return {
+        "n_rows": len(records),
+        "n_created": n_created,
+        "n_failed": len(errors),
+        "errors": errors,
+    }
+
+
+def _validate_records(
+    records: List[dict], errors: List[dict], allow_missing_password: bool
+):
+    # The valid rows (username, email, password), and their row numbers
+    user = User()
+    rows, row_numbers = [], []
+    for i, record in enumerate(records):
+        username = str(record.get("username") or "").strip()
+        email = str(record.get("email") or "").strip()
+        password = str(record.get("password") or "")
+        if user._is_username_empty(username):
+            error = "Username is empty"
+        elif user._is_email_empty(email):
+            error = "Email is empty"
+        elif not user._does_email_include_at_symbol(email):
+            error = "Email does not include @ symbol"
+        elif not user._does_email_follow_text_at_text_dot_text_format(email):
+            error = "Email does not follow text@text.text format"
+        elif not password and not allow_missing_password:
+            error = "Password is empty"
+        elif password and (
+            user._is_password_same_as_username(password, username)
+            or user._is_password_same_as_email(password, email)
+        ):
+            error = "Password is the same as the username or email"
+        elif password and not user._is_password_at_least_8_characters_long(password):
+            error = "Password is not at least 8 characters long"
+        else:
+            rows.append({"username": username, "email": email, "password": password})
+            row_numbers.append(i)
+            continue
+        errors.append({"row": i, "username": username, "error": error})
+
+    taken_usernames = _find_existing(User.username, [r["username"] for r in rows])
+    taken_emails = _find_existing(User.email, [r["email"] for r in rows])
+    unique_rows, unique_numbers = [], []
+    for row, i in zip(rows, row_numbers):
+        if row["username"] in taken_usernames:
+            error = "User already exists"
+        elif row["email"] in taken_emails:
+            error = "Email already exists"
+        else:
+            # Later rows with the same username or email are duplicates
+            taken_usernames.add(row["username"])
+            taken_emails.add(row["email"])
+            unique_rows.append(row)
+            unique_numbers.append(i)
+            continue
+        errors.append({"row": i, "username": row["username"], "error": error})
+    return unique_rows, unique_numbers
+
+
+def _find_existing(column, values: List[str]) -> Set[str]:
+    # The values already in a column, in a few `IN` queries
+    existing = set()
+    values = sorted(set(values))
+    for start in range(0, len(values), _LOOKUP_BATCH):
+        batch = values[start : start + _LOOKUP_BATCH]
+        existing.update(db.session.scalars(select(column).where(column.in_(batch))))
+    return existing
+
+
+def _insert_one_by_one(
+    chunk: List[Dict], row_numbers: List[int], errors: List[dict]
+) -> int:
+    # Fall back for a chunk that lost a race: insert each row in a savepoint
+    n_created = 0
+    for row, i in zip(chunk, row_numbers):
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(User.__table__), row)
+            n_created += 1
+        except IntegrityError as e:
+            errors.append({"row": i, "username": row["username"], "error": str(e.orig)})
+    db.session.commit()
+    return n_created